@@ -3,8 +3,11 @@ from __future__ import annotations
 import logging
 import sys
 
+from depsdev.cli.output import OutputFormat
 from depsdev.cli.purl import get_extractor
 from depsdev.cli.vuln import main_helper
+from depsdev.v3 import HashType
+from depsdev.v3 import System
 
 try:
     import typer
@@ -19,6 +22,7 @@ except ImportError:
 import os
 from textwrap import dedent
 from typing import TYPE_CHECKING
+from typing import Optional
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -52,7 +56,14 @@ def to_sync() -> Callable[[Callable[P, R]], Callable[P, R]]:
 
                 from rich import print_json
 
-                result: object = asyncio.run(func(*args, **kwargs))  # type: ignore[arg-type]
+                from depsdev import profiling
+                from depsdev.scheduler import scheduler
+
+                concurrency = kwargs.get("concurrency")
+                if isinstance(concurrency, int):
+                    # The caps of the priority classes must not undercut --concurrency.
+                    scheduler.fit(concurrency)
+                result: object = asyncio.run(profiling.run(func(*args, **kwargs)))  # type: ignore[arg-type]
                 if result is not None:
                     print_json(data=result)
             except Exception:
@@ -130,6 +141,30 @@ def create_app() -> typer.Typer:
         app.command(rich_help_panel="v3alpha")(to_sync()(client_v3_alpha.purl_lookup_batch))
         app.command(rich_help_panel="v3alpha")(to_sync()(client_v3_alpha.query_container_images))
 
+    @app.command(name="batch", rich_help_panel="Utils")
+    @to_sync()
+    async def batch(
+        filename: str = "-",
+        concurrency: int = 16,
+        ordered: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """
+        Run many calls from JSON Lines (a file or - for stdin) on one client, one result per line.
+
+        Each line names a method and its parameters, results are written as they complete or, with
+        --ordered, in input order.
+
+        Example usage:
+            echo '{"method": "get-package", "params": {"system": "npm", "name": "react"}}' | depsdev api batch
+            depsdev api batch --ordered --concurrency 64 requests.jsonl > results.jsonl
+        """  # noqa: E501
+        from depsdev.cli.batch import run_batch
+
+        with sys.stdin if filename == "-" else open(filename, encoding="utf-8") as stream:  # noqa: ASYNC230
+            failures = await run_batch(client, stream, concurrency=concurrency, ordered=ordered)
+        if failures:
+            logger.warning("%s requests failed.", failures)
+
     return app
 
 
@@ -139,6 +174,27 @@ main = typer.Typer(
     rich_markup_mode="rich",
 )
 
+
+@main.callback()
+def callback(
+    ctx: typer.Context,
+    profile: bool = False,  # noqa: FBT001, FBT002
+    profile_output: Optional[str] = None,  # noqa: UP045
+) -> None:
+    """
+    Find vulnerabilities, licenses and upgrades for packages using https://deps.dev and OSV.
+
+    --profile prints per-stage wall and CPU time and the event loop lag to stderr at the end,
+    --profile-output also writes a cProfile dump (*.prof) or collapsed stacks for flamegraph tools
+    (any other name), and implies --profile.
+    """
+    if profile or profile_output is not None:
+        from depsdev import profiling
+
+        profiling.enable(profile_output)
+        ctx.call_on_close(profiling.finish)
+
+
 main.add_typer(
     create_app(),
     name="api",
@@ -159,9 +215,330 @@ def purl(filename: str) -> None:
 main.command(name="vuln", rich_help_panel="Utils")(to_sync()(main_helper))
 
 
+@main.command(rich_help_panel="Utils")
+def serve(
+    socket: Optional[str] = None,  # noqa: UP045
+    ttl: float = 300.0,
+    concurrency: Optional[int] = None,  # noqa: UP045
+) -> None:
+    """
+    Run a daemon that keeps API connections and responses warm.
+
+    While it is running, other depsdev commands on this machine route their requests through it.
+    Set DEPSDEV_NO_DAEMON=1 to bypass it. At most --concurrency upstream requests (default 32 or
+    DEPSDEV_CONCURRENCY) are in flight, three quarters of them for bulk requests.
+
+    Example usage:
+        depsdev serve &
+        depsdev report requirements.txt
+    """
+    import asyncio
+
+    from depsdev.daemon import Daemon
+    from depsdev.daemon import socket_path
+    from depsdev.scheduler import Scheduler
+
+    path = socket or socket_path()
+    print(f"Listening on {path}", file=sys.stderr)
+    scheduler = Scheduler() if concurrency is None else Scheduler.sized(concurrency)
+    asyncio.run(Daemon(ttl=ttl, scheduler=scheduler).serve(path))
+
+
+cache = typer.Typer(
+    name="cache",
+    no_args_is_help=True,
+    help="Prefetch, export and import the shared response store used by DEPSDEV_SHARED.",
+)
+main.add_typer(cache, name="cache", rich_help_panel="Utils")
+
+
+@cache.command(name="warm")
+@to_sync()
+async def cache_warm(
+    sources: list[str],
+    store: Optional[str] = None,  # noqa: UP045
+    ttl: float = 7 * 24 * 3600.0,
+    concurrency: int = 16,
+) -> None:
+    """
+    Prefetch everything a later `report` needs: advisories, versions and dependency graphs.
+
+    Example usage:
+        depsdev cache warm requirements.txt package-lock.json
+        depsdev cache export depsdev-cache.jsonl.gz
+    """
+    from depsdev.cli.cache import warm
+    from depsdev.shared import SharedStore
+    from depsdev.shared import default_store_path
+    from depsdev.shared import store_path
+
+    shared = SharedStore(store or store_path() or default_store_path(), rate=0, ttl=ttl)
+    count = await warm(sources, shared, concurrency=concurrency)
+    print(f"Warmed {count} packages into {shared.path}", file=sys.stderr)
+
+
+@cache.command(name="export")
+def cache_export(
+    filename: str,
+    store: Optional[str] = None,  # noqa: UP045
+) -> None:
+    """
+    Write the cached responses to a single compressed bundle.
+
+    Example usage:
+        depsdev cache export depsdev-cache.jsonl.gz
+    """
+    from depsdev.cli.cache import export_bundle
+    from depsdev.shared import SharedStore
+    from depsdev.shared import default_store_path
+    from depsdev.shared import store_path
+
+    shared = SharedStore(store or store_path() or default_store_path())
+    count = export_bundle(shared, filename)
+    print(f"Exported {count} responses to {filename}", file=sys.stderr)
+
+
+@cache.command(name="import")
+def cache_import(
+    filename: str,
+    store: Optional[str] = None,  # noqa: UP045
+) -> None:
+    """
+    Load a bundle written by `depsdev cache export`, e.g. on a runner without network access.
+
+    Example usage:
+        depsdev cache import depsdev-cache.jsonl.gz
+        DEPSDEV_OFFLINE=1 depsdev report requirements.txt
+    """
+    from depsdev.cli.cache import import_bundle
+    from depsdev.shared import SharedStore
+    from depsdev.shared import default_store_path
+    from depsdev.shared import store_path
+
+    shared = SharedStore(store or store_path() or default_store_path())
+    count = import_bundle(shared, filename)
+    print(f"Imported {count} responses into {shared.path}", file=sys.stderr)
+
+
+@main.command(rich_help_panel="Utils")
+@to_sync()
+async def identify(  # noqa: PLR0913, PLR0917
+    path: str,
+    hash_type: HashType = HashType.SHA1,
+    jobs: Optional[int] = None,  # noqa: UP045
+    concurrency: int = 16,
+    all_files: bool = False,  # noqa: FBT001, FBT002
+    expand: bool = False,  # noqa: FBT001, FBT002
+) -> None:
+    """
+    Identify vendored artifacts (jars, wheels, tarballs, ...) by their content hash.
+
+    PATH may be a directory, which is walked and hashed across a process pool, or a single
+    artifact, which is hashed as a whole. With --expand, a zip/tar archive PATH is also opened and
+    its members are hashed without extracting them. Identical files are looked up once.
+
+    Example usage:
+        depsdev identify vendor/
+        depsdev identify libs/guava-33.0.0-jre.jar
+        depsdev identify --expand --hash-type SHA256 dist/bundle.tar.gz
+    """
+    from depsdev.cli.identify import identify_helper
+
+    await identify_helper(
+        path,
+        hash_type,
+        jobs=jobs,
+        concurrency=concurrency,
+        include_all=all_files,
+        expand=expand,
+    )
+
+
+@main.command(rich_help_panel="Utils")
+@to_sync()
+async def image(filename: str, concurrency: int = 16) -> None:
+    """
+    Find the base image of a container image tarball.
+
+    Accepts the output of `docker save` (or an OCI image layout tarball, or - for stdin). Layers are
+    streamed without being extracted, their OCI chain IDs are computed and looked up on deps.dev.
+
+    Example usage:
+        depsdev image image.tar
+        docker save python:3.12-slim | depsdev image -
+    """
+    from depsdev.cli.image import image_helper
+
+    await image_helper(filename, concurrency=concurrency)
+
+
+@main.command(rich_help_panel="Utils")
+@to_sync()
+async def diff(
+    system: System,
+    name: str,
+    old: str,
+    new: str,
+    concurrency: int = 16,
+) -> None:
+    """
+    Show what changes in the resolved dependency graph when upgrading a package.
+
+    Lists added, removed and re-versioned dependencies, edge changes and advisories that the new
+    version brings in. Subgraphs that are identical in both versions are skipped by fingerprint.
+
+    Example usage:
+        depsdev diff NPM react 17.0.2 18.2.0
+    """
+    from depsdev.cli.diff import diff_helper
+
+    await diff_helper(system, name, old, new, concurrency=concurrency)
+
+
+@main.command(rich_help_panel="Utils")
+@to_sync()
+async def typosquat(
+    sources: list[str],
+    popular: Optional[str] = None,  # noqa: UP045
+    concurrency: int = 16,
+) -> None:
+    """
+    Screen the packages of manifests or purls for possible typosquats.
+
+    With --popular (a file of "name" or "SYSTEM name" lines), names that are popular themselves or
+    not within a couple of edits of a popular name are cleared locally. Only the rest are checked
+    against deps.dev's similarly named packages.
+
+    Example usage:
+        depsdev typosquat requirements.txt --popular top-pypi.txt
+        depsdev typosquat pkg:npm/raect
+    """
+    from depsdev.cli.typosquat import typosquat_helper
+
+    await typosquat_helper(sources, popular=popular, concurrency=concurrency)
+
+
+@main.command(rich_help_panel="Utils")
+@to_sync()
+async def fix(sources: list[str], concurrency: int = 16) -> None:
+    """
+    Plan the smallest upgrade that clears all known advisories of each vulnerable package.
+
+    Version lists are fetched once per package and ordered the way the ecosystem orders them, the
+    OSV ranges are then resolved with binary searches instead of per candidate API calls.
+
+    Example usage:
+        depsdev fix requirements.txt
+        depsdev fix package-lock.json services/*/poetry.lock
+    """
+    from depsdev.cli.fix import fix_helper
+
+    await fix_helper(sources, concurrency=concurrency)
+
+
+@main.command(rich_help_panel="Utils")
+@to_sync()
+async def freshness(
+    sources: list[str],
+    format: OutputFormat = OutputFormat.RICH,  # noqa: A002
+    concurrency: int = 16,
+) -> None:
+    """
+    Show how many releases and libyears each dependency is behind its latest version.
+
+    Version lists are fetched concurrently, once per package across all manifests, and each
+    manifest is reported as soon as it is done.
+
+    Example usage:
+        depsdev freshness requirements.txt
+        depsdev freshness --format jsonl services/*/package-lock.json > freshness.jsonl
+    """
+    from depsdev.cli.freshness import freshness_helper
+
+    await freshness_helper(sources, format=format, concurrency=concurrency)
+
+
+@main.command(rich_help_panel="Utils")
+@to_sync()
+async def verify(
+    sources: list[str],
+    format: OutputFormat = OutputFormat.RICH,  # noqa: A002
+    concurrency: int = 16,
+) -> None:
+    """
+    Check the artifact hashes pinned by lockfiles against the package versions deps.dev knows.
+
+    Every distinct hash is looked up once, concurrently. Exits with 1 when a hash belongs to a
+    different package or version than the one declared next to it.
+
+    Example usage:
+        depsdev verify Pipfile.lock
+        depsdev verify --format jsonl poetry.lock package-lock.json > integrity.jsonl
+    """
+    from depsdev.cli.integrity import verify_helper
+
+    mismatched = await verify_helper(sources, format=format, concurrency=concurrency)
+    if mismatched:
+        raise SystemExit(1)
+
+
+@main.command(name="blast-radius", rich_help_panel="Utils")
+@to_sync()
+async def blast_radius(advisory_id: str, top: int = 20, concurrency: int = 16) -> None:
+    """
+    Rank the versions an advisory affects by how many packages depend on them.
+
+    The affected ranges are resolved against each package's version list, then the dependents of
+    every affected version are counted concurrently.
+
+    Example usage:
+        depsdev blast-radius GHSA-jfh8-c2jp-5v3q
+        depsdev blast-radius PYSEC-2024-60 --top 50
+    """
+    from depsdev.cli.blast import blast_radius_helper
+
+    await blast_radius_helper(advisory_id, top=top, concurrency=concurrency)
+
+
+@main.command(rich_help_panel="Utils")
+@to_sync()
+async def licenses(
+    sources: list[str],
+    allow: Optional[list[str]] = None,  # noqa: UP045
+    deny: Optional[list[str]] = None,  # noqa: UP045
+    format: OutputFormat = OutputFormat.RICH,  # noqa: A002
+    concurrency: int = 8,
+) -> None:
+    """
+    Audit the licenses of every package of manifests or purls against an allow/deny policy.
+
+    Purls are resolved through the purl batch endpoint in parallel chunks, each distinct license
+    expression is judged once. Exits with 1 when any package is denied.
+
+    Example usage:
+        depsdev licenses requirements.txt --deny GPL-3.0-only,AGPL-3.0-only
+        depsdev licenses bom.json --allow MIT --allow Apache-2.0 --allow BSD-3-Clause
+        depsdev licenses --format jsonl package-lock.json > licenses.jsonl
+    """
+    from depsdev.cli.licenses import licenses_helper
+
+    denied = await licenses_helper(
+        sources, allow or [], deny or [], format=format, concurrency=concurrency
+    )
+    if denied:
+        raise SystemExit(1)
+
+
 @main.command()
 @to_sync()
-async def report(filename: str) -> None:
+async def report(  # noqa: PLR0913, PLR0917
+    filename: str,
+    jobs: int = 1,
+    shard: Optional[str] = None,  # noqa: UP045
+    format: OutputFormat = OutputFormat.RICH,  # noqa: A002
+    database: Optional[str] = None,  # noqa: UP045
+    health: bool = False,  # noqa: FBT001, FBT002
+) -> None:
     """
     Show vulnerabilities for packages in a file.
 
@@ -169,11 +546,17 @@ async def report(filename: str) -> None:
         depsdev report requirements.txt
         depsdev report pom.xml
         depsdev report Pipfile.lock
+        depsdev report image.cdx.json
+        depsdev report --jobs 8 bom.json
+        depsdev report --shard 2/4 bom.json
+        depsdev report --format sarif package-lock.json > depsdev.sarif
+        depsdev report --database findings.db poetry.lock
+        depsdev report --health package-lock.json
     """
-    filename = os.path.abspath(filename)
-    extractor = get_extractor(filename)
-    packages = extractor.extract(filename)
-    await main_helper([x.to_string() for x in packages])
+    get_extractor(filename)  # Fail early on unsupported files.
+    await main_helper(
+        [filename], jobs=jobs, shard=shard, format=format, database=database, health=health
+    )
 
 
 if __name__ == "__main__":
@@ -8,7 +8,18 @@ from urllib.parse import quote
 
 import httpx
 
+from depsdev.daemon import DaemonTransport
+from depsdev.daemon import discover
+from depsdev.jsonstream import aiter_items
+from depsdev.profiling import stage
+from depsdev.scheduler import Scheduler
+from depsdev.scheduler import scheduler
+from depsdev.shared import SharedStore
+from depsdev.shared import SharedTransport
+
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from httpx._types import QueryParamTypes
     from typing_extensions import Literal
 
@@ -17,14 +28,38 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def default_transport() -> httpx.AsyncBaseTransport | None:
+    """
+    Route through a running daemon if there is one, and through the shared store if enabled.
+    """
+    transport = discover()
+    store = SharedStore.from_env()
+    if store is None:
+        return transport
+    return SharedTransport(store, transport)
+
+
+def default_scheduler() -> Scheduler:
+    """
+    The process wide scheduler, so that all clients share the same priority classes.
+    """
+    return scheduler
+
+
 @dataclass
 class BaseClient:
     base_url: str
     timeout: float = 5.0
     client: httpx.AsyncClient = field(init=False, repr=False)
+    transport: httpx.AsyncBaseTransport | None = field(
+        default_factory=default_transport, repr=False
+    )
+    scheduler: Scheduler = field(default_factory=default_scheduler, repr=False)
 
     def __post_init__(self) -> None:
-        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url, timeout=self.timeout, transport=self.transport
+        )
 
     async def _requests(
         self,
@@ -34,13 +69,49 @@ class BaseClient:
         json: object | None = None,
     ) -> Incomplete:
         logger.info(locals())
-        response = await self.client.request(method=method, url=url, params=params, json=json)
+        async with self.scheduler.slot():
+            response = await self.client.request(method=method, url=url, params=params, json=json)
         if not response.is_success:
             logger.error(
                 "Request failed with status code %s: %s", response.status_code, response.text
             )
             response.raise_for_status()
-        return response.json()
+        with stage("decode"):
+            return response.json()
+
+    async def _stream_items(
+        self,
+        prefixes: list[str],
+        url: str = "",
+        method: Literal["GET", "POST"] = "GET",
+        params: QueryParamTypes | None = None,
+        json: object | None = None,
+    ) -> AsyncIterator[tuple[str, Incomplete]]:
+        """
+        Like `_requests`, but yield the values at `prefixes` while the body is still downloading.
+        """
+        logger.info(locals())
+        # The slot is held until the body has been read, as the connection is busy until then.
+        async with self.scheduler.slot():
+            stream = self.client.stream(method=method, url=url, params=params, json=json)
+            async with stream as response:
+                if not response.is_success:
+                    await response.aread()
+                    logger.error(
+                        "Request failed with status code %s: %s",
+                        response.status_code,
+                        response.text,
+                    )
+                    response.raise_for_status()
+                async for item in aiter_items(response.aiter_bytes(), prefixes):
+                    yield item
+
+    @property
+    def caches_responses(self) -> bool:
+        """
+        Whether responses are cached by request body, in the shared store or in a daemon.
+        """
+        return isinstance(self.transport, (SharedTransport, DaemonTransport))
 
     @staticmethod
     def url_escape(string: str) -> str:
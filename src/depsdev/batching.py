@@ -0,0 +1,211 @@
+"""
+Adaptive sizing for the batch endpoints (OSV querybatch, v3alpha version and purl batches).
+
+Batch size and the number of batches in flight follow additive-increase/multiplicative-decrease,
+like TCP congestion control: every batch that comes back within the latency target grows the batch
+by a fixed step and the window by one batch per round trip. A slow batch shrinks the next ones to
+what fits the target at the observed per-item latency. A timeout, 429 or 5xx halves both, and the
+batch is split up and retried.
+
+When responses are cached by request body (shared store, daemon), the chunk boundaries have to be
+the same on every run, or a later run misses what an earlier one cached. A `fixed` batcher keeps
+the size it started with, retries failed chunks whole, and only adapts the window.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+from typing import Generic
+from typing import TypeVar
+
+import httpx
+
+from depsdev import profiling
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Callable
+    from collections.abc import Sequence
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Weight of the newest sample in the smoothed latency.
+SMOOTHING = 0.2
+
+
+def is_overload(error: BaseException) -> bool:
+    """
+    Whether the failure of a batch suggests it was too large or too many were in flight.
+    """
+    if isinstance(error, httpx.TimeoutException):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500  # noqa: PLR2004
+    return False
+
+
+@dataclass
+class AdaptiveBatcher:
+    """
+    Batch size and in-flight batches for one endpoint, tuned from every batch that completes.
+
+    The default `target` leaves headroom below the clients' 5 s timeout. With `fixed`, only the
+    window adapts and every chunk is cut at `size`.
+    """
+
+    name: str = "batch"
+    size: int = 500
+    min_size: int = 10
+    max_size: int = 1000
+    window: float = 4.0
+    max_window: int = 16
+    target: float = 2.0
+    increase: int = 50
+    retries: int = 3
+    fixed: bool = False
+    batches: int = 0
+    failures: int = 0
+    items: int = 0
+    latency: float | None = None
+    busy: float = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return max(1, int(self.window))
+
+    def success(self, size: int, latency: float) -> None:
+        self.batches += 1
+        self.items += size
+        self.busy += latency
+        self.latency = (
+            latency
+            if self.latency is None
+            else (1 - SMOOTHING) * self.latency + SMOOTHING * latency
+        )
+        if self.fixed:
+            if latency <= self.target:
+                self.window = min(self.max_window, self.window + 1 / self.window)
+            return
+        if latency > self.target:
+            per_item = latency / max(size, 1)
+            self.size = min(self.size, int(self.target / per_item))
+        else:
+            self.size += self.increase
+            self.window = min(self.max_window, self.window + 1 / self.window)
+        self.size = max(self.min_size, min(self.max_size, self.size))
+
+    def failure(self, size: int) -> None:
+        self.failures += 1
+        if not self.fixed:
+            self.size = max(self.min_size, min(self.size, size) // 2)
+        self.window = max(1.0, self.window / 2)
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "batch_size": self.size,
+            "in_flight": self.in_flight,
+            "batches": self.batches,
+            "failures": self.failures,
+            "items": self.items,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 1),
+            "items_per_second": round(self.items / self.busy, 1) if self.busy else None,
+        }
+
+
+@dataclass
+class BatchRun(Generic[T, R]):
+    items: Sequence[T]
+    fetch: Callable[[list[T]], AsyncIterator[R]]
+    batcher: AdaptiveBatcher
+    queue: asyncio.Queue[R | None] = field(default_factory=asyncio.Queue)
+    # Chunks handed back after an overload, with their attempt count.
+    retry: deque[tuple[list[T], int]] = field(default_factory=deque)
+    cursor: int = 0
+
+    def take(self) -> tuple[list[T], int] | None:
+        size = self.batcher.size
+        if self.retry:
+            chunk, attempt = self.retry.popleft()
+            if len(chunk) > size:
+                self.retry.appendleft((chunk[size:], attempt))
+                chunk = chunk[:size]
+            return chunk, attempt
+        if self.cursor >= len(self.items):
+            return None
+        chunk = list(self.items[self.cursor : self.cursor + size])
+        self.cursor += len(chunk)
+        return chunk, 0
+
+    async def run(self, chunk: list[T], attempt: int) -> None:
+        started = time.perf_counter()
+        produced = False
+        try:
+            async for result in self.fetch(chunk):
+                produced = True
+                await self.queue.put(result)
+        except Exception as e:
+            if produced or attempt >= self.batcher.retries or not is_overload(e):
+                raise
+            self.batcher.failure(len(chunk))
+            logger.warning(
+                "%s of %s items failed (%s), retrying at %s.",
+                self.batcher.name,
+                len(chunk),
+                e,
+                self.batcher.size,
+            )
+            self.retry.append((chunk, attempt + 1))
+            return
+        self.batcher.success(len(chunk), time.perf_counter() - started)
+
+    async def run_all(self) -> None:
+        running: set[asyncio.Future[None]] = set()
+        try:
+            while True:
+                while len(running) < self.batcher.in_flight and (job := self.take()) is not None:
+                    running.add(asyncio.ensure_future(self.run(*job)))
+                if not running:
+                    return
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                # Retrieve every error of the round, not only the one that is raised.
+                errors = [x for x in (task.exception() for task in done) if x is not None]
+                if errors:
+                    raise errors[0]
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            logger.info("%s: %s", self.batcher.name, self.batcher.metrics())
+            profiling.record(self.batcher.name, self.batcher.metrics())
+            await self.queue.put(None)
+
+
+async def iter_batches(
+    items: Sequence[T],
+    fetch: Callable[[list[T]], AsyncIterator[R]],
+    batcher: AdaptiveBatcher,
+) -> AsyncIterator[R]:
+    """
+    Yield the results of `fetch` over `items` in chunks, in completion order.
+
+    Chunks are cut at the batcher's current size when they are started. A chunk that fails with an
+    overload error before yielding anything is handed back, split at the reduced size, and retried.
+    """
+    batches = BatchRun(items, fetch, batcher)
+    producer = asyncio.ensure_future(batches.run_all())
+    try:
+        while (item := await batches.queue.get()) is not None:
+            yield item
+        await producer  # Surface the error that ended the run early, if any.
+    finally:
+        producer.cancel()
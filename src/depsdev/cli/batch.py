@@ -0,0 +1,133 @@
+"""
+Run many API calls from JSON Lines in one process:
+
+    {"method": "get-version", "params": {"system": "PYPI", "name": "idna", "version": "3.6"}}
+
+Every request gets one output line, `{"id", "method", "result"}` or `{"id", "method", "error"}`.
+When `id` is omitted the 0-based position of the request in the input is used.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import sys
+from typing import IO
+from typing import TYPE_CHECKING
+
+import httpx
+
+from depsdev.scheduler import Priority
+from depsdev.scheduler import priority
+from depsdev.v3 import HashType
+from depsdev.v3 import System
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Coroutine
+
+    from depsdev.v3 import DepsDevClientV3
+    from depsdev.v3 import Incomplete
+
+logger = logging.getLogger(__name__)
+
+# Typer does this conversion for the single call commands.
+ENUM_PARAMS: dict[str, type[HashType | System]] = {"system": System, "hash_type": HashType}
+
+
+def resolve_method(
+    client: DepsDevClientV3, name: str
+) -> Callable[..., Coroutine[object, object, Incomplete]]:
+    name = name.replace("-", "_")
+    method = getattr(client, name, None)
+    if name.startswith("_") or not inspect.iscoroutinefunction(method):
+        msg = f"Unknown method {name!r}"
+        raise ValueError(msg)
+    return method
+
+
+async def call(client: DepsDevClientV3, index: int, line: str) -> dict[str, object]:
+    result: dict[str, object] = {"id": index}
+    try:
+        request = json.loads(line)
+        result["id"] = request.get("id", index)
+        result["method"] = request["method"]
+        params = dict(request.get("params") or {})
+        for key, enum in ENUM_PARAMS.items():
+            if params.get(key) is not None:
+                params[key] = enum(str(params[key]).upper())
+        result["result"] = await resolve_method(client, request["method"])(**params)
+    except httpx.HTTPStatusError as e:
+        result["error"] = {"status": e.response.status_code, "message": e.response.text}
+    except Exception as e:  # noqa: BLE001  Every request gets its line, whatever went wrong.
+        result["error"] = {"message": f"{type(e).__name__}: {e}"}
+    return result
+
+
+async def run_batch(
+    client: DepsDevClientV3,
+    stream: IO[str],
+    out: IO[str] = sys.stdout,
+    concurrency: int = 16,
+    *,
+    ordered: bool = False,
+) -> int:
+    """
+    Run every request of `stream` on `client` and write the results to `out`, return the failures.
+
+    At most `concurrency` requests are in flight, reading is paused while the limit is reached.
+    Results are written as they complete, or in input order with `ordered`, where the results held
+    back count against the limit. The requests run in the bulk priority class, so interactive
+    lookups of the same process or daemon go first.
+    """
+    # The bulk cap of the scheduler must not undercut `concurrency`.
+    client.scheduler.fit(concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    done: dict[int, dict[str, object]] = {}
+    tasks: set[asyncio.Task[None]] = set()
+    next_index = 0
+    failures = 0
+
+    def emit(result: dict[str, object]) -> None:
+        nonlocal failures
+        failures += "error" in result
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+    def finish(index: int, result: dict[str, object]) -> None:
+        nonlocal next_index
+        if not ordered:
+            semaphore.release()
+            emit(result)
+            return
+        # A result waiting for an earlier one keeps its slot until it is written, so no more than
+        # `concurrency` results are ever buffered behind a slow request.
+        done[index] = result
+        while next_index in done:
+            emit(done.pop(next_index))
+            next_index += 1
+            semaphore.release()
+
+    async def run(index: int, line: str) -> None:
+        try:
+            with priority(Priority.BULK, caller="batch"):
+                result = await call(client, index, line)
+        except BaseException as e:
+            # Even a cancelled request gets its line, later results must not wait for it forever.
+            finish(index, {"id": index, "error": {"message": f"{type(e).__name__}: {e}"}})
+            raise
+        finish(index, result)
+
+    index = 0
+    while line := await asyncio.to_thread(stream.readline):
+        if not line.strip():
+            continue
+        await semaphore.acquire()
+        task = asyncio.create_task(run(index, line))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        index += 1
+    await asyncio.gather(*tasks)
+    return failures
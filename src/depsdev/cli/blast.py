@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+import httpx
+from rich.console import Console
+from rich.table import Table
+
+from depsdev.cli.fix import VersionCache
+from depsdev.osv import OSVClientV1
+from depsdev.v3alpha import DepsDevClientV3Alpha
+from depsdev.versions import OSV_ECOSYSTEMS
+
+if TYPE_CHECKING:
+    from depsdev.osv import OSVVulnerability
+    from depsdev.v3 import System
+
+logger = logging.getLogger(__name__)
+
+SYSTEMS = {ecosystem: system for system, ecosystem in OSV_ECOSYSTEMS.items()}
+
+
+@dataclass
+class Impact:
+    system: System
+    name: str
+    version: str
+    dependents: int = 0
+    direct: int = 0
+    indirect: int = 0
+
+
+@dataclass
+class DependentsCache:
+    """
+    One `get_dependents` call per version, with at most `concurrency` in flight.
+    """
+
+    client: DepsDevClientV3Alpha = field(default_factory=DepsDevClientV3Alpha)
+    concurrency: int = 16
+    tasks: dict[tuple[System, str, str], asyncio.Task[Impact]] = field(default_factory=dict)
+    semaphore: asyncio.Semaphore = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def fetch(self, system: System, name: str, version: str) -> Impact:
+        impact = Impact(system, name, version)
+        async with self.semaphore:
+            try:
+                result = await self.client.get_dependents(system, name, version)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:  # noqa: PLR2004
+                    return impact
+                raise
+        impact.dependents = result.get("dependentCount", 0)  # type: ignore[attr-defined]
+        impact.direct = result.get("directDependentCount", 0)  # type: ignore[attr-defined]
+        impact.indirect = result.get("indirectDependentCount", 0)  # type: ignore[attr-defined]
+        return impact
+
+    def get(self, system: System, name: str, version: str) -> asyncio.Task[Impact]:
+        key = (system, name, version)
+        if key not in self.tasks:
+            self.tasks[key] = asyncio.ensure_future(self.fetch(system, name, version))
+        return self.tasks[key]
+
+
+def affected_packages(vuln: OSVVulnerability) -> list[tuple[System, str]]:
+    packages: dict[tuple[System, str], None] = {}
+    for affected in vuln.get("affected", []):
+        package = affected.get("package", {})
+        system = SYSTEMS.get(package.get("ecosystem", "").split(":")[0])
+        if system is not None and package.get("name"):
+            packages[system, package["name"]] = None
+    return list(packages)
+
+
+async def affected_versions(
+    vuln: OSVVulnerability, versions: VersionCache
+) -> list[tuple[System, str, str]]:
+    """
+    Every published version inside the affected ranges or lists of `vuln`, in ecosystem order.
+    """
+    packages = affected_packages(vuln)
+    indexes = await asyncio.gather(*(versions.get(system, name) for system, name in packages))
+    result: list[tuple[System, str, str]] = []
+    for (system, name), index in zip(packages, indexes):
+        if index is None:
+            logger.warning("%s %s is not known to deps.dev.", system, name)
+            continue
+        covered = {i for lo, hi in index.affected_spans(vuln, name) for i in range(lo, hi)}
+        result.extend((system, name, index.versions[i]) for i in sorted(covered))
+    return result
+
+
+async def blast_radius(
+    vuln: OSVVulnerability,
+    versions: VersionCache | None = None,
+    dependents: DependentsCache | None = None,
+) -> list[Impact]:
+    """
+    Affected versions ranked by how many packages depend on them.
+    """
+    versions = versions or VersionCache()
+    dependents = dependents or DependentsCache()
+    keys = await affected_versions(vuln, versions)
+    impacts = await asyncio.gather(*(dependents.get(*key) for key in keys))
+    return sorted(impacts, key=lambda x: (-x.dependents, -x.direct))
+
+
+async def blast_radius_helper(advisory_id: str, top: int = 20, concurrency: int = 16) -> int:
+    console = Console()
+    try:
+        vuln = await OSVClientV1().get_vuln(advisory_id)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:  # noqa: PLR2004
+            logger.error("Advisory %s not found.", advisory_id)  # noqa: TRY400
+            raise SystemExit(1) from None
+        raise
+    impacts = await blast_radius(
+        vuln,
+        VersionCache(concurrency=concurrency),
+        DependentsCache(concurrency=concurrency),
+    )
+
+    table = Table(title=f"{vuln['id']}: {vuln.get('summary', '')}")
+    table.add_column("System")
+    table.add_column("Package")
+    table.add_column("Version", style="magenta")
+    table.add_column("Dependents", style="red", justify="right")
+    table.add_column("Direct", justify="right")
+    table.add_column("Indirect", justify="right")
+    for impact in impacts[:top]:
+        table.add_row(
+            str(impact.system),
+            impact.name,
+            impact.version,
+            str(impact.dependents),
+            str(impact.direct),
+            str(impact.indirect),
+        )
+    console.print(table)
+    console.print(
+        f"{len(impacts)} affected versions with {sum(x.dependents for x in impacts)} dependents "
+        f"({sum(x.direct for x in impacts)} direct)."
+    )
+    return 0
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+from typing import TYPE_CHECKING
+
+import httpx
+
+from depsdev.cli.purl import iter_purls
+from depsdev.cli.purl import to_version_key
+from depsdev.cli.vuln import get_vulns
+from depsdev.daemon import discover
+from depsdev.osv import OSVClientV1
+from depsdev.shared import SharedTransport
+from depsdev.v3 import DepsDevClientV3
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from collections.abc import Iterator
+
+    from depsdev.shared import SharedStore
+    from depsdev.v3 import System
+
+logger = logging.getLogger(__name__)
+
+
+async def warm(
+    sources: list[str],
+    store: SharedStore,
+    concurrency: int = 16,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> int:
+    """
+    Fetch everything `report`/`vuln` needs for `sources` into the store, return the purl count.
+
+    Each source is queried exactly like `depsdev report <source>` would, so the batch query
+    bodies (and therefore the cache keys) match. Package, version and dependency graph
+    responses are fetched too.
+    """
+    transport = transport or discover()
+    osv_client = OSVClientV1(transport=SharedTransport(store, transport))
+    client = DepsDevClientV3(transport=SharedTransport(store, transport))
+    keys: set[tuple[System, str, str]] = set()
+    count = 0
+    for source in sources:
+        purls = list(dict.fromkeys(iter_purls([source])))
+        count += len(purls)
+        await get_vulns(purls, osv_client)
+        keys.update(key for key in map(to_version_key, purls) if key is not None)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(request: Awaitable[object]) -> None:
+        async with semaphore:
+            try:
+                await request
+            except httpx.HTTPStatusError as e:
+                # deps.dev does not know every package, nothing to cache then.
+                logger.debug("Skipping %s: %s", e.request.url, e.response.status_code)
+
+    requests: list[Awaitable[object]] = []
+    for system, name in dict.fromkeys((system, name) for system, name, _ in keys):
+        requests.append(client.get_package(system, name))
+    for system, name, version in keys:
+        requests.append(client.get_version(system, name, version))
+        requests.append(client.get_dependencies(system, name, version))
+    await asyncio.gather(*(fetch(x) for x in requests))
+    return count
+
+
+def export_bundle(store: SharedStore, filename: str) -> int:
+    """
+    Write the live responses of the store to a gzip compressed JSON lines bundle.
+    """
+    count = 0
+    with gzip.open(filename, "wt", encoding="utf-8") as f:
+        for key, expires, status, content_type, body in store.rows():
+            row = {
+                "key": key,
+                "expires": expires,
+                "status": status,
+                "content_type": content_type,
+                "body": body.decode("utf-8", "surrogateescape"),
+            }
+            f.write(json.dumps(row) + "\n")
+            count += 1
+    return count
+
+
+def iter_bundle(filename: str) -> Iterator[tuple[str, float, int, str, bytes]]:
+    with gzip.open(filename, "rt", encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            yield (
+                row["key"],
+                row["expires"],
+                row["status"],
+                row["content_type"],
+                row["body"].encode("utf-8", "surrogateescape"),
+            )
+
+
+def import_bundle(store: SharedStore, filename: str) -> int:
+    return store.put_rows(iter_bundle(filename))
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+from rich.table import Table
+
+from depsdev.graphdiff import diff_versions
+
+if TYPE_CHECKING:
+    from depsdev.v3 import System
+
+
+async def diff_helper(system: System, name: str, old: str, new: str, concurrency: int = 16) -> int:
+    console = Console()
+    result = await diff_versions(system, name, old, new, concurrency=concurrency)
+
+    table = Table(title=f"{name} {old} -> {new}")
+    table.add_column("Package")
+    table.add_column("Old", style="magenta")
+    table.add_column("New", style="green")
+    table.add_column("New advisories", style="red")
+    advisories = dict(result.advisories)
+    for package, (old_versions, new_versions) in result.changed.items():
+        labels = [f"{package}@{x}" for x in new_versions]
+        table.add_row(
+            package,
+            ", ".join(old_versions),
+            ", ".join(new_versions),
+            ", ".join(x for label in labels for x in advisories.pop(label, [])),
+        )
+    for label in result.added:
+        package, _, version = label.rpartition("@")
+        if package not in result.changed:
+            table.add_row(package, "", version, ", ".join(advisories.pop(label, [])))
+    for label in result.removed:
+        package, _, version = label.rpartition("@")
+        if package not in result.changed:
+            table.add_row(package, version, "", "")
+    console.print(table)
+    console.print(
+        f"{len(result.added)} nodes added, {len(result.removed)} removed, "
+        f"{len(result.changed)} packages changed version, "
+        f"{len(result.added_edges)} edges added, {len(result.removed_edges)} removed "
+        f"({result.unchanged} nodes in unchanged subgraphs)."
+    )
+    return 0
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+import httpx
+from rich.console import Console
+from rich.table import Table
+
+from depsdev.cli.purl import iter_purls
+from depsdev.cli.purl import to_version_key
+from depsdev.cli.vuln import get_vulns
+from depsdev.osv import OSVClientV1
+from depsdev.v3 import DepsDevClientV3
+from depsdev.versions import VersionIndex
+from depsdev.versions import is_prerelease
+
+if TYPE_CHECKING:
+    from depsdev.osv import OSVVulnerability
+    from depsdev.v3 import System
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Upgrade:
+    purl: str
+    current: str
+    target: str | None
+    advisories: list[str] = field(default_factory=list)
+
+
+@dataclass
+class VersionCache:
+    """
+    One `get_package` call per package, however many manifests and purls refer to it.
+    """
+
+    client: DepsDevClientV3 = field(default_factory=DepsDevClientV3)
+    concurrency: int = 16
+    tasks: dict[tuple[System, str], asyncio.Task[VersionIndex | None]] = field(default_factory=dict)
+    semaphore: asyncio.Semaphore = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def fetch(self, system: System, name: str) -> VersionIndex | None:
+        async with self.semaphore:
+            try:
+                package = await self.client.get_package(system, name)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:  # noqa: PLR2004
+                    return None
+                raise
+        versions = package.get("versions", [])  # type: ignore[attr-defined]
+        return VersionIndex(
+            system,
+            [x["versionKey"]["version"] for x in versions],
+            excluded={x["versionKey"]["version"] for x in versions if x.get("isDeprecated")},
+            published={
+                x["versionKey"]["version"]: x["publishedAt"]
+                for x in versions
+                if x.get("publishedAt")
+            },
+            default=next(
+                (x["versionKey"]["version"] for x in versions if x.get("isDefault")), None
+            ),
+        )
+
+    def get(self, system: System, name: str) -> asyncio.Task[VersionIndex | None]:
+        key = (system, name)
+        if key not in self.tasks:
+            self.tasks[key] = asyncio.ensure_future(self.fetch(system, name))
+        return self.tasks[key]
+
+
+async def plan_upgrade(
+    purl: str, advisories: list[OSVVulnerability], versions: VersionCache
+) -> Upgrade | None:
+    """
+    Smallest upgrade of `purl` outside of the affected ranges of all `advisories` at once.
+    """
+    key = to_version_key(purl)
+    if key is None:
+        return None
+    system, name, current = key
+    index = await versions.get(system, name)
+    upgrade = Upgrade(purl, current, None, [x["id"] for x in advisories])
+    if index is not None:
+        spans = [span for vuln in advisories for span in index.affected_spans(vuln, name)]
+        upgrade.target = index.first_unaffected(
+            spans, current, allow_prerelease=is_prerelease(system, current)
+        )
+    return upgrade
+
+
+async def plan_upgrades(
+    purls: list[str],
+    osv_client: OSVClientV1 | None = None,
+    versions: VersionCache | None = None,
+) -> list[Upgrade]:
+    osv_client = osv_client or OSVClientV1()
+    versions = versions or VersionCache()
+    results = await get_vulns(purls, osv_client)
+    upgrades = await asyncio.gather(
+        *(plan_upgrade(purl, advisories, versions) for purl, advisories in results.items())
+    )
+    return [x for x in upgrades if x is not None]
+
+
+async def fix_helper(sources: list[str], concurrency: int = 16) -> int:
+    console = Console()
+    osv_client = OSVClientV1()
+    versions = VersionCache(concurrency=concurrency)
+    plans = await asyncio.gather(
+        *(
+            plan_upgrades(list(dict.fromkeys(iter_purls([source]))), osv_client, versions)
+            for source in sources
+        )
+    )
+    for source, upgrades in zip(sources, plans):
+        table = Table(title=source)
+        table.add_column("Package")
+        table.add_column("Current", style="magenta")
+        table.add_column("Upgrade to", style="green")
+        table.add_column("Clears", style="cyan")
+        for upgrade in upgrades:
+            table.add_row(
+                upgrade.purl.rsplit("@", 1)[0],
+                upgrade.current,
+                upgrade.target or "no fixed version",
+                ", ".join(upgrade.advisories),
+            )
+        console.print(table)
+    return 0
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sys
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+from rich.table import Table
+
+from depsdev.cli.fix import VersionCache
+from depsdev.cli.output import OutputFormat
+from depsdev.cli.purl import iter_purls
+from depsdev.cli.purl import to_version_key
+from depsdev.freshness import ManifestFreshness
+from depsdev.freshness import measure
+
+if TYPE_CHECKING:
+    from typing import TextIO
+
+logger = logging.getLogger(__name__)
+
+
+async def manifest_freshness(source: str, versions: VersionCache) -> ManifestFreshness:
+    """
+    Freshness of every versioned package of `source`, version lists come from the shared cache.
+    """
+    keys = {
+        purl: key
+        for purl in dict.fromkeys(iter_purls([source]))
+        if (key := to_version_key(purl)) is not None
+    }
+    indexes = await asyncio.gather(
+        *(versions.get(system, name) for system, name, _ in keys.values())
+    )
+    result = ManifestFreshness(source)
+    for (purl, (_, _, current)), index in zip(keys.items(), indexes):
+        if index is not None:
+            result.packages.append(measure(purl, index, current))
+    result.packages.sort(key=lambda x: (-(x.libyears or 0.0), -x.behind))
+    return result
+
+
+def render(console: Console, manifest: ManifestFreshness) -> None:
+    table = Table(title=manifest.source)
+    table.add_column("Package")
+    table.add_column("Current", style="magenta")
+    table.add_column("Latest", style="green")
+    table.add_column("Behind", justify="right")
+    table.add_column("Libyears", style="red", justify="right")
+    for package in manifest.packages:
+        if not package.outdated:
+            continue
+        table.add_row(
+            package.purl.rsplit("@", 1)[0],
+            package.current,
+            package.latest or "-",
+            str(package.behind),
+            "-" if package.libyears is None else f"{package.libyears:.2f}",
+        )
+    console.print(table)
+    console.print(
+        f"{manifest.outdated} of {len(manifest.packages)} packages outdated, "
+        f"{manifest.behind} releases and {manifest.libyears:.2f} libyears behind."
+    )
+
+
+async def freshness_helper(
+    sources: list[str],
+    *,
+    format: OutputFormat = OutputFormat.RICH,  # noqa: A002
+    concurrency: int = 16,
+    versions: VersionCache | None = None,
+    out: TextIO | None = None,
+) -> int:
+    """
+    Report every manifest as soon as its packages are measured, manifests share one version cache.
+    """
+    if format not in (OutputFormat.RICH, OutputFormat.JSONL):
+        logger.error("Unsupported format for freshness: %s", format)
+        raise SystemExit(1)
+    out = out or sys.stdout
+    console = Console(file=out if format == OutputFormat.RICH else sys.stderr)
+    versions = versions or VersionCache(concurrency=concurrency)
+
+    total = ManifestFreshness("total")
+    for future in asyncio.as_completed([manifest_freshness(x, versions) for x in sources]):
+        manifest = await future
+        total.packages.extend(manifest.packages)
+        if format == OutputFormat.JSONL:
+            for package in manifest.packages:
+                row = {
+                    "source": manifest.source,
+                    "purl": package.purl,
+                    "current": package.current,
+                    "latest": package.latest,
+                    "behind": package.behind,
+                    "libyears": package.libyears,
+                }
+                out.write(json.dumps(row) + "\n")
+            out.write(json.dumps(manifest.summary()) + "\n")
+            out.flush()
+        else:
+            render(console, manifest)
+    if len(sources) > 1:
+        console.print(
+            f"Total: {total.outdated} of {len(total.packages)} packages outdated, "
+            f"{total.libyears:.2f} libyears behind, {len(versions.tasks)} version lists fetched."
+        )
+    return 0
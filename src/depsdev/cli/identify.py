@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import tarfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from typing import IO
+from typing import TYPE_CHECKING
+
+import httpx
+from rich.console import Console
+from rich.table import Table
+
+from depsdev.v3 import DepsDevClientV3
+from depsdev.v3 import HashType
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+ARTIFACT_SUFFIXES = (
+    ".jar",
+    ".war",
+    ".ear",
+    ".aar",
+    ".whl",
+    ".egg",
+    ".tar.gz",
+    ".tgz",
+    ".zip",
+    ".gem",
+    ".nupkg",
+    ".crate",
+)
+
+
+@dataclass
+class Artifact:
+    digest: str
+    paths: list[str] = field(default_factory=list)
+    matches: list[str] = field(default_factory=list)
+
+
+def is_artifact(name: str) -> bool:
+    return name.lower().endswith(ARTIFACT_SUFFIXES)
+
+
+def is_archive(path: str) -> bool:
+    return os.path.isfile(path) and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+
+def hash_stream(stream: IO[bytes], algorithm: str) -> str:
+    """
+    Digest a binary stream chunk by chunk and return it base64 encoded, as expected by the API.
+    """
+    digest = hashlib.new(algorithm)
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    while n := stream.readinto(view):  # type: ignore[attr-defined]
+        digest.update(view[:n])
+    return base64.b64encode(digest.digest()).decode()
+
+
+def hash_file(path: str, algorithm: str) -> tuple[str, str]:
+    with open(path, "rb", buffering=0) as f:
+        return path, hash_stream(f, algorithm)
+
+
+def iter_files(root: str, *, include_all: bool = False) -> Iterator[str]:
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if (include_all or is_artifact(filename)) and not os.path.islink(path):
+                yield path
+
+
+def iter_archive_digests(
+    path: str, algorithm: str, *, include_all: bool = False
+) -> Iterator[tuple[str, str]]:
+    """
+    Digest the members of a zip or tar archive without extracting them to disk.
+    """
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and (include_all or is_artifact(info.filename)):
+                    with zf.open(info) as member:
+                        yield f"{path}!{info.filename}", hash_stream(member, algorithm)
+        return
+    with tarfile.open(path, "r|*") as tf:
+        for tarinfo in tf:
+            if tarinfo.isfile() and (include_all or is_artifact(tarinfo.name)):
+                fileobj = tf.extractfile(tarinfo)
+                if fileobj is not None:
+                    yield f"{path}!{tarinfo.name}", hash_stream(fileobj, algorithm)
+
+
+async def iter_digests(
+    target: str,
+    algorithm: str,
+    *,
+    jobs: int | None = None,
+    include_all: bool = False,
+    expand: bool = False,
+) -> AsyncIterator[tuple[str, str]]:
+    """
+    Yield `(path, digest)` pairs as soon as they are computed.
+
+    Files in a directory are hashed across a process pool. A jar, wheel or tarball is an artifact
+    of its own and is hashed as a whole. With `expand`, a `target` archive is also opened and its
+    members are streamed in a worker thread.
+    """
+    if expand and is_archive(target):
+        yield await asyncio.to_thread(hash_file, target, algorithm)
+        for item in await asyncio.to_thread(
+            list, iter_archive_digests(target, algorithm, include_all=include_all)
+        ):
+            yield item
+        return
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = [
+            loop.run_in_executor(pool, hash_file, path, algorithm)
+            for path in iter_files(target, include_all=include_all)
+        ]
+        for future in asyncio.as_completed(futures):
+            yield await future
+
+
+async def lookup(client: DepsDevClientV3, hash_type: HashType, digest: str) -> list[str]:
+    try:
+        result = await client.query(hash_type=hash_type, hash_value=digest)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:  # noqa: PLR2004
+            return []
+        raise
+    keys = (x["version"]["versionKey"] for x in result.get("results", []))  # type: ignore[attr-defined]
+    return [f"{key['system']}:{key['name']}@{key['version']}" for key in keys]
+
+
+async def identify_artifacts(  # noqa: PLR0913
+    target: str,
+    hash_type: HashType = HashType.SHA1,
+    *,
+    client: DepsDevClientV3 | None = None,
+    jobs: int | None = None,
+    concurrency: int = 16,
+    include_all: bool = False,
+    expand: bool = False,
+) -> list[Artifact]:
+    """
+    Hash every artifact under `target` and look each distinct digest up on deps.dev.
+    """
+    client = client or DepsDevClientV3()
+    semaphore = asyncio.Semaphore(concurrency)
+    artifacts: dict[str, Artifact] = {}
+    tasks: list[asyncio.Task[None]] = []
+
+    async def resolve(artifact: Artifact) -> None:
+        async with semaphore:
+            artifact.matches = await lookup(client, hash_type, artifact.digest)
+
+    async for path, digest in iter_digests(
+        target, hash_type.value.lower(), jobs=jobs, include_all=include_all, expand=expand
+    ):
+        artifact = artifacts.get(digest)
+        if artifact is None:
+            artifact = artifacts[digest] = Artifact(digest)
+            tasks.append(asyncio.create_task(resolve(artifact)))
+        artifact.paths.append(path)
+
+    await asyncio.gather(*tasks)
+    # Paths arrive in completion order, sort them so the output is stable between runs.
+    for artifact in artifacts.values():
+        artifact.paths.sort()
+    return sorted(artifacts.values(), key=lambda x: x.paths[0])
+
+
+async def identify_helper(  # noqa: PLR0913
+    target: str,
+    hash_type: HashType = HashType.SHA1,
+    jobs: int | None = None,
+    concurrency: int = 16,
+    *,
+    include_all: bool = False,
+    expand: bool = False,
+) -> int:
+    console = Console()
+    artifacts = await identify_artifacts(
+        target,
+        hash_type,
+        jobs=jobs,
+        concurrency=concurrency,
+        include_all=include_all,
+        expand=expand,
+    )
+    table = Table(title=target)
+    table.add_column("Path")
+    table.add_column(f"{hash_type}", style="dim", no_wrap=True)
+    table.add_column("Package versions", style="cyan")
+    for artifact in artifacts:
+        table.add_row(
+            "\n".join(artifact.paths),
+            artifact.digest,
+            "\n".join(artifact.matches) or "unknown",
+        )
+    console.print(table)
+    identified = sum(1 for x in artifacts if x.matches)
+    console.print(
+        f"Identified {identified} of {len(artifacts)} distinct artifacts "
+        f"({sum(len(x.paths) for x in artifacts)} files)."
+    )
+    return 0
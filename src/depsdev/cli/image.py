@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import sys
+import tarfile
+import zlib
+from dataclasses import dataclass
+from dataclasses import field
+from typing import IO
+from typing import TYPE_CHECKING
+
+import httpx
+from rich.console import Console
+from rich.table import Table
+
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+# JSON documents (manifests, index, image configs) are small, anything bigger is treated as a blob.
+METADATA_LIMIT = 4 * 1024 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class LayerDigest:
+    """
+    Computes the blob digest (as stored) and the diff ID (of the uncompressed tar) in one pass.
+    """
+
+    def __init__(self, head: bytes) -> None:
+        self.blob = hashlib.sha256()
+        self.diff: hashlib._Hash | None = hashlib.sha256()
+        self.decompressor = zlib.decompressobj(wbits=31) if head.startswith(GZIP_MAGIC) else None
+        if head.startswith(ZSTD_MAGIC):
+            self.diff = None  # zstd is not in the standard library, rely on the image config.
+
+    def update(self, chunk: bytes) -> None:
+        self.blob.update(chunk)
+        if self.diff is None:
+            return
+        if self.decompressor is None:
+            self.diff.update(chunk)
+            return
+        while chunk:
+            self.diff.update(self.decompressor.decompress(chunk))
+            if not self.decompressor.eof:
+                break
+            # Concatenated gzip members, start over with whatever is left.
+            chunk = self.decompressor.unused_data
+            self.decompressor = zlib.decompressobj(wbits=31)
+
+    @property
+    def blob_id(self) -> str:
+        return f"sha256:{self.blob.hexdigest()}"
+
+    @property
+    def diff_id(self) -> str | None:
+        return None if self.diff is None else f"sha256:{self.diff.hexdigest()}"
+
+
+@dataclass
+class ImageScan:
+    # Parsed JSON documents keyed by archive member name.
+    documents: dict[str, Any] = field(default_factory=dict)
+    # Diff IDs keyed by both archive member name and blob digest.
+    diff_ids: dict[str, str] = field(default_factory=dict)
+
+    def add(self, name: str, stream: IO[bytes], size: int) -> None:
+        head = stream.read(CHUNK_SIZE)
+        if size <= METADATA_LIMIT and head.lstrip().startswith((b"{", b"[")):
+            head += stream.read()
+            try:
+                self.documents[name] = json.loads(head)
+            except ValueError:
+                logger.debug("Member %s looks like JSON but is not.", name)
+            else:
+                return
+        digest = LayerDigest(head)
+        chunk = head
+        while chunk:
+            digest.update(chunk)
+            chunk = stream.read(CHUNK_SIZE)
+        if digest.diff_id is not None:
+            self.diff_ids[name] = self.diff_ids[digest.blob_id] = digest.diff_id
+
+    def layers(self) -> list[str]:
+        """
+        Ordered diff IDs of the (first) image in the archive.
+
+        Supports both the legacy `docker save` layout (manifest.json) and the OCI image layout
+        (index.json). Falls back to the image config's `rootfs.diff_ids` for layers that could not
+        be decompressed.
+        """
+        manifest = self.documents.get("manifest.json")
+        if isinstance(manifest, list) and manifest:
+            layer_refs = manifest[0]["Layers"]
+            config = self.documents.get(manifest[0]["Config"], {})
+        else:
+            index = self.documents.get("index.json")
+            if not isinstance(index, dict) or not index.get("manifests"):
+                logger.error("Not a docker save or OCI layout archive.")
+                raise SystemExit(1)
+            oci_manifest = self.documents[self.blob_path(index["manifests"][0]["digest"])]
+            layer_refs = [x["digest"] for x in oci_manifest["layers"]]
+            config = self.documents.get(self.blob_path(oci_manifest["config"]["digest"]), {})
+
+        declared: list[str] = config.get("rootfs", {}).get("diff_ids", [])
+        result = []
+        for i, ref in enumerate(layer_refs):
+            diff_id = self.diff_ids.get(ref) or (declared[i] if i < len(declared) else None)
+            if diff_id is None:
+                logger.error("Could not compute the diff ID of layer %s.", ref)
+                raise SystemExit(1)
+            if i < len(declared) and declared[i] != diff_id:
+                logger.warning("Layer %s diff ID does not match the image config.", ref)
+            result.append(diff_id)
+        return result
+
+    @staticmethod
+    def blob_path(digest: str) -> str:
+        algorithm, _, value = digest.partition(":")
+        return f"blobs/{algorithm}/{value}"
+
+
+def scan_image(stream: IO[bytes]) -> ImageScan:
+    """
+    Read an image tarball front to back without seeking or extracting it.
+    """
+    scan = ImageScan()
+    with tarfile.open(fileobj=stream, mode="r|*") as tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            fileobj = tf.extractfile(member)
+            if fileobj is not None:
+                scan.add(member.name, fileobj, member.size)
+    return scan
+
+
+def chain_ids(diff_ids: Iterable[str]) -> Iterator[str]:
+    """
+    ChainID(L0) = DiffID(L0), ChainID(L0|...|Ln) = SHA256(ChainID(L0|...|Ln-1) + " " + DiffID(Ln)).
+    """
+    chain_id = None
+    for diff_id in diff_ids:
+        if chain_id is None:
+            chain_id = diff_id
+        else:
+            chain_id = f"sha256:{hashlib.sha256(f'{chain_id} {diff_id}'.encode()).hexdigest()}"
+        yield chain_id
+
+
+@dataclass
+class Layer:
+    diff_id: str
+    chain_id: str
+    repositories: list[str] = field(default_factory=list)
+
+    def summary(self, limit: int = 5) -> str:
+        result = ", ".join(self.repositories[:limit])
+        if len(self.repositories) > limit:
+            result += f" (+{len(self.repositories) - limit} more)"
+        return result
+
+
+async def query_layers(
+    diff_ids: list[str],
+    client: DepsDevClientV3Alpha | None = None,
+    concurrency: int = 16,
+) -> list[Layer]:
+    client = client or DepsDevClientV3Alpha()
+    semaphore = asyncio.Semaphore(concurrency)
+    layers = [Layer(d, c) for d, c in zip(diff_ids, chain_ids(diff_ids))]
+
+    async def resolve(layer: Layer) -> None:
+        async with semaphore:
+            try:
+                result = await client.query_container_images(layer.chain_id)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:  # noqa: PLR2004
+                    return
+                raise
+        layer.repositories = [x["repository"] for x in result.get("results", [])]  # type: ignore[attr-defined]
+
+    await asyncio.gather(*(resolve(x) for x in layers))
+    return layers
+
+
+def open_image(filename: str) -> contextlib.AbstractContextManager[IO[bytes]]:
+    if filename == "-":
+        # Reading the image must not close the process' stdin.
+        return contextlib.nullcontext(sys.stdin.buffer)
+    return open(filename, "rb")
+
+
+async def image_helper(filename: str, concurrency: int = 16) -> int:
+    console = Console()
+    with open_image(filename) as stream:
+        scan = await asyncio.to_thread(scan_image, stream)
+    layers = await query_layers(scan.layers(), concurrency=concurrency)
+
+    table = Table(title=filename)
+    table.add_column("#", justify="right")
+    table.add_column("Chain ID", style="dim", no_wrap=True)
+    table.add_column("Repositories", style="cyan")
+    for i, layer in enumerate(layers):
+        table.add_row(str(i), layer.chain_id, layer.summary())
+    console.print(table)
+
+    base = next((i for i in reversed(range(len(layers))) if layers[i].repositories), None)
+    if base is None:
+        console.print("No known base image found.")
+    else:
+        console.print(
+            f"Deepest matching base image at layer {base} of {len(layers)}: "
+            f"{layers[base].summary()}"
+        )
+    return 0
@@ -0,0 +1,310 @@
+"""
+Lockfile integrity verification.
+
+Lockfiles pin the hashes of the artifacts they install. Every distinct hash is looked up once with
+deps.dev's query by content hash, concurrently, and the package versions it belongs to are
+compared with the name and version the lockfile declares next to it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+import httpx
+from rich.console import Console
+from rich.table import Table
+
+from depsdev.cli.output import OutputFormat
+from depsdev.cli.purl import PackageLockExtractor
+from depsdev.cli.purl import purl_key
+from depsdev.jsonstream import JSONReader
+from depsdev.jsonstream import iter_chunks
+from depsdev.jsonstream import kvitems
+from depsdev.requirements import logical_lines
+from depsdev.requirements import parse_requirement
+from depsdev.v3 import DepsDevClientV3
+from depsdev.v3 import HashType
+from depsdev.versions import normalize_name
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from typing import TextIO
+
+    from packageurl import PackageURL
+
+    from depsdev.v3 import Incomplete
+    from depsdev.v3 import System
+
+logger = logging.getLogger(__name__)
+
+ALGORITHMS = {x.value.lower(): x for x in HashType}
+TOML_FIELD = re.compile(r'^(name|version|checksum)\s*=\s*"(.*)"\s*$')
+TOML_HASH = re.compile(r'hash\s*=\s*"(\w+):([0-9a-fA-F]+)"')
+REQUIREMENT_HASH = re.compile(r"--hash[=\s]+(\w+):([0-9a-fA-F]+)")
+
+
+@dataclass(frozen=True)
+class Declared:
+    purl: str
+    hash_type: HashType
+    # Base64, the encoding deps.dev expects.
+    value: str
+
+
+def from_hex(purl: PackageURL, algorithm: str, digest: str) -> Declared | None:
+    hash_type = ALGORITHMS.get(algorithm.lower())
+    if hash_type is None:
+        return None
+    try:
+        value = base64.b64encode(bytes.fromhex(digest)).decode()
+    except ValueError:
+        return None
+    return Declared(purl.to_string(), hash_type, value)
+
+
+def from_sri(purl: PackageURL, integrity: str) -> Iterator[Declared]:
+    """
+    Subresource integrity strings as used by npm, e.g. "sha512-<base64> sha1-<base64>".
+    """
+    for token in integrity.split():
+        algorithm, _, value = token.partition("-")
+        hash_type = ALGORITHMS.get(algorithm.lower())
+        if hash_type is None:
+            continue
+        try:
+            base64.b64decode(value, validate=True)
+        except binascii.Error:
+            continue
+        yield Declared(purl.to_string(), hash_type, value)
+
+
+def pipfile_lock_hashes(filename: str) -> Iterator[Declared]:
+    from packageurl import PackageURL
+
+    for section in ("default", "develop"):
+        for name, info in kvitems(iter_chunks(filename), section):
+            version = info.get("version")
+            if not version:
+                continue
+            purl = PackageURL(type="pypi", name=name, version=version.lstrip("="))
+            for entry in info.get("hashes", []):
+                algorithm, _, digest = entry.partition(":")
+                declared = from_hex(purl, algorithm, digest)
+                if declared is not None:
+                    yield declared
+
+
+def package_lock_hashes(filename: str) -> Iterator[Declared]:
+    reader = JSONReader(iter_chunks(filename))
+    seen_packages = False
+    for key in reader.members():
+        if key == "packages":
+            seen_packages = True
+            for path in reader.members():
+                info = reader.value()
+                if path and info.get("version") and info.get("integrity"):
+                    name = info.get("name") or path.rsplit("node_modules/", 1)[-1]
+                    purl = PackageLockExtractor.to_purl(name, info["version"])
+                    yield from from_sri(purl, info["integrity"])
+            return
+        if key == "dependencies" and not seen_packages:
+            for root in reader.members():
+                stack = [(root, reader.value())]
+                while stack:
+                    name, info = stack.pop()
+                    if isinstance(info.get("version"), str) and info.get("integrity"):
+                        purl = PackageLockExtractor.to_purl(name, info["version"])
+                        yield from from_sri(purl, info["integrity"])
+                    stack.extend(info.get("dependencies", {}).items())
+        else:
+            reader.skip()
+
+
+def toml_lock_hashes(filename: str, purl_type: str) -> Iterator[Declared]:
+    """
+    `[[package]]` tables of poetry.lock (`files` hashes) and Cargo.lock (`checksum`).
+    """
+    from packageurl import PackageURL
+
+    package: dict[str, str] = {}
+    digests: list[tuple[str, str]] = []
+
+    def flush() -> Iterator[Declared]:
+        if "name" in package and "version" in package:
+            purl = PackageURL(type=purl_type, name=package["name"], version=package["version"])
+            for algorithm, digest in digests:
+                declared = from_hex(purl, algorithm, digest)
+                if declared is not None:
+                    yield declared
+        package.clear()
+        digests.clear()
+
+    with open(filename, encoding="utf-8") as f:
+        in_package = False
+        for line in f:
+            _line = line.strip()
+            if _line.startswith("[") and not _line.startswith("[package."):
+                yield from flush()
+                in_package = _line == "[[package]]"
+                continue
+            if not in_package:
+                continue
+            match = TOML_FIELD.match(_line)
+            if match is not None and match.group(1) == "checksum":
+                digests.append(("sha256", match.group(2)))
+            elif match is not None:
+                package.setdefault(match.group(1), match.group(2))
+            digests.extend(TOML_HASH.findall(_line))
+    yield from flush()
+
+
+def requirements_hashes(filename: str) -> Iterator[Declared]:
+    from packageurl import PackageURL
+
+    with open(filename, encoding="utf-8") as f:
+        # Backslash continuations carry the --hash options of a requirement.
+        lines = list(logical_lines(f.read()))
+    for line in lines:
+        requirement = None if line.startswith("-") else parse_requirement(line)
+        if requirement is None or requirement.version is None:
+            continue
+        purl = PackageURL(type="pypi", name=requirement.name, version=requirement.version)
+        for algorithm, digest in REQUIREMENT_HASH.findall(line):
+            declared = from_hex(purl, algorithm, digest)
+            if declared is not None:
+                yield declared
+
+
+def iter_declared(filename: str) -> Iterable[Declared]:
+    if filename.endswith("Pipfile.lock"):
+        return pipfile_lock_hashes(filename)
+    if filename.endswith(("package-lock.json", "npm-shrinkwrap.json")):
+        return package_lock_hashes(filename)
+    if filename.endswith("poetry.lock"):
+        return toml_lock_hashes(filename, "pypi")
+    if filename.endswith("Cargo.lock"):
+        return toml_lock_hashes(filename, "cargo")
+    if filename.endswith("requirements.txt"):
+        return requirements_hashes(filename)
+    logger.error("No hashes to verify in %s.", filename)
+    raise SystemExit(1)
+
+
+@dataclass
+class Verdict:
+    declared: Declared
+    # "ok", "mismatch" (the hash belongs to other package versions) or "unknown".
+    status: str
+    matches: list[str] = field(default_factory=list)
+
+
+@dataclass
+class HashLookup:
+    """
+    One query per distinct `(hash_type, value)`, with at most `concurrency` in flight.
+    """
+
+    client: DepsDevClientV3 = field(default_factory=DepsDevClientV3)
+    concurrency: int = 16
+    tasks: dict[tuple[HashType, str], asyncio.Task[list[tuple[System, str, str]]]] = field(
+        default_factory=dict
+    )
+    semaphore: asyncio.Semaphore = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def fetch(self, hash_type: HashType, value: str) -> list[tuple[System, str, str]]:
+        async with self.semaphore:
+            try:
+                result = await self.client.query(hash_type=hash_type, hash_value=value)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:  # noqa: PLR2004
+                    return []
+                raise
+        return [version_key(x["version"]["versionKey"]) for x in result.get("results", [])]  # type: ignore[attr-defined]
+
+    def get(self, hash_type: HashType, value: str) -> asyncio.Task[list[tuple[System, str, str]]]:
+        key = (hash_type, value)
+        if key not in self.tasks:
+            self.tasks[key] = asyncio.ensure_future(self.fetch(hash_type, value))
+        return self.tasks[key]
+
+
+def version_key(key: Incomplete) -> tuple[System, str, str]:
+    from depsdev.v3 import System
+
+    system = System(key["system"])  # type: ignore[index]
+    return system, normalize_name(system, key["name"]), key["version"]  # type: ignore[index]
+
+
+async def verify(declared: Declared, lookup: HashLookup) -> Verdict:
+    key = purl_key(declared.purl)
+    matches = await lookup.get(declared.hash_type, declared.value)
+    if not matches or key is None:
+        return Verdict(declared, "unknown")
+    system, name, version = key
+    expected = (system, normalize_name(system, name), version)
+    status = "ok" if expected in matches else "mismatch"
+    return Verdict(declared, status, [f"{x[1]}@{x[2]}" for x in matches])
+
+
+async def verify_helper(
+    filenames: list[str],
+    *,
+    format: OutputFormat = OutputFormat.RICH,  # noqa: A002
+    concurrency: int = 16,
+    lookup: HashLookup | None = None,
+    out: TextIO | None = None,
+) -> int:
+    """
+    Stream a verdict per declared hash and return the number of mismatches.
+    """
+    if format not in (OutputFormat.RICH, OutputFormat.JSONL):
+        logger.error("Unsupported format for verify: %s", format)
+        raise SystemExit(1)
+    out = out or sys.stdout
+    console = Console(file=out if format == OutputFormat.RICH else sys.stderr)
+    lookup = lookup or HashLookup(concurrency=concurrency)
+    declared = list(dict.fromkeys(x for filename in filenames for x in iter_declared(filename)))
+
+    table = Table(title="Hashes that do not match the declared package")
+    table.add_column("Package")
+    table.add_column("Hash")
+    table.add_column("Belongs to", style="red")
+    counts = {"ok": 0, "mismatch": 0, "unknown": 0}
+    for future in asyncio.as_completed([verify(x, lookup) for x in declared]):
+        verdict = await future
+        counts[verdict.status] += 1
+        if format == OutputFormat.JSONL:
+            row = {
+                "purl": verdict.declared.purl,
+                "hash_type": str(verdict.declared.hash_type),
+                "hash": verdict.declared.value,
+                "status": verdict.status,
+                "matches": verdict.matches,
+            }
+            out.write(json.dumps(row) + "\n")
+        elif verdict.status == "mismatch":
+            table.add_row(
+                verdict.declared.purl,
+                f"{verdict.declared.hash_type}:{verdict.declared.value[:16]}...",
+                ", ".join(verdict.matches[:5]),
+            )
+    if format == OutputFormat.RICH and counts["mismatch"]:
+        console.print(table)
+    console.print(
+        f"Checked {len(declared)} hashes with {len(lookup.tasks)} lookups: {counts['ok']} ok, "
+        f"{counts['mismatch']} mismatched, {counts['unknown']} unknown to deps.dev."
+    )
+    return counts["mismatch"]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import logging
+import sys
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+from rich.table import Table
+
+from depsdev.cli.output import OutputFormat
+from depsdev.cli.purl import purl_table
+from depsdev.licenses import LicenseTable
+from depsdev.licenses import Policy
+from depsdev.licenses import Verdict
+from depsdev.paging import iter_purl_lookup_batch
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+if TYPE_CHECKING:
+    from typing import TextIO
+
+logger = logging.getLogger(__name__)
+
+VERDICT_STYLES = {
+    Verdict.ALLOWED: "green",
+    Verdict.DENIED: "red",
+    Verdict.UNKNOWN: "yellow",
+}
+
+
+def split_ids(values: list[str]) -> list[str]:
+    return [x.strip() for value in values for x in value.split(",") if x.strip()]
+
+
+async def licenses_helper(  # noqa: PLR0913
+    sources: list[str],
+    allow: list[str],
+    deny: list[str],
+    *,
+    format: OutputFormat = OutputFormat.RICH,  # noqa: A002
+    concurrency: int = 8,
+    client: DepsDevClientV3Alpha | None = None,
+    out: TextIO | None = None,
+) -> int:
+    """
+    Stream the license verdict of every package and return the number of denied ones.
+    """
+    if format not in (OutputFormat.RICH, OutputFormat.JSONL):
+        logger.error("Unsupported format for licenses: %s", format)
+        raise SystemExit(1)
+    out = out or sys.stdout
+    console = Console(file=out if format == OutputFormat.RICH else sys.stderr)
+    table = LicenseTable(Policy.from_lists(split_ids(allow), split_ids(deny)))
+    purls = purl_table(sources)
+    client = client or DepsDevClientV3Alpha()
+
+    scanned = denied = 0
+    async for purl, version in iter_purl_lookup_batch(client, purls, concurrency=concurrency):
+        expressions = version.get("licenses", [])  # type: ignore[attr-defined]
+        verdict = table.verdict(tuple(table.intern(x) for x in expressions))
+        scanned += 1
+        denied += verdict == Verdict.DENIED
+        if format == OutputFormat.JSONL:
+            row = {"purl": purl, "licenses": expressions, "verdict": str(verdict)}
+            out.write(json.dumps(row) + "\n")
+        elif verdict != Verdict.ALLOWED:
+            style = VERDICT_STYLES[verdict]
+            console.print(
+                f"[{style}]{verdict}[/{style}] {purl} {', '.join(expressions) or '-'}",
+                highlight=False,
+            )
+
+    summary = Table(title="Licenses")
+    summary.add_column("License")
+    summary.add_column("Packages", justify="right")
+    summary.add_column("Verdict")
+    order = sorted(range(len(table.expressions)), key=lambda x: -table.counts[x])
+    for i in order:
+        style = VERDICT_STYLES[table.verdicts[i]]
+        summary.add_row(
+            table.expressions[i],
+            str(table.counts[i]),
+            f"[{style}]{table.verdicts[i]}[/{style}]",
+        )
+    console.print(summary)
+    console.print(
+        f"Scanned {scanned} of {len(purls)} packages, "
+        f"{len(table.expressions)} distinct licenses, {denied} denied."
+    )
+    return denied
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import json
+import sys
+from enum import Enum
+from typing import IO
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+from rich.table import Table
+
+if TYPE_CHECKING:
+    from typing_extensions import Protocol
+
+    from depsdev.osv import OSVVulnerability
+
+    class Writer(Protocol):
+        def write(self, purl: str, advisories: list[OSVVulnerability]) -> None: ...
+
+        def health(self, purl: str, project: dict[str, object]) -> None: ...
+
+        def close(self) -> None: ...
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+class OutputFormat(str, Enum):
+    RICH = "rich"
+    JSONL = "jsonl"
+    JSON = "json"
+    SARIF = "sarif"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+def get_version_fix(vuln: OSVVulnerability) -> str | None:
+    for affected in vuln.get("affected", []):
+        for _range in affected.get("ranges", []):
+            for event in _range.get("events", []):
+                if "fixed" in event:
+                    return event["fixed"]
+    return None
+
+
+def finding(purl: str, vuln: OSVVulnerability) -> dict[str, object]:
+    return {
+        "purl": purl,
+        "id": vuln["id"],
+        "aliases": vuln.get("aliases", []),
+        "summary": vuln.get("summary"),
+        "fixed": get_version_fix(vuln),
+    }
+
+
+class RichWriter:
+    """
+    One table per affected package, for humans at a terminal.
+    """
+
+    def __init__(self, out: IO[str] | None = None) -> None:
+        self.console = Console(file=out)
+        self.count = 0
+        self.projects: dict[str, dict[str, object]] = {}
+
+    def write(self, purl: str, advisories: list[OSVVulnerability]) -> None:
+        self.count += 1
+        table = Table(title=purl)
+
+        table.add_column("Id")
+        table.add_column("Summary", style="cyan", no_wrap=True)
+        table.add_column("Fixed", style="magenta")
+
+        for vuln in advisories:
+            table.add_row(
+                f"[link=https://github.com/advisories/{vuln['id']}]{vuln['id']}[/link]",
+                vuln.get("summary"),
+                get_version_fix(vuln) or "unknown",
+            )
+        self.console.print(table)
+
+    def health(self, purl: str, project: dict[str, object]) -> None:
+        self.projects[purl] = project
+
+    def close(self) -> None:
+        if self.projects:
+            table = Table(title="Project health")
+            table.add_column("Package")
+            table.add_column("Project", style="cyan")
+            table.add_column("Scorecard", style="magenta", justify="right")
+            table.add_column("Stars", justify="right")
+            table.add_column("License")
+            for purl, project in self.projects.items():
+                table.add_row(
+                    purl,
+                    str(project["id"]),
+                    "-" if project["scorecard"] is None else f"{project['scorecard']:.1f}",
+                    "-" if project["stars"] is None else str(project["stars"]),
+                    str(project["license"] or "-"),
+                )
+            self.console.print(table)
+        self.console.print(f"Found {self.count} packages with advisories.")
+
+
+class JsonlWriter:
+    """
+    One JSON object per (package, advisory) finding, flushed as soon as it is known.
+    """
+
+    def __init__(self, out: IO[str] | None = None) -> None:
+        self.out = out or sys.stdout
+
+    def write(self, purl: str, advisories: list[OSVVulnerability]) -> None:
+        for vuln in advisories:
+            self.out.write(json.dumps(finding(purl, vuln)) + "\n")
+        self.out.flush()
+
+    def health(self, purl: str, project: dict[str, object]) -> None:
+        self.out.write(json.dumps({"purl": purl, "project": project}) + "\n")
+
+    def close(self) -> None:
+        self.out.flush()
+
+
+class JsonWriter:
+    """
+    The same findings as `JsonlWriter` as a single JSON array, written element by element.
+    """
+
+    def __init__(self, out: IO[str] | None = None) -> None:
+        self.out = out or sys.stdout
+        self.separator = "[\n"
+
+    def write(self, purl: str, advisories: list[OSVVulnerability]) -> None:
+        for vuln in advisories:
+            self.out.write(self.separator + json.dumps(finding(purl, vuln)))
+            self.separator = ",\n"
+        self.out.flush()
+
+    def health(self, purl: str, project: dict[str, object]) -> None:
+        self.out.write(self.separator + json.dumps({"purl": purl, "project": project}))
+        self.separator = ",\n"
+
+    def close(self) -> None:
+        self.out.write("[]\n" if self.separator == "[\n" else "\n]\n")
+        self.out.flush()
+
+
+class SarifWriter:
+    """
+    SARIF 2.1.0 log with one result per finding.
+
+    Results are streamed, the rules (one per distinct advisory) are written after them, which is
+    valid as JSON member order does not matter.
+    """
+
+    def __init__(self, out: IO[str] | None = None, artifact: str | None = None) -> None:
+        self.out = out or sys.stdout
+        self.artifact = artifact
+        self.rules: dict[str, dict[str, object]] = {}
+        self.projects: dict[str, dict[str, object]] = {}
+        self.separator = ""
+        self.out.write(
+            f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", "runs": [{{"results": ['
+        )
+
+    def write(self, purl: str, advisories: list[OSVVulnerability]) -> None:
+        for vuln in advisories:
+            fixed = get_version_fix(vuln)
+            self.rules.setdefault(
+                vuln["id"],
+                {
+                    "id": vuln["id"],
+                    "shortDescription": {"text": vuln.get("summary") or vuln["id"]},
+                    "helpUri": f"https://osv.dev/vulnerability/{vuln['id']}",
+                },
+            )
+            message = f"{purl} is affected by {vuln['id']}"
+            if fixed:
+                message += f", fixed in {fixed}"
+            result: dict[str, object] = {
+                "ruleId": vuln["id"],
+                "level": "warning",
+                "message": {"text": f"{message}."},
+                "properties": {"purl": purl, "fixed": fixed},
+            }
+            if self.artifact is not None:
+                result["locations"] = [
+                    {"physicalLocation": {"artifactLocation": {"uri": self.artifact}}}
+                ]
+            self.out.write(self.separator + json.dumps(result))
+            self.separator = ", "
+        self.out.flush()
+
+    def health(self, purl: str, project: dict[str, object]) -> None:
+        # Not a result, so it goes into the property bag of the run.
+        self.projects[purl] = project
+
+    def close(self) -> None:
+        driver = {
+            "name": "depsdev",
+            "informationUri": "https://github.com/FlavioAmurrioCS/depsdev",
+            "rules": list(self.rules.values()),
+        }
+        properties = ""
+        if self.projects:
+            properties = f', "properties": {{"projects": {json.dumps(self.projects)}}}'
+        self.out.write(f'], "tool": {{"driver": {json.dumps(driver)}}}{properties}}}]}}\n')
+        self.out.flush()
+
+
+class TeeWriter:
+    def __init__(self, *writers: Writer) -> None:
+        self.writers = writers
+
+    def write(self, purl: str, advisories: list[OSVVulnerability]) -> None:
+        for writer in self.writers:
+            writer.write(purl, advisories)
+
+    def health(self, purl: str, project: dict[str, object]) -> None:
+        for writer in self.writers:
+            writer.health(purl, project)
+
+    def close(self) -> None:
+        for writer in self.writers:
+            writer.close()
+
+
+def get_writer(
+    output_format: OutputFormat, out: IO[str] | None = None, artifact: str | None = None
+) -> Writer:
+    if output_format is OutputFormat.SARIF:
+        return SarifWriter(out, artifact)
+    if output_format is OutputFormat.JSON:
+        return JsonWriter(out)
+    if output_format is OutputFormat.JSONL:
+        return JsonlWriter(out)
+    return RichWriter(out)
@@ -1,18 +1,36 @@
 from __future__ import annotations
 
 import itertools
-import json
 import logging
 import os
+import re
 import subprocess
 import sys
+from abc import ABC
+from abc import abstractmethod
 from typing import TYPE_CHECKING
 
 from packageurl import PackageURL
 
+from depsdev.jsonstream import JSONReader
+from depsdev.jsonstream import iter_chunks
+from depsdev.jsonstream import kvitems
+from depsdev.purltable import PurlTable
+from depsdev.requirements import CACHE
+from depsdev.requirements import pinned
+from depsdev.v3 import System
+
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
+    from typing_extensions import Protocol
+
+    from depsdev.v3 import Incomplete
+
+    class Extractor(Protocol):
+        def extract(self, filename: str) -> Iterable[PackageURL]: ...
+
+
 logger = logging.getLogger(__name__)
 
 
@@ -82,62 +100,435 @@ class PipfileLockExtractor:
         if not filename.endswith("Pipfile.lock"):
             logger.error("Invalid Pipfile.lock: %s. It should end with 'Pipfile.lock'.", filename)
             raise SystemExit(1)
-        with open(filename) as f:
-            data = json.load(f)
-            for package_name, package_info in data.get("default", {}).items():
-                version: str | None = package_info.get("version")
-                if version:
-                    yield PackageURL(
-                        type="pypi",
-                        namespace=None,
-                        name=package_name,
-                        version=version[2:],
-                        qualifiers=None,
-                        subpath=None,
-                    )
-                else:
-                    logger.warning("Package %s has no version specified.", package_name)
+        for package_name, package_info in kvitems(iter_chunks(filename), "default"):
+            version: str | None = package_info.get("version")
+            if version:
+                yield PackageURL(
+                    type="pypi",
+                    namespace=None,
+                    name=package_name,
+                    version=version[2:],
+                    qualifiers=None,
+                    subpath=None,
+                )
+            else:
+                logger.warning("Package %s has no version specified.", package_name)
 
 
 class RequirementsExtractor:
     @classmethod
     def extract(cls, filename: str) -> Iterable[PackageURL]:
         """
-        Extracts package URLs from a requirements.txt file.
+        Extracts package URLs from a requirements.txt file and the files it includes (`-r`).
+
+        Requirements without an exact pin take the pinned version of a constraint file (`-c`).
+        Parsed files are shared by every requirements file of the run, see `depsdev.requirements`.
         """
         if not filename.endswith("requirements.txt"):
             logger.error(
                 "Invalid requirements file: %s. It should end with 'requirements.txt'.", filename
             )
             raise SystemExit(1)
-        with open(filename) as f:
+        for name, version in pinned(filename, CACHE):
+            yield PackageURL(
+                type="pypi",
+                namespace=None,
+                name=name,
+                version=version,
+                qualifiers=None,
+                subpath=None,
+            )
+
+
+class PackageLockExtractor:
+    @classmethod
+    def extract(cls, filename: str) -> Iterable[PackageURL]:
+        """
+        Extracts package URLs from an npm package-lock.json (or npm-shrinkwrap.json).
+
+        Lockfile v2/v3 list every installed package under "packages", v1 only has the nested
+        "dependencies" tree. v2 carries both, the "dependencies" copy is skipped.
+        """
+        reader = JSONReader(iter_chunks(filename))
+        seen_packages = False
+        for key in reader.members():
+            if key == "packages":
+                seen_packages = True
+                for path in reader.members():
+                    info = reader.value()
+                    if path and not info.get("link") and info.get("version"):
+                        name = info.get("name") or path.rsplit("node_modules/", 1)[-1]
+                        yield cls.to_purl(name, info["version"])
+                return  # Nothing else of interest in the document.
+            elif key == "dependencies" and not seen_packages:
+                for name in reader.members():
+                    yield from cls._walk_v1(name, reader.value())
+            else:
+                reader.skip()
+
+    @classmethod
+    def _walk_v1(cls, name: str, info: dict[str, Incomplete]) -> Iterable[PackageURL]:
+        stack = [(name, info)]
+        while stack:
+            name, info = stack.pop()
+            version = info.get("version")
+            if isinstance(version, str) and not version.startswith(("file:", "link:")):
+                yield cls.to_purl(name, version)
+            stack.extend(info.get("dependencies", {}).items())  # type: ignore[attr-defined]
+
+    @staticmethod
+    def to_purl(name: str, version: str) -> PackageURL:
+        namespace, _, name = name.rpartition("/")
+        return PackageURL(
+            type="npm",
+            namespace=namespace or None,
+            name=name,
+            version=version,
+            qualifiers=None,
+            subpath=None,
+        )
+
+
+class YarnLockExtractor:
+    @classmethod
+    def extract(cls, filename: str) -> Iterable[PackageURL]:
+        """
+        Extracts package URLs from a yarn.lock, both the classic (v1) and berry (v2+) formats.
+        """
+        name = None
+        with open(filename, encoding="utf-8") as f:
             for line in f:
-                _line = line.strip()
-                if not _line or _line.startswith(("#", "-r ", "-i ")):
+                if not line.strip() or line.startswith("#"):
                     continue
-                parts = _line.split(";")[0].split("==")
-                if len(parts) == 2:  # noqa: PLR2004
-                    name, version = parts
-                    version = version.strip(" \\")
+                if not line[0].isspace():
+                    name = cls.parse_header(line)
+                    continue
+                key, _, value = line.strip().partition(" ")
+                if name is not None and key in ("version", "version:"):
                     yield PackageURL(
-                        type="pypi",
-                        namespace=None,
-                        name=name,
-                        version=version,
+                        type="npm",
+                        namespace=name.rpartition("/")[0] or None,
+                        name=name.rpartition("/")[2],
+                        version=value.strip('"'),
                         qualifiers=None,
                         subpath=None,
                     )
+                    name = None
+
+    @staticmethod
+    def parse_header(line: str) -> str | None:
+        """
+        Package name of an entry header such as `"@babel/core@^7.0.0", "@babel/core@^7.1.0":`.
+        """
+        spec = line.rstrip().rstrip(":").split(",")[0].strip().strip('"')
+        if spec == "__metadata" or any(
+            f"@{x}:" in spec for x in ("workspace", "link", "portal", "file")
+        ):
+            return None
+        name = spec[: spec.index("@", 1)] if "@" in spec[1:] else spec
+        return name or None
+
+
+class PnpmLockExtractor:
+    @classmethod
+    def extract(cls, filename: str) -> Iterable[PackageURL]:
+        """
+        Extracts package URLs from the "packages" section of a pnpm-lock.yaml (v5 to v9).
+        """
+        in_packages = False
+        with open(filename, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                if not line[0].isspace():
+                    in_packages = line.rstrip() == "packages:"
+                    continue
+                # Package keys are the only lines indented by exactly two spaces.
+                if in_packages and line.startswith("  ") and not line[2].isspace():
+                    purl = cls.parse_key(line.strip().rstrip(":").strip("'\""))
+                    if purl is not None:
+                        yield purl
+
+    @staticmethod
+    def parse_key(key: str) -> PackageURL | None:
+        """
+        Parse `/name/1.0.0_peer@2.0.0` (v5), `/name@1.0.0(peer@2.0.0)` (v6) or `name@1.0.0` (v9).
+        """
+        path = key.split("(", 1)[0].lstrip("/")
+        name, _, version = path.rpartition("/")
+        if key.startswith("/") and version[:1].isdigit():
+            version = version.split("_", 1)[0]
+        elif "@" in path[1:]:
+            at = path.index("@", 1)
+            name, version = path[:at], path[at + 1 :]
+        else:
+            return None
+        if not name or not version or ":" in version:
+            return None  # tarball, link and git entries
+        return PackageURL(
+            type="npm",
+            namespace=name.rpartition("/")[0] or None,
+            name=name.rpartition("/")[2],
+            version=version,
+            qualifiers=None,
+            subpath=None,
+        )
+
+
+class TomlLockExtractor(ABC):
+    """
+    Line based reader for the `[[package]]` tables of poetry.lock and Cargo.lock.
+
+    Subclasses turn the fields of one package, keyed by `table.field`, into purls.
+    """
+
+    FIELD = re.compile(r'^(name|version|source|type)\s*=\s*"(.*)"\s*$')
+
+    @classmethod
+    def extract(cls, filename: str) -> Iterable[PackageURL]:
+        package: dict[str, str] | None = None
+        table = ""
+        with open(filename, encoding="utf-8") as f:
+            for line in f:
+                _line = line.strip()
+                if _line.startswith("["):
+                    table = _line
+                    if not _line.startswith(("[package.", "[[package.")):
+                        # A new [[package]] or an unrelated table ends the current package.
+                        if package is not None:
+                            yield from cls.to_purls(package)
+                        package = {} if _line == "[[package]]" else None
+                    continue
+                match = cls.FIELD.match(_line)
+                if package is not None and match is not None:
+                    package[f"{table}.{match.group(1)}"] = match.group(2)
+        if package is not None:
+            yield from cls.to_purls(package)
+
+    @classmethod
+    @abstractmethod
+    def to_purls(cls, package: dict[str, str]) -> Iterable[PackageURL]: ...
+
+
+class PoetryLockExtractor(TomlLockExtractor):
+    @classmethod
+    def to_purls(cls, package: dict[str, str]) -> Iterable[PackageURL]:
+        """
+        Skips packages installed from git, local paths or direct URLs.
+        """
+        source_type = package.get("[package.source].type")
+        if source_type in ("git", "directory", "file", "url"):
+            return
+        yield PackageURL(
+            type="pypi",
+            namespace=None,
+            name=package["[[package]].name"],
+            version=package["[[package]].version"],
+            qualifiers=None,
+            subpath=None,
+        )
+
+
+class CargoLockExtractor(TomlLockExtractor):
+    @classmethod
+    def to_purls(cls, package: dict[str, str]) -> Iterable[PackageURL]:
+        """
+        Only crates coming from a registry, workspace members and git crates are skipped.
+        """
+        if not package.get("[[package]].source", "").startswith(("registry+", "sparse+")):
+            return
+        yield PackageURL(
+            type="cargo",
+            namespace=None,
+            name=package["[[package]].name"],
+            version=package["[[package]].version"],
+            qualifiers=None,
+            subpath=None,
+        )
+
+
+class GoSumExtractor:
+    @classmethod
+    def extract(cls, filename: str) -> Iterable[PackageURL]:
+        """
+        Extracts package URLs from a go.sum, ignoring the `/go.mod` only checksums.
+        """
+        with open(filename, encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 3 or parts[1].endswith("/go.mod"):  # noqa: PLR2004
+                    continue
+                module, version, _checksum = parts
+                namespace, _, name = module.rpartition("/")
+                yield PackageURL(
+                    type="golang",
+                    namespace=namespace or None,
+                    name=name,
+                    version=version,
+                    qualifiers=None,
+                    subpath=None,
+                )
+
+
+class SbomExtractor:
+    @classmethod
+    def extract(cls, filename: str) -> Iterable[PackageURL]:
+        """
+        Extracts the (de-duplicated) package URLs of a CycloneDX or SPDX JSON SBOM.
+
+        Components are streamed out one at a time, the format is recognised by its top level key
+        ("components" for CycloneDX, "packages" for SPDX) so a single pass is enough.
+        """
+        seen: set[str] = set()
+        reader = JSONReader(iter_chunks(filename))
+        for key in reader.members():
+            if key == "components":
+                purls = cls._cyclonedx(reader)
+            elif key == "packages":
+                purls = cls._spdx(reader)
+            else:
+                reader.skip()
+                continue
+            for purl in purls:
+                if purl not in seen:
+                    seen.add(purl)
+                    try:
+                        yield PackageURL.from_string(purl)
+                    except ValueError:
+                        logger.warning("Skipping invalid purl %s", purl)
+
+    @staticmethod
+    def _cyclonedx(reader: JSONReader) -> Iterable[str]:
+        for _ in reader.elements():
+            stack = [reader.value()]
+            while stack:
+                component = stack.pop()
+                if component.get("purl"):
+                    yield component["purl"]
+                stack.extend(reversed(component.get("components", [])))
+
+    @staticmethod
+    def _spdx(reader: JSONReader) -> Iterable[str]:
+        for _ in reader.elements():
+            package = reader.value()
+            for ref in package.get("externalRefs", []):
+                if ref.get("referenceType") == "purl" and ref.get("referenceLocator"):
+                    yield ref["referenceLocator"]
+
+
+def source_file(source: str) -> str:
+    """
+    Absolute path of a source that is not a purl, which has to be an existing file.
+    """
+    if not os.path.isfile(source):
+        logger.error("%s is neither a purl (pkg:...) nor a file.", source)
+        raise SystemExit(1)
+    return os.path.abspath(source)
+
+
+def resolve_sources(sources: Iterable[str]) -> list[str]:
+    """
+    The sources as recorded for a scan: purls as given, files by their absolute path.
+    """
+    return [x if x.startswith("pkg:") else os.path.abspath(x) for x in sources]
+
+
+def iter_purls(sources: Iterable[str]) -> Iterable[str]:
+    """
+    Expand a mix of purls and files (lockfiles, manifests, SBOMs) into purl strings.
+    """
+    for source in sources:
+        if source.startswith("pkg:"):
+            yield source
+            continue
+        filename = source_file(source)
+        yield from (x.to_string() for x in get_extractor(filename).extract(filename))
+
+
+def purl_table(sources: Iterable[str]) -> PurlTable:
+    """
+    Same as `iter_purls`, de-duplicated into a `PurlTable` without formatting every line.
+    """
+    table = PurlTable()
+    for source in sources:
+        if source.startswith("pkg:"):
+            table.add_string(source)
+            continue
+        filename = source_file(source)
+        table.extend(get_extractor(filename).extract(filename))
+    return table
+
+
+PURL_SYSTEMS = {
+    "pypi": System.PYPI,
+    "npm": System.NPM,
+    "maven": System.MAVEN,
+    "cargo": System.CARGO,
+    "golang": System.GO,
+    "nuget": System.NUGET,
+    "gem": System.RUBYGEMS,
+}
+
+
+def purl_key(purl: str) -> tuple[System, str, str | None] | None:
+    try:
+        package = PackageURL.from_string(purl)
+    except ValueError:
+        return None
+    system = PURL_SYSTEMS.get(package.type)
+    if system is None:
+        return None
+    if not package.namespace:
+        name = package.name
+    elif system is System.MAVEN:
+        name = f"{package.namespace}:{package.name}"
+    else:
+        name = f"{package.namespace}/{package.name}"
+    return system, name, package.version or None
+
+
+def to_package_key(purl: str) -> tuple[System, str] | None:
+    """
+    deps.dev `(system, name)` of a purl, `None` for ecosystems deps.dev does not cover.
+    """
+    key = purl_key(purl)
+    return None if key is None else (key[0], key[1])
+
+
+def to_version_key(purl: str) -> tuple[System, str, str] | None:
+    """
+    deps.dev `(system, name, version)` of a purl, `None` for other ecosystems or without a version.
+    """
+    key = purl_key(purl)
+    if key is None or key[2] is None:
+        return None
+    return key[0], key[1], key[2]
+
+
+# Checked in order against the end of the filename.
+EXTRACTORS: dict[str, type[Extractor]] = {
+    "pom.xml": MavenExtractor,
+    "Pipfile.lock": PipfileLockExtractor,
+    "requirements.txt": RequirementsExtractor,
+    "package-lock.json": PackageLockExtractor,
+    "npm-shrinkwrap.json": PackageLockExtractor,
+    "yarn.lock": YarnLockExtractor,
+    "pnpm-lock.yaml": PnpmLockExtractor,
+    "poetry.lock": PoetryLockExtractor,
+    "Cargo.lock": CargoLockExtractor,
+    "go.sum": GoSumExtractor,
+    ".cdx.json": SbomExtractor,
+    ".spdx.json": SbomExtractor,
+    "bom.json": SbomExtractor,
+}
 
 
-def get_extractor(filename: str) -> MavenExtractor | PipfileLockExtractor | RequirementsExtractor:
+def get_extractor(filename: str) -> Extractor:
     """
-    Returns the appropriate extractor based on the file extension.
+    Returns the appropriate extractor based on the file name.
     """
-    if filename.endswith("pom.xml"):
-        return MavenExtractor()
-    if filename.endswith("Pipfile.lock"):
-        return PipfileLockExtractor()
-    if filename.endswith("requirements.txt"):
-        return RequirementsExtractor()
+    for suffix, extractor in EXTRACTORS.items():
+        if filename.endswith(suffix):
+            return extractor()
     logger.error("Unsupported file format: %s", filename)
     raise SystemExit(1)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard(shard: str) -> tuple[int, int]:
+    """
+    Parse a 1-based "i/n" shard specification, e.g. "2/8", into a 0-based `(index, count)`.
+    """
+    try:
+        index, count = (int(x) for x in shard.split("/"))
+    except ValueError:
+        logger.error("Invalid shard %r, expected something like '1/4'.", shard)  # noqa: TRY400
+        raise SystemExit(1) from None
+    if not 1 <= index <= count:
+        logger.error("Invalid shard %r, the index must be between 1 and %s.", shard, count)
+        raise SystemExit(1)
+    return index - 1, count
+
+
+def shard_of(purl: str, count: int) -> int:
+    """
+    Stable shard assignment, identical across processes, hosts and Python versions.
+    """
+    digest = hashlib.blake2b(purl.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def partition(purls: Iterable[str], count: int) -> list[list[str]]:
+    parts: list[list[str]] = [[] for _ in range(count)]
+    for purl in purls:
+        parts[shard_of(purl, count)].append(purl)
+    return parts
+
+
+def select_shard(purls: Iterable[str], shard: str) -> list[str]:
+    index, count = parse_shard(shard)
+    return [x for x in purls if shard_of(x, count) == index]
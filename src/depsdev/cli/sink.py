@@ -0,0 +1,138 @@
+"""
+SQLite sink collecting `report`/`vuln` findings from many scans into one database.
+
+    depsdev report --database findings.db requirements.txt
+
+    -- Which manifests are affected by an advisory?
+    SELECT DISTINCT s.source FROM findings f
+    JOIN scan_sources s ON s.scan_id = f.scan_id JOIN advisories a ON a.id = f.advisory_id
+    WHERE a.osv_id = 'GHSA-jjg7-2v4v-x38h';
+
+Every scan records its sources, absolute paths for files and purls as given.
+
+Parallel scans may append to the same database, writes are batched into short `BEGIN IMMEDIATE`
+transactions and wait on each other through SQLite's busy timeout.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from typing import TYPE_CHECKING
+
+from depsdev.cli.output import get_version_fix
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from depsdev.osv import OSVVulnerability
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    packages INTEGER NOT NULL,
+    started REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS scan_sources (
+    scan_id INTEGER NOT NULL REFERENCES scans (id),
+    source TEXT NOT NULL,
+    PRIMARY KEY (scan_id, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scan_sources_source ON scan_sources (source);
+CREATE TABLE IF NOT EXISTS packages (
+    id INTEGER PRIMARY KEY,
+    purl TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS advisories (
+    id INTEGER PRIMARY KEY,
+    osv_id TEXT NOT NULL UNIQUE,
+    summary TEXT,
+    modified TEXT
+);
+CREATE TABLE IF NOT EXISTS findings (
+    scan_id INTEGER NOT NULL REFERENCES scans (id),
+    package_id INTEGER NOT NULL REFERENCES packages (id),
+    advisory_id INTEGER NOT NULL REFERENCES advisories (id),
+    fixed TEXT,
+    PRIMARY KEY (scan_id, package_id, advisory_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS findings_advisory ON findings (advisory_id);
+CREATE INDEX IF NOT EXISTS findings_package ON findings (package_id);
+"""
+
+
+class SqliteSink:
+    """
+    Writer (see `depsdev.cli.output`) appending findings to normalized tables.
+
+    Findings are buffered and flushed every `batch_size` rows, each flush is one transaction.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sources: Iterable[str] = (),
+        packages: int = 0,
+        batch_size: int = 500,
+    ) -> None:
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.pending: list[tuple[str, OSVVulnerability]] = []
+        with self.transaction():
+            cursor = self.conn.execute(
+                "INSERT INTO scans (packages, started) VALUES (?, ?)", (packages, time.time())
+            )
+            self.scan_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO scan_sources (scan_id, source) VALUES (?, ?)",
+                [(self.scan_id, x) for x in sources],
+            )
+
+    def transaction(self) -> sqlite3.Connection:
+        # `with conn:` commits or rolls back, the explicit BEGIN takes the write lock up front so
+        # concurrent writers queue on the busy timeout instead of failing to upgrade a read lock.
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def write(self, purl: str, advisories: list[OSVVulnerability]) -> None:
+        self.pending.extend((purl, vuln) for vuln in advisories)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def health(self, purl: str, project: dict[str, object]) -> None:
+        # The database only records findings.
+        pass
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        purls = [(purl,) for purl in dict.fromkeys(purl for purl, _ in self.pending)]
+        vulns = {vuln["id"]: vuln for _, vuln in self.pending}
+        with self.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO packages (purl) VALUES (?)", purls)
+            conn.executemany(
+                "INSERT INTO advisories (osv_id, summary, modified) VALUES (?, ?, ?) "
+                "ON CONFLICT (osv_id) DO UPDATE SET "
+                "summary = excluded.summary, modified = excluded.modified",
+                [(x["id"], x.get("summary"), x.get("modified")) for x in vulns.values()],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO findings (scan_id, package_id, advisory_id, fixed) "
+                "SELECT ?, p.id, a.id, ? FROM packages p, advisories a "
+                "WHERE p.purl = ? AND a.osv_id = ?",
+                [
+                    (self.scan_id, get_version_fix(vuln), purl, vuln["id"])
+                    for purl, vuln in self.pending
+                ],
+            )
+        self.pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        with self.transaction() as conn:
+            conn.execute("UPDATE scans SET finished = ? WHERE id = ?", (time.time(), self.scan_id))
+        self.conn.close()
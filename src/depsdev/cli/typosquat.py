@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from rich.console import Console
+from rich.table import Table
+
+from depsdev.cli.purl import iter_purls
+from depsdev.cli.purl import to_package_key
+from depsdev.typosquat import Screener
+from depsdev.typosquat import load_popular
+
+
+async def typosquat_helper(
+    sources: list[str], popular: str | None = None, concurrency: int = 16
+) -> int:
+    console = Console()
+    popular_names = {}
+    if popular is not None:
+        with open(popular, encoding="utf-8") as f:  # noqa: ASYNC230
+            popular_names = load_popular(f)
+    packages = [key for key in map(to_package_key, iter_purls(sources)) if key is not None]
+    screener = Screener(popular_names, concurrency=concurrency)
+    findings = await screener.screen_all(packages)
+
+    table = Table(title="Possible typosquats")
+    table.add_column("System")
+    table.add_column("Package", style="magenta")
+    table.add_column("Close to popular", style="red")
+    table.add_column("Similarly named on deps.dev", style="cyan")
+    for finding in findings:
+        table.add_row(
+            str(finding.system),
+            finding.name,
+            ", ".join(finding.close_to),
+            ", ".join(finding.similar[:5]),
+        )
+    console.print(table)
+    console.print(
+        f"Screened {len(set(packages))} packages, {screener.api_calls} needed an API call, "
+        f"{len(findings)} look suspicious."
+    )
+    return 0
@@ -1,71 +1,198 @@
 from __future__ import annotations
 
 import asyncio
-import itertools
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import TYPE_CHECKING
+from typing import Optional
 
 from rich.console import Console
-from rich.table import Table
 
+from depsdev.batching import AdaptiveBatcher
+from depsdev.batching import iter_batches
+from depsdev.cli.output import OutputFormat
+from depsdev.cli.output import TeeWriter
+from depsdev.cli.output import get_writer
+from depsdev.cli.purl import purl_table
+from depsdev.cli.purl import resolve_sources
+from depsdev.cli.shard import partition
+from depsdev.cli.shard import select_shard
+from depsdev.cli.sink import SqliteSink
+from depsdev.health import enrich_from_env
 from depsdev.osv import OSVClientV1
+from depsdev.profiling import stage
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Sequence
+
     from depsdev.osv import OSVVulnerability
+    from depsdev.osv import QueryBatchResult
     from depsdev.osv import V1Query
 
 logger = logging.getLogger(__name__)
 
 
-def get_version_fix(vuln: OSVVulnerability) -> str | None:
-    for affected in vuln.get("affected", []):
-        for _range in affected.get("ranges", []):
-            for event in _range.get("events", []):
-                if "fixed" in event:
-                    return event["fixed"]
-    return None
-
-
-async def get_vulns(purls: list[str], osv_client: OSVClientV1) -> dict[str, list[OSVVulnerability]]:
-    queries: list[V1Query] = [
-        {
-            "package": {"purl": purl},
-        }
-        for purl in purls
-    ]
-    result = await osv_client.querybatch({"queries": queries})
-    r = {k: [x["id"] for x in v["vulns"]] for k, v in zip(purls, result["results"]) if v}
-    all_result = await asyncio.gather(
-        *[osv_client.get_vuln(vuln_id) for vuln_id in itertools.chain.from_iterable(r.values())]
-    )
-    look_up = {vuln["id"]: vuln for vuln in all_result}
-    return {purl: [look_up[vuln_id] for vuln_id in vuln_ids] for purl, vuln_ids in r.items()}
-
-
-async def main_helper(packages: list[str]) -> int:
-    """Main function to analyze packages for vulnerabilities."""
-
-    console = Console()
-
-    console.print(f"Analysing {len(packages)} packages...")
-
-    osv_client = OSVClientV1()
-
-    results = await get_vulns(packages, osv_client)
-    console.print(f"Found {len(results)} packages with advisories.")
-
-    for purl, advisories in results.items():
-        table = Table(title=purl)
-
-        table.add_column("Id")
-        table.add_column("Summary", style="cyan", no_wrap=True)
-        table.add_column("Fixed", style="magenta")
-
-        for vuln in advisories:
-            table.add_row(
-                f"[link=https://github.com/advisories/{vuln['id']}]{vuln['id']}[/link]",
-                vuln.get("summary"),
-                get_version_fix(vuln) or "unknown",
-            )
-        console.print(table)
-    return 0
+async def _query(
+    purls: Sequence[str], osv_client: OSVClientV1
+) -> tuple[dict[str, list[str]], dict[str, list[str]], dict[str, asyncio.Future[OSVVulnerability]]]:
+    """
+    Stream the batch queries and start fetching each advisory the moment its first id arrives.
+
+    Returns the advisory ids per affected purl, the purls per advisory id and the fetches.
+    """
+
+    async def fetch(chunk: list[str]) -> AsyncIterator[tuple[str, QueryBatchResult]]:
+        queries: list[V1Query] = [{"package": {"purl": purl}} for purl in chunk]
+        index = 0
+        async for result in osv_client.iter_querybatch({"queries": queries}):
+            yield chunk[index], result
+            index += 1
+
+    r: dict[str, list[str]] = {}
+    affected: dict[str, list[str]] = {}
+    tasks: dict[str, asyncio.Future[OSVVulnerability]] = {}
+    # OSV answers at most 1000 queries per batch.
+    batcher = AdaptiveBatcher("querybatch", max_size=1000, fixed=osv_client.caches_responses)
+    try:
+        async for purl, result in iter_batches(purls, fetch, batcher):
+            if not result:
+                continue
+            r[purl] = [x["id"] for x in result["vulns"]]
+            for vuln_id in dict.fromkeys(r[purl]):
+                if vuln_id not in tasks:
+                    tasks[vuln_id] = asyncio.ensure_future(osv_client.get_vuln(vuln_id))
+                affected.setdefault(vuln_id, []).append(purl)
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return r, affected, tasks
+
+
+async def iter_vulns(
+    purls: Sequence[str], osv_client: OSVClientV1
+) -> AsyncIterator[tuple[str, list[OSVVulnerability]]]:
+    """
+    Yield `(purl, advisories)` for every affected purl as soon as all of its advisories resolved.
+
+    Advisory fetches start while the batch response is still streaming in. Each advisory is
+    fetched once however many purls it affects, and dropped again once the last of them has been
+    yielded.
+    """
+    with stage("query"):
+        r, affected, tasks = await _query(purls, osv_client)
+    unresolved = {purl: len(set(vuln_ids)) for purl, vuln_ids in r.items()}
+    references = {vuln_id: len(x) for vuln_id, x in affected.items()}
+    look_up: dict[str, OSVVulnerability] = {}
+
+    for purl, count in unresolved.items():
+        if count == 0:
+            yield purl, []
+    for future in asyncio.as_completed(tasks.values()):
+        with stage("advisories"):
+            vuln = await future
+        look_up[vuln["id"]] = vuln
+        for purl in affected[vuln["id"]]:
+            unresolved[purl] -= 1
+            if unresolved[purl]:
+                continue
+            yield purl, [look_up[x] for x in r[purl]]
+            for vuln_id in set(r[purl]):
+                references[vuln_id] -= 1
+                if not references[vuln_id]:
+                    del look_up[vuln_id]
+
+
+async def get_vulns(
+    purls: Sequence[str], osv_client: OSVClientV1
+) -> dict[str, list[OSVVulnerability]]:
+    results = {purl: advisories async for purl, advisories in iter_vulns(purls, osv_client)}
+    return {purl: results[purl] for purl in purls if purl in results}
+
+
+def _get_vulns_worker(purls: list[str]) -> dict[str, list[OSVVulnerability]]:
+    return asyncio.run(get_vulns(purls, OSVClientV1()))
+
+
+async def get_vulns_sharded(purls: Sequence[str], jobs: int) -> dict[str, list[OSVVulnerability]]:
+    """
+    Same as `get_vulns`, with the purls partitioned across `jobs` processes.
+
+    Every worker runs its own client and event loop. The merged result follows the input order,
+    so it does not depend on which worker finished first.
+    """
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(jobs) as pool:
+        parts = await asyncio.gather(
+            *[
+                loop.run_in_executor(pool, _get_vulns_worker, part)
+                for part in partition(purls, jobs)
+                if part
+            ]
+        )
+    merged: dict[str, list[OSVVulnerability]] = {}
+    for part in parts:
+        merged.update(part)
+    return {purl: merged[purl] for purl in purls if purl in merged}
+
+
+async def main_helper(  # noqa: PLR0913, PLR0917
+    packages: list[str],
+    jobs: int = 1,
+    shard: Optional[str] = None,  # noqa: UP045
+    format: OutputFormat = OutputFormat.RICH,  # noqa: A002
+    database: Optional[str] = None,  # noqa: UP045
+    health: bool = False,  # noqa: FBT001, FBT002
+) -> None:
+    """Main function to analyze packages for vulnerabilities.
+
+    Each argument is either a purl or a file to read purls from (lockfile, manifest or a
+    CycloneDX/SPDX JSON SBOM). Duplicates are only analysed once.
+
+    Use --jobs to spread the work over several processes and --shard i/n to only analyse the
+    i-th of n stable partitions, e.g. one per CI node.
+
+    --format jsonl|json|sarif writes machine readable findings to stdout as each package's
+    advisories resolve, progress messages then go to stderr.
+
+    --database also appends the findings to a SQLite database shared by many scans.
+
+    --health adds the OpenSSF Scorecard and metadata of the source project of every package,
+    resolved in batches alongside the advisory lookups.
+    """
+    sources = packages
+    console = Console(stderr=format is not OutputFormat.RICH)
+    with stage("extract"):
+        purls: Sequence[str] = purl_table(sources)
+    if shard is not None:
+        purls = select_shard(purls, shard)
+
+    console.print(f"Analysing {len(purls)} packages...")
+
+    artifact = sources[0] if len(sources) == 1 and os.path.isfile(sources[0]) else None  # noqa: ASYNC240
+    writer = get_writer(format, artifact=artifact)
+    if database is not None:
+        sink = SqliteSink(database, sources=resolve_sources(sources), packages=len(purls))
+        writer = TeeWriter(writer, sink)
+    enrichment = asyncio.ensure_future(enrich_from_env(purls)) if health else None
+    try:
+        if jobs > 1:
+            for purl, advisories in (await get_vulns_sharded(purls, jobs)).items():
+                with stage("render"):
+                    writer.write(purl, advisories)
+        else:
+            async for purl, advisories in iter_vulns(purls, OSVClientV1()):
+                with stage("render"):
+                    writer.write(purl, advisories)
+        if enrichment is not None:
+            with stage("health"):
+                projects = await enrichment
+            for purl, project in projects.items():
+                writer.health(purl, project)
+    finally:
+        if enrichment is not None:
+            enrichment.cancel()
+        with stage("render"):
+            writer.close()
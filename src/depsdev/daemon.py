@@ -0,0 +1,316 @@
+"""
+Long-running helper process that keeps warm HTTP connection pools and an in-memory response cache.
+
+Clients talk to the daemon over a local Unix socket. Each connection carries exactly one request:
+
+    request:  <json header>\\n<body bytes>
+    response: [\\n ...]<json header>\\n<body bytes until EOF>
+
+While a request waits for its turn or its upstream answer, the daemon sends an empty keepalive
+line every `KEEPALIVE` seconds, so the client's read timeout only fires on a daemon gone silent.
+
+The daemon reads each upstream body in full, to cache it and hand it to coalesced callers, and
+then streams it to the client. Streaming calls like `iter_dependencies` still parse as the socket
+delivers, but the first item only arrives once the daemon has the whole upstream response.
+
+`BaseClient` picks up a running daemon automatically through `discover()`, so the CLI commands
+become thin clients without any change to the call sites. Every request carries the priority
+class and caller of its context, the daemon schedules them across all of its clients.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import getpass
+import json
+import logging
+import os
+import signal
+import stat
+import tempfile
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import TypeVar
+
+import httpx
+
+from depsdev.scheduler import Priority
+from depsdev.scheduler import Scheduler
+from depsdev.scheduler import current_caller
+from depsdev.scheduler import current_priority
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Awaitable
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Only these headers are relayed, the body is always sent decoded so encoding headers are dropped.
+FORWARDED_HEADERS = ("accept", "content-type", "user-agent")
+CHUNK_SIZE = 64 * 1024
+KEEPALIVE = 1.0
+
+
+def socket_path() -> str:
+    """
+    Location of the daemon socket, `DEPSDEV_SOCKET` overrides the per-user default.
+    """
+    default = os.path.join(tempfile.gettempdir(), f"depsdev-{getpass.getuser()}.sock")
+    return os.environ.get("DEPSDEV_SOCKET", default)
+
+
+def is_running(path: str | None = None) -> bool:
+    try:
+        return stat.S_ISSOCK(os.stat(path or socket_path()).st_mode)
+    except OSError:
+        return False
+
+
+def discover() -> httpx.AsyncBaseTransport | None:
+    """
+    Return a transport routed through the daemon when one is running, otherwise `None`.
+
+    Set `DEPSDEV_NO_DAEMON=1` to always talk to the APIs directly.
+    """
+    if os.environ.get("DEPSDEV_NO_DAEMON", "").lower() in ("true", "1", "yes"):
+        return None
+    path = socket_path()
+    if not is_running(path):
+        return None
+    return DaemonTransport(path)
+
+
+class SocketStream(httpx.AsyncByteStream):
+    """
+    Body of a daemon response, read from the socket as the caller consumes it.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        timeout: float | None,
+        request: httpx.Request,
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.request = request
+
+    async def read(self, awaitable: Awaitable[bytes]) -> bytes:
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            msg = f"No answer from the daemon within {self.timeout} s"
+            raise httpx.ReadTimeout(msg, request=self.request) from None
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while chunk := await self.read(self.reader.read(CHUNK_SIZE)):
+            yield chunk
+
+    async def aclose(self) -> None:
+        self.writer.close()
+        with contextlib.suppress(OSError):
+            await self.writer.wait_closed()
+
+
+class DaemonTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that forwards every request to the daemon.
+
+    Falls back to a direct connection if the socket is stale (daemon exited without cleanup).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.fallback: httpx.AsyncBaseTransport | None = None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.fallback is not None:
+            return await self.fallback.handle_async_request(request)
+        body = await request.aread()
+        header = {
+            "method": request.method,
+            "url": str(request.url),
+            "headers": {k: v for k, v in request.headers.items() if k in FORWARDED_HEADERS},
+            "length": len(body),
+            "priority": str(current_priority.get()),
+            # Processes queue fairly against each other unless they name their callers.
+            "caller": current_caller.get() or f"pid-{os.getpid()}",
+        }
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        except OSError:
+            logger.warning(
+                "Daemon socket %s is not accepting connections, going direct.", self.path
+            )
+            self.fallback = httpx.AsyncHTTPTransport()
+            return await self.fallback.handle_async_request(request)
+        # The daemon may hang, every read waits at most the client's read timeout.
+        timeout = request.extensions.get("timeout", {}).get("read")
+        stream = SocketStream(reader, writer, timeout, request)
+        try:
+            writer.write(json.dumps(header).encode() + b"\n" + body)
+            await writer.drain()
+            while (line := await stream.read(reader.readline())) == b"\n":
+                pass  # Keepalive, the request is still queued in the daemon.
+            meta = json.loads(line)
+        except BaseException:
+            await stream.aclose()
+            raise
+        if "error" in meta:
+            await stream.aclose()
+            raise httpx.TransportError(meta["error"], request=request)
+        return httpx.Response(
+            status_code=meta["status"], headers=meta["headers"], stream=stream, request=request
+        )
+
+    async def aclose(self) -> None:
+        if self.fallback is not None:
+            await self.fallback.aclose()
+
+
+@dataclass
+class Daemon:
+    """
+    Socket server sharing one `httpx.AsyncClient` (and its connection pool) across all callers.
+
+    Successful responses are cached in memory for `ttl` seconds and identical in-flight requests
+    are coalesced into a single upstream call. Upstream calls go through `scheduler`.
+    """
+
+    ttl: float = 300.0
+    timeout: float = 30.0
+    upstream: httpx.AsyncBaseTransport | None = field(default=None, repr=False)
+    client: httpx.AsyncClient = field(init=False, repr=False)
+    scheduler: Scheduler = field(default_factory=Scheduler, repr=False)
+    cache: dict[tuple[str, str, bytes], tuple[float, tuple[int, dict[str, str], bytes]]] = field(
+        init=False, repr=False, default_factory=dict
+    )
+    inflight: dict[tuple[str, str, bytes], asyncio.Future[tuple[int, dict[str, str], bytes]]] = (
+        field(init=False, repr=False, default_factory=dict)
+    )
+
+    def __post_init__(self) -> None:
+        self.client = httpx.AsyncClient(timeout=self.timeout, transport=self.upstream)
+
+    async def fetch(  # noqa: PLR0913
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes,
+        *,
+        level: Priority = Priority.INTERACTIVE,
+        caller: str = "",
+    ) -> tuple[int, dict[str, str], bytes]:
+        key = (method, url, body)
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        pending = self.inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future[tuple[int, dict[str, str], bytes]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.inflight[key] = future
+        try:
+            async with self.scheduler.slot(level, caller):
+                response = await self.client.request(method, url, headers=headers, content=body)
+            result = (
+                response.status_code,
+                {k: v for k, v in response.headers.items() if k in FORWARDED_HEADERS},
+                response.content,
+            )
+            if response.is_success:
+                self.cache[key] = (time.monotonic() + self.ttl, result)
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark as retrieved when nobody else is waiting.
+            raise
+        finally:
+            del self.inflight[key]
+        return result
+
+    async def respond(self, reader: asyncio.StreamReader) -> tuple[dict[str, Any], bytes]:
+        header = json.loads(await reader.readline())
+        body = await reader.readexactly(header["length"])
+        status, headers, content = await self.fetch(
+            header["method"],
+            header["url"],
+            header["headers"],
+            body,
+            level=Priority(header.get("priority", Priority.INTERACTIVE)),
+            caller=header.get("caller", ""),
+        )
+        return {"status": status, "headers": headers}, content
+
+    @staticmethod
+    async def keepalive(writer: asyncio.StreamWriter, awaitable: Awaitable[T]) -> T:
+        """
+        Await `awaitable`, writing an empty line to `writer` every `KEEPALIVE` seconds meanwhile.
+        """
+        task = asyncio.ensure_future(awaitable)
+        # If the client goes away the task still completes, e.g. for coalesced callers.
+        task.add_done_callback(lambda x: x.cancelled() or x.exception())
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=KEEPALIVE)
+            if done:
+                return task.result()
+            writer.write(b"\n")
+            await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                meta, content = await self.keepalive(writer, self.respond(reader))
+            except httpx.HTTPError as e:
+                meta, content = {"error": str(e)}, b""
+            except Exception as e:
+                # Every failure gets a header, so the client raises a readable error.
+                logger.exception("Failed to handle daemon request.")
+                meta, content = {"error": f"{type(e).__name__}: {e}"}, b""
+            writer.write(json.dumps(meta).encode() + b"\n" + content)
+            await writer.drain()
+        except OSError:
+            logger.exception("Failed to answer daemon request.")
+        finally:
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+
+    async def serve(self, path: str | None = None) -> None:
+        path = path or socket_path()
+        if is_running(path):
+            try:
+                _, writer = await asyncio.open_unix_connection(path)
+            except OSError:
+                os.unlink(path)  # Stale socket left behind by a daemon that was killed.
+            else:
+                writer.close()
+                logger.error("A daemon is already listening on %s", path)
+                raise SystemExit(1)
+        server = await asyncio.start_unix_server(self.handle, path=path)
+        os.chmod(path, 0o600)
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            await self.client.aclose()
+            with contextlib.suppress(OSError):
+                os.unlink(path)
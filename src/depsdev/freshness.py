@@ -0,0 +1,99 @@
+"""
+Dependency freshness: how many releases and how much time each dependency is behind its latest.
+
+Libyears follow https://libyear.com: the time between the release of the version in use and the
+release of the latest version, in years. Everything is computed locally from one version list
+per package, see `VersionIndex`.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from depsdev.versions import is_prerelease
+
+if TYPE_CHECKING:
+    from depsdev.versions import VersionIndex
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_YEAR = 365.25
+
+
+# RFC 3339 allows any number of fraction digits, `fromisoformat` before 3.11 only 3 or 6.
+FRACTION = re.compile(r"\.(\d+)")
+
+
+def parse_timestamp(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    # `fromisoformat` only accepts the "Z" suffix from Python 3.11 on.
+    text = FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), value.upper(), count=1)
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        logger.warning("Ignoring invalid timestamp %r.", value)
+        return None
+
+
+@dataclass
+class Freshness:
+    purl: str
+    current: str
+    latest: str | None
+    # Stable releases newer than `current`, up to and including `latest`.
+    behind: int = 0
+    libyears: float | None = None
+
+    @property
+    def outdated(self) -> bool:
+        return self.behind > 0
+
+
+def measure(purl: str, index: VersionIndex, current: str) -> Freshness:
+    latest = index.latest()
+    result = Freshness(purl, current, latest)
+    if latest is None:
+        return result
+    result.behind = sum(
+        1
+        for version in index.versions[index.upper(current) : index.upper(latest)]
+        if version not in index.excluded and not is_prerelease(index.system, version)
+    )
+    released = parse_timestamp(index.published.get(current))
+    newest = parse_timestamp(index.published.get(latest))
+    if released is not None and newest is not None:
+        result.libyears = max(0.0, (newest - released).total_seconds() / 86400 / DAYS_PER_YEAR)
+    return result
+
+
+@dataclass
+class ManifestFreshness:
+    source: str
+    packages: list[Freshness] = field(default_factory=list)
+
+    @property
+    def outdated(self) -> int:
+        return sum(x.outdated for x in self.packages)
+
+    @property
+    def behind(self) -> int:
+        return sum(x.behind for x in self.packages)
+
+    @property
+    def libyears(self) -> float:
+        return sum(x.libyears or 0.0 for x in self.packages)
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "source": self.source,
+            "packages": len(self.packages),
+            "outdated": self.outdated,
+            "behind": self.behind,
+            "libyears": round(self.libyears, 2),
+        }
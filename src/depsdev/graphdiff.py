@@ -0,0 +1,197 @@
+"""
+Diff two resolved dependency graphs as returned by `DepsDevClientV3.get_dependencies`.
+
+Every node gets a Merkle style fingerprint over its label, its outgoing requirements and the
+fingerprints of its dependencies. Nodes whose fingerprint exists in both graphs have identical
+outgoing edges, so only the edges of the remaining (changed) region have to be compared.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+import httpx
+
+from depsdev.v3 import DepsDevClientV3
+
+if TYPE_CHECKING:
+    from depsdev.v3 import Incomplete
+    from depsdev.v3 import System
+
+logger = logging.getLogger(__name__)
+
+Edge = tuple[str, str, str]
+
+
+@dataclass
+class Graph:
+    """
+    Resolved graph with nodes labelled `name@version`, node 0 is the root.
+    """
+
+    labels: list[str]
+    # Outgoing `(node, requirement)` pairs, sorted by the label of the dependency.
+    children: list[list[tuple[int, str]]]
+
+    @classmethod
+    def from_response(cls, response: Incomplete) -> Graph:
+        nodes = response.get("nodes", [])  # type: ignore[attr-defined]
+        labels = [f"{x['versionKey']['name']}@{x['versionKey']['version']}" for x in nodes]
+        children: list[list[tuple[int, str]]] = [[] for _ in labels]
+        for edge in response.get("edges", []):  # type: ignore[attr-defined]
+            children[edge["fromNode"]].append((edge["toNode"], edge.get("requirement", "")))
+        for kids in children:
+            kids.sort(key=lambda x: (labels[x[0]], x[1]))
+        return cls(labels, children)
+
+    def fingerprints(self) -> list[bytes]:
+        """
+        Post-order hashes, computed iteratively so deep chains do not hit the recursion limit.
+
+        A dependency still being visited (a cycle) contributes its label instead of its hash.
+        """
+        done: list[bytes | None] = [None] * len(self.labels)
+        visiting = [False] * len(self.labels)
+        for start in range(len(self.labels)):
+            if done[start] is not None:
+                continue
+            stack = [(start, 0)]
+            visiting[start] = True
+            while stack:
+                node, i = stack[-1]
+                kids = self.children[node]
+                if i < len(kids):
+                    stack[-1] = (node, i + 1)
+                    child = kids[i][0]
+                    if done[child] is None and not visiting[child]:
+                        visiting[child] = True
+                        stack.append((child, 0))
+                    continue
+                digest = hashlib.blake2b(self.labels[node].encode(), digest_size=16)
+                for child, requirement in kids:
+                    digest.update(b"\0" + requirement.encode() + b"\0")
+                    digest.update(done[child] or b"cycle:" + self.labels[child].encode())
+                done[node] = digest.digest()
+                visiting[node] = False
+                stack.pop()
+        return done  # type: ignore[return-value]
+
+    def edges(self, nodes: list[int]) -> set[Edge]:
+        return {
+            (self.labels[node], self.labels[child], requirement)
+            for node in nodes
+            for child, requirement in self.children[node]
+        }
+
+
+def split_label(label: str) -> tuple[str, str]:
+    name, _, version = label.rpartition("@")
+    return name, version
+
+
+@dataclass
+class GraphDiff:
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # name -> (old versions, new versions) for packages present in both graphs.
+    changed: dict[str, tuple[list[str], list[str]]] = field(default_factory=dict)
+    added_edges: list[Edge] = field(default_factory=list)
+    removed_edges: list[Edge] = field(default_factory=list)
+    # Advisories of added nodes that none of the removed versions of that package had.
+    advisories: dict[str, list[str]] = field(default_factory=dict)
+    # Nodes with the same fingerprint in both graphs, their edges were not compared.
+    unchanged: int = 0
+
+
+def diff_graphs(old: Graph, new: Graph) -> GraphDiff:
+    old_fps = old.fingerprints()
+    new_fps = new.fingerprints()
+    shared = set(old_fps) & set(new_fps)
+    old_changed = [i for i, fp in enumerate(old_fps) if fp not in shared]
+    new_changed = [i for i, fp in enumerate(new_fps) if fp not in shared]
+
+    old_labels = set(old.labels)
+    new_labels = set(new.labels)
+    old_edges = old.edges(old_changed)
+    new_edges = new.edges(new_changed)
+
+    result = GraphDiff(
+        added=sorted(new_labels - old_labels),
+        removed=sorted(old_labels - new_labels),
+        added_edges=sorted(new_edges - old_edges),
+        removed_edges=sorted(old_edges - new_edges),
+        unchanged=len(old_fps) - len(old_changed),
+    )
+    old_versions: dict[str, list[str]] = {}
+    for label in result.removed:
+        name, version = split_label(label)
+        old_versions.setdefault(name, []).append(version)
+    new_versions: dict[str, list[str]] = {}
+    for label in result.added:
+        name, version = split_label(label)
+        new_versions.setdefault(name, []).append(version)
+    for name in sorted(old_versions.keys() & new_versions.keys()):
+        result.changed[name] = (old_versions[name], new_versions[name])
+    return result
+
+
+async def get_advisories(
+    client: DepsDevClientV3,
+    system: System,
+    labels: list[str],
+    semaphore: asyncio.Semaphore,
+) -> dict[str, list[str]]:
+    async def fetch(label: str) -> list[str]:
+        name, version = split_label(label)
+        async with semaphore:
+            try:
+                result = await client.get_version(system, name, version)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:  # noqa: PLR2004
+                    return []
+                raise
+        return [x["id"] for x in result.get("advisoryKeys", [])]  # type: ignore[attr-defined]
+
+    advisories = await asyncio.gather(*(fetch(x) for x in labels))
+    return dict(zip(labels, advisories))
+
+
+async def diff_versions(  # noqa: PLR0913
+    system: System,
+    name: str,
+    old: str,
+    new: str,
+    *,
+    client: DepsDevClientV3 | None = None,
+    concurrency: int = 16,
+) -> GraphDiff:
+    """
+    Fetch both resolved graphs concurrently, diff them and look up newly introduced advisories.
+    """
+    client = client or DepsDevClientV3()
+    old_response, new_response = await asyncio.gather(
+        client.get_dependencies(system, name, old),
+        client.get_dependencies(system, name, new),
+    )
+    result = await asyncio.to_thread(
+        diff_graphs, Graph.from_response(old_response), Graph.from_response(new_response)
+    )
+
+    semaphore = asyncio.Semaphore(concurrency)
+    added, removed = await asyncio.gather(
+        get_advisories(client, system, result.added, semaphore),
+        get_advisories(client, system, result.removed, semaphore),
+    )
+    known: dict[str, set[str]] = {}
+    for label, ids in removed.items():
+        known.setdefault(split_label(label)[0], set()).update(ids)
+    for label, ids in added.items():
+        introduced = [x for x in ids if x not in known.get(split_label(label)[0], set())]
+        if introduced:
+            result.advisories[label] = introduced
+    return result
@@ -0,0 +1,164 @@
+"""
+Project health (OpenSSF Scorecard and repository metadata) for many packages at once.
+
+The source repository of every package version comes from the purl batch endpoint. Many packages
+share a repository, so the project ids are de-duplicated before they are resolved through the
+project batch endpoint. Projects change slowly. When the shared SQLite store is enabled, resolved
+ones are kept there for `PROJECT_TTL` seconds, so later runs only ask for projects they have not
+seen recently.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from depsdev.batching import AdaptiveBatcher
+from depsdev.batching import iter_batches
+from depsdev.paging import BATCH_SIZE
+from depsdev.paging import MAX_BATCH_SIZE
+from depsdev.paging import iter_pages
+from depsdev.paging import iter_purl_lookup_batch
+from depsdev.scheduler import Priority
+from depsdev.scheduler import priority
+from depsdev.shared import SharedStore
+from depsdev.shared import is_offline
+from depsdev.shared import request_key
+from depsdev.shared import store_path
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Sequence
+
+    from depsdev.v3 import Incomplete
+
+logger = logging.getLogger(__name__)
+
+PROJECT_TTL = 7 * 24 * 3600.0
+
+
+def project_store() -> SharedStore | None:
+    """
+    The shared store with the project TTL, `None` unless `DEPSDEV_SHARED` or offline mode is set.
+    """
+    path = store_path()
+    if path is None:
+        return None
+    return SharedStore(path, rate=0, ttl=PROJECT_TTL, offline=is_offline())
+
+
+def source_project(version: Incomplete) -> str | None:
+    related = version.get("relatedProjects", [])  # type: ignore[attr-defined]
+    for project in related:
+        if project.get("relationType") == "SOURCE_REPO":
+            return project["projectKey"]["id"]
+    return related[0]["projectKey"]["id"] if related else None
+
+
+def summary(project: Incomplete) -> dict[str, object]:
+    scorecard = project.get("scorecard") or {}  # type: ignore[attr-defined]
+    return {
+        "id": project["projectKey"]["id"],  # type: ignore[index]
+        "scorecard": scorecard.get("overallScore"),
+        "scorecard_date": scorecard.get("date"),
+        "stars": project.get("starsCount"),  # type: ignore[attr-defined]
+        "open_issues": project.get("openIssuesCount"),  # type: ignore[attr-defined]
+        "license": project.get("license"),  # type: ignore[attr-defined]
+    }
+
+
+def project_key(project_id: str) -> str:
+    return request_key("PROJECT", project_id, b"")
+
+
+async def get_projects(
+    project_ids: list[str],
+    client: DepsDevClientV3Alpha,
+    store: SharedStore | None = None,
+    *,
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = 8,
+) -> dict[str, Incomplete]:
+    """
+    Resolve `project_ids`, from `store` where possible and in parallel paginated batches otherwise.
+    """
+    projects: dict[str, Incomplete] = {}
+    missing = list(dict.fromkeys(project_ids))
+    if store is not None:
+        cached = await asyncio.to_thread(lambda: [store.get(project_key(x)) for x in missing])
+        for project_id, row in zip(missing, cached):
+            if row is not None:
+                projects[project_id] = json.loads(row[2])
+        missing = [x for x in missing if x not in projects]
+    cached_count = len(projects)
+
+    batcher = AdaptiveBatcher(
+        "projectbatch",
+        size=batch_size,
+        max_size=MAX_BATCH_SIZE,
+        window=concurrency,
+        max_window=max(concurrency, 16),
+        fixed=client.caches_responses,
+    )
+
+    async def fetch(chunk: list[str]) -> AsyncIterator[tuple[str, Incomplete]]:
+        with priority(Priority.BULK):
+            async for page in iter_pages(lambda token: client.get_project_batch(chunk, token)):
+                for response in page.get("responses", []):  # type: ignore[attr-defined]
+                    if "project" in response:
+                        yield response["request"]["projectKey"]["id"], response["project"]
+
+    projects.update({x: project async for x, project in iter_batches(missing, fetch, batcher)})
+    if store is not None:
+        expires = time.time() + store.ttl
+        rows = [
+            (project_key(x), expires, 200, "application/json", json.dumps(projects[x]).encode())
+            for x in missing
+            if x in projects
+        ]
+        await asyncio.to_thread(store.put_rows, rows)
+    logger.info("Resolved %s projects, %s from the cache.", len(projects), cached_count)
+    return projects
+
+
+async def enrich(
+    purls: Sequence[str],
+    client: DepsDevClientV3Alpha | None = None,
+    store: SharedStore | None = None,
+    concurrency: int = 8,
+) -> dict[str, dict[str, object]]:
+    """
+    Health summary of the source project of each purl that has a known one.
+    """
+    client = client or DepsDevClientV3Alpha()
+    purl_projects: dict[str, str] = {}
+    async for purl, version in iter_purl_lookup_batch(client, purls, concurrency=concurrency):
+        project_id = source_project(version)
+        if project_id is not None:
+            purl_projects[purl] = project_id
+    projects = await get_projects(
+        list(purl_projects.values()), client, store, concurrency=concurrency
+    )
+    return {
+        purl: summary(projects[project_id])
+        for purl, project_id in purl_projects.items()
+        if project_id in projects
+    }
+
+
+async def enrich_from_env(
+    purls: Sequence[str], concurrency: int = 8
+) -> dict[str, dict[str, object]]:
+    """
+    `enrich` with the projects cached in the shared store, if it is enabled.
+    """
+    store = project_store()
+    try:
+        return await enrich(purls, store=store, concurrency=concurrency)
+    finally:
+        if store is not None:
+            store.close()
@@ -0,0 +1,336 @@
+"""
+Incremental JSON reader for documents too large to load at once.
+
+The reader pulls text from an iterable of chunks and walks the document structurally. Only the
+values that are asked for are materialised, and those are decoded with the C accelerated
+`json` decoder, so memory stays proportional to the largest selected item instead of the
+whole document.
+
+    for name, info in kvitems(iter_chunks("Pipfile.lock"), "default"):
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import json
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable
+    from collections.abc import AsyncIterator
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from typing import Any
+
+CHUNK_SIZE = 64 * 1024
+# Chunks and parsed items held between the download, the parser thread and the consumer.
+BUFFERED = 64
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Everything up to the next bracket that is not inside a (complete) string.
+SKIP_PLAIN = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+DELIMITERS = frozenset(",:]} \t\n\r")
+DECODER = json.JSONDecoder()
+scanstring = json.decoder.scanstring  # type: ignore[attr-defined]
+
+
+def iter_chunks(filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    with open(filename, encoding="utf-8") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+class JSONReader:
+    """
+    Pull parser over a stream of `str` or `bytes` chunks.
+
+    `members()` and `elements()` step through containers, `value()` decodes the next value and
+    `skip()` jumps over it without building it.
+    """
+
+    def __init__(self, chunks: Iterable[str | bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self) -> bool:
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self._decoder.decode(b"", final=True)
+        elif isinstance(chunk, bytes):
+            text = self._decoder.decode(chunk)
+        else:
+            text = chunk
+        self.buf = self.buf[self.pos :] + text
+        self.pos = 0
+        return True
+
+    def _error(self, msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, self.buf, self.pos)
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character without consuming it, "" at the end.
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()  # type: ignore[union-attr]
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            msg = f"Expecting {char!r}"
+            raise self._error(msg)
+        self.pos += 1
+
+    def string(self) -> str:
+        if self.peek() != '"':
+            msg = "Expecting string"
+            raise self._error(msg)
+        while True:
+            try:
+                result, self.pos = scanstring(self.buf, self.pos + 1)
+            except json.JSONDecodeError:  # noqa: PERF203
+                if not self._more():
+                    raise
+            else:
+                return result
+
+    def value(self) -> Any:  # noqa: ANN401
+        self.peek()
+        wanted = 0
+        while True:
+            try:
+                result, end = DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number cut short by the end of the buffer ("1", "1.", "1e") may continue in
+                # the next chunk, so only trust it once a delimiter follows.
+                if self.eof or self.buf[end : end + 1] in DELIMITERS:
+                    self.pos = end
+                    return result
+            # Grow geometrically so re-decoding a large value stays linear overall.
+            wanted = max(2 * (len(self.buf) - self.pos), wanted)
+            while self._more() and len(self.buf) - self.pos < wanted:
+                pass
+
+    def skip(self) -> None:
+        if self.peek() not in ("{", "["):
+            self.value()
+            return
+        depth = 0
+        while True:
+            self.pos = SKIP_PLAIN.match(self.buf, self.pos).end()  # type: ignore[union-attr]
+            char = self.buf[self.pos : self.pos + 1]
+            if char in ("", '"'):
+                # End of the buffer or a string cut short by it, resume once more data arrived.
+                if not self._more():
+                    msg = "Unterminated value"
+                    raise self._error(msg)
+                continue
+            self.pos += 1
+            depth += 1 if char in ("{", "[") else -1
+            if depth == 0:
+                return
+
+    def members(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the object at the current position.
+
+        The caller must consume each member's value (`value()`, `skip()`, ...) before advancing.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.string()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                self.pos -= 1
+                msg = "Expecting ',' delimiter"
+                raise self._error(msg)
+
+    def elements(self) -> Iterator[int]:
+        """
+        Iterate over the indices of the array at the current position, same contract as `members`.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                self.pos -= 1
+                msg = "Expecting ',' delimiter"
+                raise self._error(msg)
+
+    def walk(self, prefix: str) -> Iterator[None]:
+        """
+        Position the reader on every value matching `prefix` (ijson style, "item" for array items).
+        """
+        for _ in self.walk_many([prefix]):
+            yield
+
+    def walk_many(self, prefixes: list[str]) -> Iterator[str]:
+        """
+        Like `walk` for several prefixes in one pass, yields the prefix each value matched.
+        """
+        yield from self._walk([(x, x.split(".") if x else []) for x in prefixes])
+
+    def _walk(self, paths: list[tuple[str, list[str]]]) -> Iterator[str]:
+        for prefix, parts in paths:
+            if not parts:
+                yield prefix
+                return
+        char = self.peek()
+        if char == "{":
+            for key in self.members():
+                matching = [(prefix, parts[1:]) for prefix, parts in paths if parts[0] == key]
+                if matching:
+                    yield from self._walk(matching)
+                else:
+                    self.skip()
+        elif char == "[":
+            matching = [(prefix, parts[1:]) for prefix, parts in paths if parts[0] == "item"]
+            for _ in self.elements():
+                if matching:
+                    yield from self._walk(matching)
+                else:
+                    self.skip()
+        else:
+            self.skip()
+
+
+def items(chunks: Iterable[str | bytes], prefix: str) -> Iterator[Any]:
+    """
+    Yield every value found at `prefix`, e.g. "components.item".
+    """
+    reader = JSONReader(chunks)
+    for _ in reader.walk(prefix):
+        yield reader.value()
+
+
+def kvitems(chunks: Iterable[str | bytes], prefix: str) -> Iterator[tuple[str, Any]]:
+    """
+    Yield the `(key, value)` pairs of every object found at `prefix`.
+    """
+    reader = JSONReader(chunks)
+    for _ in reader.walk(prefix):
+        if reader.peek() != "{":
+            reader.skip()
+            continue
+        for key in reader.members():
+            yield key, reader.value()
+
+
+def iter_items(chunks: Iterable[str | bytes], prefixes: list[str]) -> Iterator[tuple[str, Any]]:
+    """
+    Yield `(prefix, value)` for every value found at any of `prefixes`, in document order.
+    """
+    reader = JSONReader(chunks)
+    for prefix in reader.walk_many(prefixes):
+        yield prefix, reader.value()
+
+
+async def aiter_items(  # noqa: C901, PLR0915
+    chunks: AsyncIterable[bytes],
+    prefixes: list[str],
+    buffered: int = BUFFERED,
+) -> AsyncIterator[tuple[str, Any]]:
+    """
+    `iter_items` over an async byte stream, such as `httpx.Response.aiter_bytes()`.
+
+    Chunks are read on the event loop and parsed on a thread of its own, so large decodes do not
+    stall the loop. The parser blocks while the consumer lags behind, so it stays out of the
+    loop's default executor where it could starve other `asyncio.to_thread` work. At most
+    `buffered` chunks and `buffered` parsed items are held in between, a slow consumer therefore
+    slows down the download instead of piling up the payload.
+    """
+    loop = asyncio.get_running_loop()
+    incoming: queue.Queue[bytes | None] = queue.Queue()
+    room = asyncio.Semaphore(buffered)
+    parsed: asyncio.Queue[tuple[str, Any] | Exception | None] = asyncio.Queue()
+    slots = threading.Semaphore(buffered)
+    stop = threading.Event()
+
+    def read() -> Iterator[bytes]:
+        while (chunk := incoming.get()) is not None:
+            if not stop.is_set():
+                loop.call_soon_threadsafe(room.release)
+            yield chunk
+
+    def put(item: tuple[str, Any] | Exception | None) -> bool:
+        while not slots.acquire(timeout=0.1):
+            if stop.is_set():
+                return False
+        if stop.is_set():
+            return False
+        loop.call_soon_threadsafe(parsed.put_nowait, item)
+        return True
+
+    def parse() -> None:
+        try:
+            for item in iter_items(read(), prefixes):
+                if not put(item):
+                    return
+        except Exception as e:  # noqa: BLE001
+            put(e)
+        else:
+            put(None)
+
+    async def feed() -> None:
+        try:
+            async for chunk in chunks:
+                await room.acquire()
+                incoming.put(chunk)
+        finally:
+            incoming.put(None)
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jsonstream")
+    worker = loop.run_in_executor(executor, parse)
+    feeder = asyncio.ensure_future(feed())
+    try:
+        while (item := await parsed.get()) is not None:
+            slots.release()
+            if isinstance(item, Exception):
+                # A body cut short by a failed download is reported as that failure.
+                if feeder.done() and feeder.exception() is not None:
+                    raise feeder.exception()  # type: ignore[misc]
+                raise item
+            yield item
+        await feeder
+    finally:
+        stop.set()
+        feeder.cancel()
+        incoming.put(None)
+        try:
+            await worker
+        finally:
+            executor.shutdown(wait=False)
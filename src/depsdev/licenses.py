@@ -0,0 +1,120 @@
+"""
+License interning and allow/deny policy evaluation for SPDX license expressions.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from dataclasses import field
+from enum import Enum
+
+TOKEN = re.compile(r"\(|\)|[^\s()]+")
+
+
+class Verdict(str, Enum):
+    ALLOWED = "allowed"
+    DENIED = "denied"
+    UNKNOWN = "unknown"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+@dataclass
+class Policy:
+    """
+    A license is acceptable when it is not denied and, if an allow list is given, is allowed.
+
+    Expressions follow SPDX semantics: `A OR B` needs one acceptable side, `A AND B` needs both and
+    `A WITH exception` is judged by `A`.
+    """
+
+    allow: frozenset[str] = frozenset()
+    deny: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_lists(cls, allow: list[str], deny: list[str]) -> Policy:
+        return cls(
+            frozenset(x.lower() for x in allow),
+            frozenset(x.lower() for x in deny),
+        )
+
+    def accepts(self, license_id: str) -> bool:
+        license_id = license_id.lower()
+        if license_id in self.deny:
+            return False
+        return not self.allow or license_id in self.allow
+
+    def evaluate(self, expression: str) -> Verdict:
+        if not expression or expression.lower() in ("non-standard", "noassertion", "unknown"):
+            return Verdict.UNKNOWN
+        try:
+            tokens = TOKEN.findall(expression)
+            result, end = self._or(tokens, 0)
+        except IndexError:
+            return Verdict.UNKNOWN
+        if end != len(tokens):
+            return Verdict.UNKNOWN
+        return Verdict.ALLOWED if result else Verdict.DENIED
+
+    def _or(self, tokens: list[str], i: int) -> tuple[bool, int]:
+        result, i = self._and(tokens, i)
+        while i < len(tokens) and tokens[i].upper() == "OR":
+            right, i = self._and(tokens, i + 1)
+            result = result or right
+        return result, i
+
+    def _and(self, tokens: list[str], i: int) -> tuple[bool, int]:
+        result, i = self._atom(tokens, i)
+        while i < len(tokens) and tokens[i].upper() == "AND":
+            right, i = self._atom(tokens, i + 1)
+            result = result and right
+        return result, i
+
+    def _atom(self, tokens: list[str], i: int) -> tuple[bool, int]:
+        if tokens[i] == "(":
+            result, i = self._or(tokens, i + 1)
+            if tokens[i] != ")":
+                raise IndexError(i)
+            return result, i + 1
+        result = self.accepts(tokens[i])
+        i += 1
+        if i < len(tokens) and tokens[i].upper() == "WITH":
+            i += 2
+        return result, i
+
+
+@dataclass
+class LicenseTable:
+    """
+    Interned license expressions: each distinct string is stored and judged once, packages only
+    hold small integer ids.
+    """
+
+    policy: Policy = field(default_factory=Policy)
+    expressions: list[str] = field(default_factory=list)
+    verdicts: list[Verdict] = field(default_factory=list)
+    ids: dict[str, int] = field(default_factory=dict)
+    counts: list[int] = field(default_factory=list)
+
+    def intern(self, expression: str) -> int:
+        license_id = self.ids.get(expression)
+        if license_id is None:
+            license_id = self.ids[expression] = len(self.expressions)
+            self.expressions.append(expression)
+            self.verdicts.append(self.policy.evaluate(expression))
+            self.counts.append(0)
+        self.counts[license_id] += 1
+        return license_id
+
+    def verdict(self, license_ids: tuple[int, ...]) -> Verdict:
+        """
+        A package is denied if any of its licenses is, unknown if it has none or only unknown ones.
+        """
+        verdicts = {self.verdicts[x] for x in license_ids}
+        if Verdict.DENIED in verdicts:
+            return Verdict.DENIED
+        if Verdict.ALLOWED in verdicts:
+            return Verdict.ALLOWED
+        return Verdict.UNKNOWN
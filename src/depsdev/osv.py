@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 from depsdev.base import BaseClient
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
     from typing import Any
     from typing import Literal
 
@@ -151,6 +152,17 @@ class OSVClientV1(BaseClient):
         """  # noqa: E501
         return await self._requests(method="POST", url="/v1/querybatch", json=query)  # type:ignore[return-value]
 
+    async def iter_querybatch(self, query: V1Batchquery) -> AsyncIterator[QueryBatchResult]:
+        """
+        Streaming variant of `querybatch`, yields each result in input order as it is parsed.
+
+        POST /v1/querybatch
+        """
+        async for _, item in self._stream_items(
+            ["results.item"], method="POST", url="/v1/querybatch", json=query
+        ):
+            yield item  # type:ignore[misc]
+
     async def get_vuln(self, vuln_id: str) -> OSVVulnerability:
         """
         Returns vulnerability information for a given vulnerability id.
@@ -0,0 +1,119 @@
+"""
+Helpers for the paginated v3alpha batch endpoints.
+
+Large inputs are split into chunks that are fetched in parallel, every chunk follows its own
+`nextPageToken` chain, and results are yielded as soon as any page arrives. Chunk size and the
+number of chunks in flight adapt to the observed latency, see `depsdev.batching`.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from depsdev.batching import AdaptiveBatcher
+from depsdev.batching import iter_batches
+from depsdev.cli.purl import PURL_SYSTEMS
+from depsdev.cli.purl import to_version_key
+from depsdev.purltable import PurlTable
+from depsdev.scheduler import Priority
+from depsdev.scheduler import priority
+from depsdev.v3 import System
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Awaitable
+    from collections.abc import Callable
+    from collections.abc import Sequence
+
+    from depsdev.v3 import Incomplete
+    from depsdev.v3alpha import DepsDevClientV3Alpha
+    from depsdev.v3alpha import PurlDict
+
+# Where the adaptive batch size starts, the API accepts up to 5000 requests per batch.
+BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 5000
+
+
+async def iter_pages(
+    fetch: Callable[[str | None], Awaitable[Incomplete]],
+) -> AsyncIterator[Incomplete]:
+    """
+    Yield every page of a paginated call, `fetch` receives the page token (`None` first).
+    """
+    token = None
+    while True:
+        page = await fetch(token)
+        yield page
+        token = page.get("nextPageToken")  # type: ignore[attr-defined]
+        if not token:
+            return
+
+
+async def iter_purl_lookup_batch(
+    client: DepsDevClientV3Alpha,
+    purls: Sequence[str],
+    *,
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = 8,
+    batcher: AdaptiveBatcher | None = None,
+) -> AsyncIterator[tuple[str, Incomplete]]:
+    """
+    Yield `(purl, version)` for every versioned purl deps.dev supports, in completion order.
+
+    `version` is the GetVersion style payload, empty when deps.dev does not know the version.
+    A `PurlTable` is filtered on its codes and each chunk is only formatted when it is sent.
+    `batch_size` and `concurrency` are where the adaptive batch size and window start. The batch
+    size stays at `batch_size` when the client caches responses.
+    """
+    if isinstance(purls, PurlTable):
+        purls = purls.select(types=PURL_SYSTEMS, versioned=True)
+    else:
+        purls = [x for x in dict.fromkeys(purls) if to_version_key(x) is not None]
+    batcher = batcher or AdaptiveBatcher(
+        "purlbatch",
+        size=batch_size,
+        max_size=MAX_BATCH_SIZE,
+        window=concurrency,
+        max_window=max(concurrency, 16),
+        fixed=client.caches_responses,
+    )
+
+    async def fetch(chunk: list[str]) -> AsyncIterator[tuple[str, Incomplete]]:
+        with priority(Priority.BULK):
+            async for page in iter_pages(lambda token: client.purl_lookup_batch(chunk, token)):
+                for response in page.get("responses", []):  # type: ignore[attr-defined]
+                    yield response["request"]["purl"], response.get("result", {}).get("version", {})
+
+    async for item in iter_batches(purls, fetch, batcher):
+        yield item
+
+
+async def iter_version_batch(
+    client: DepsDevClientV3Alpha,
+    keys: Sequence[tuple[System, str, str]],
+    *,
+    batcher: AdaptiveBatcher | None = None,
+) -> AsyncIterator[tuple[tuple[System, str, str], Incomplete]]:
+    """
+    Yield `((system, name, version), version)` for every key, in completion order.
+    """
+    keys = list(dict.fromkeys(keys))
+    batcher = batcher or AdaptiveBatcher(
+        "versionbatch", max_size=MAX_BATCH_SIZE, fixed=client.caches_responses
+    )
+
+    async def fetch(
+        chunk: list[tuple[System, str, str]],
+    ) -> AsyncIterator[tuple[tuple[System, str, str], Incomplete]]:
+        requests: list[PurlDict] = [
+            {"system": system, "name": name, "version": version} for system, name, version in chunk
+        ]
+        with priority(Priority.BULK):
+            async for page in iter_pages(lambda token: client.get_version_batch(requests, token)):
+                for response in page.get("responses", []):  # type: ignore[attr-defined]
+                    key = response["request"]["versionKey"]
+                    system = System(key["system"])
+                    yield (system, key["name"], key["version"]), response.get("version", {})
+
+    async for item in iter_batches(keys, fetch, batcher):
+        yield item
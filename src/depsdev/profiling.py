@@ -0,0 +1,193 @@
+"""
+Opt-in profiling of a CLI run.
+
+Code marks its stages with `stage("name")`, which costs a global lookup while profiling is off and
+needs none of the CLI extras. When a `Profiler` is active, each stage accumulates wall and CPU
+time, the event loop is sampled for lag, and optionally a cProfile dump (`.prof`) or collapsed
+stacks for flamegraph tools (any other extension) are written at the end.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from collections.abc import Iterator
+    from types import FrameType
+    from typing import TypeVar
+
+    from rich.console import Console
+
+    T = TypeVar("T")
+
+LAG_INTERVAL = 0.01
+SAMPLE_INTERVAL = 0.005
+
+
+@dataclass
+class Stage:
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+
+
+@dataclass
+class Profiler:
+    output: str | None = None
+    stages: dict[str, Stage] = field(default_factory=dict)
+    lags: list[float] = field(default_factory=list)
+    stacks: Counter[str] = field(default_factory=Counter)
+    # Latest values reported by components such as the adaptive batchers, by component.
+    metrics: dict[str, dict[str, object]] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    cpu_started: float = field(default_factory=time.process_time)
+    profile: cProfile.Profile | None = field(init=False, default=None)
+    sampler: threading.Thread | None = field(init=False, default=None)
+    stopped: threading.Event = field(init=False, default_factory=threading.Event)
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a stage. CPU time is process wide, so concurrent tasks are included.
+        """
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name, Stage())
+            stage.calls += 1
+            stage.wall += time.perf_counter() - wall
+            stage.cpu += time.process_time() - cpu
+
+    async def sample_lag(self, interval: float = LAG_INTERVAL) -> None:
+        """
+        Measure how late the loop wakes up from a short sleep, a busy loop wakes up late.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self.lags.append(max(0.0, loop.time() - expected))
+
+    def sample_stacks(self, thread_id: int, interval: float = SAMPLE_INTERVAL) -> None:
+        while not self.stopped.wait(interval):
+            frame: FrameType | None = sys._current_frames().get(thread_id)  # noqa: SLF001
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        if self.output is None:
+            return
+        if self.output.endswith(".prof"):
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            self.sampler = threading.Thread(
+                target=self.sample_stacks, args=(threading.get_ident(),), daemon=True
+            )
+            self.sampler.start()
+
+    def stop(self) -> None:
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.output)  # type: ignore[arg-type]
+        if self.sampler is not None:
+            self.stopped.set()
+            self.sampler.join()
+            with open(self.output, "w", encoding="utf-8") as f:  # type: ignore[arg-type]
+                f.writelines(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+    def report(self, console: Console) -> None:
+        from rich.table import Table
+
+        table = Table(title="Profile")
+        table.add_column("Stage")
+        table.add_column("Calls", justify="right")
+        table.add_column("Wall (s)", justify="right")
+        table.add_column("CPU (s)", justify="right")
+        for name, stage in self.stages.items():
+            table.add_row(name, str(stage.calls), f"{stage.wall:.3f}", f"{stage.cpu:.3f}")
+        table.add_row(
+            "total",
+            "",
+            f"{time.perf_counter() - self.started:.3f}",
+            f"{time.process_time() - self.cpu_started:.3f}",
+            style="bold",
+        )
+        console.print(table)
+        if self.lags:
+            lags = sorted(self.lags)
+            p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+            console.print(
+                f"Event loop lag over {len(lags)} samples: "
+                f"mean {sum(lags) / len(lags) * 1000:.1f} ms, "
+                f"p99 {p99 * 1000:.1f} ms, max {lags[-1] * 1000:.1f} ms"
+            )
+        for name, values in self.metrics.items():
+            console.print(f"{name}: " + ", ".join(f"{k} {v}" for k, v in values.items()))
+        if self.output is not None:
+            console.print(f"Wrote {self.output}")
+
+
+profiler: Profiler | None = None
+
+
+def stage(name: str) -> contextlib.AbstractContextManager[None]:
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.stage(name)
+
+
+def record(name: str, values: dict[str, object]) -> None:
+    if profiler is not None:
+        profiler.metrics[name] = values
+
+
+def enable(output: str | None = None) -> Profiler:
+    global profiler  # noqa: PLW0603
+    profiler = Profiler(output)
+    profiler.start()
+    return profiler
+
+
+def finish() -> None:
+    """
+    Stop the active profiler, if any, and print its report to stderr.
+    """
+    global profiler
+    if profiler is None:
+        return
+    current, profiler = profiler, None
+    current.stop()
+    from rich.console import Console
+
+    current.report(Console(stderr=True))
+
+
+async def run(awaitable: Awaitable[T]) -> T:
+    """
+    Await `awaitable`, sampling the event loop lag meanwhile if profiling is enabled.
+    """
+    if profiler is None:
+        return await awaitable
+    sampler = asyncio.ensure_future(profiler.sample_lag())
+    try:
+        return await awaitable
+    finally:
+        sampler.cancel()
@@ -0,0 +1,225 @@
+"""
+Compact, de-duplicated storage for large purl inventories.
+
+Every component of a purl is interned into one string pool and the table only keeps integer
+codes, one array per component. A fleet-wide inventory with millions of lines, most of them
+repeating the same few thousand packages, then costs a handful of bytes per distinct purl and no
+string formatting until a purl is actually read back.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+from typing import Optional
+from typing import overload
+
+from packageurl import PackageURL
+
+if TYPE_CHECKING:
+    from collections.abc import Collection
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+# Width of one packed code in the de-duplication key.
+CODE_BITS = 32
+
+
+Components = tuple[str, Optional[str], str, Optional[str], str]
+
+
+def pack(codes: Iterable[int]) -> int:
+    key = 0
+    for code in codes:
+        key = key << CODE_BITS | code
+    return key
+
+
+def components(purl: PackageURL) -> Components:
+    """
+    `(type, namespace, name, version, extra)`, `extra` holds the encoded qualifiers and subpath.
+    """
+    extra = ""
+    if purl.qualifiers or purl.subpath:
+        base = PackageURL(purl.type, purl.namespace, purl.name, purl.version).to_string()
+        extra = purl.to_string()[len(base) :]
+    return purl.type, purl.namespace, purl.name, purl.version, extra
+
+
+def parse(purl: str) -> Components:
+    try:
+        return components(PackageURL.from_string(purl))
+    except ValueError:
+        return "", None, purl, None, ""
+
+
+class PurlTable(Sequence[str]):
+    """
+    Distinct purls as integer-coded type, namespace, name, version and qualifier columns.
+
+    Rows are numbered in insertion order and read back as canonical purl strings, built on
+    access. Purls added as strings read back as given, strings that are not valid purls are kept
+    verbatim with an empty type. The table is
+    a `Sequence[str]`, so it can be passed wherever a list of purls is expected.
+    """
+
+    def __init__(self) -> None:
+        # Code 0 is the empty string, which also stands for a missing component.
+        self.strings: list[str] = [""]
+        self.codes: dict[str, int] = {"": 0}
+        self.types = array("L")
+        self.namespaces = array("L")
+        self.names = array("L")
+        self.versions = array("L")
+        # Qualifiers and subpath, already encoded as they appear at the end of the purl.
+        self.extras = array("L")
+        self.rows: dict[int, int] = {}
+        # Purls added as strings that are spelled differently from their canonical form.
+        self.verbatim: dict[int, str] = {}
+
+    @classmethod
+    def from_purls(cls, purls: Iterable[PackageURL | str]) -> PurlTable:
+        table = cls()
+        table.extend(purls)
+        return table
+
+    def intern(self, value: str | None) -> int:
+        if not value:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def add(
+        self,
+        type: str,  # noqa: A002
+        namespace: str | None,
+        name: str,
+        version: str | None = None,
+        extra: str = "",
+    ) -> int:
+        """
+        Row of the purl with these components, appended if it is not in the table yet.
+        """
+        codes = tuple(map(self.intern, (type, namespace, name, version, extra)))
+        key = pack(codes)
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = len(self.types)
+            for column, code in zip(self.columns, codes):
+                column.append(code)
+        return row
+
+    def add_purl(self, purl: PackageURL) -> int:
+        return self.add(*components(purl))
+
+    def add_string(self, purl: str) -> int:
+        """
+        Row of `purl`, which reads back as given the first time it is seen.
+        """
+        size = len(self)
+        row = self.add(*parse(purl))
+        if row == size and self.types[row] and self.to_string(row) != purl:
+            self.verbatim[row] = purl
+        return row
+
+    def extend(self, purls: Iterable[PackageURL | str]) -> None:
+        for purl in purls:
+            if isinstance(purl, str):
+                self.add_string(purl)
+            else:
+                self.add_purl(purl)
+
+    def find(self, purl: str) -> int | None:
+        """
+        Row of `purl`, `None` when it is not in the table.
+        """
+        codes = []
+        for value in parse(purl):
+            code = self.codes.get(value or "")
+            if code is None:
+                return None
+            codes.append(code)
+        return self.rows.get(pack(codes))
+
+    @property
+    def columns(self) -> tuple[array[int], ...]:
+        return self.types, self.namespaces, self.names, self.versions, self.extras
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @overload
+    def __getitem__(self, row: int) -> str: ...
+
+    @overload
+    def __getitem__(self, row: slice) -> list[str]: ...
+
+    def __getitem__(self, row: int | slice) -> str | list[str]:
+        if isinstance(row, slice):
+            return [self.to_string(x) for x in range(len(self))[row]]
+        return self.to_string(range(len(self))[row])
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.to_string(x) for x in range(len(self)))
+
+    def __contains__(self, purl: object) -> bool:
+        return isinstance(purl, str) and self.find(purl) is not None
+
+    def to_string(self, row: int) -> str:
+        strings = self.strings
+        if row in self.verbatim:
+            return self.verbatim[row]
+        if not self.types[row]:
+            return strings[self.names[row]]
+        purl = PackageURL(
+            strings[self.types[row]],
+            strings[self.namespaces[row]] or None,
+            strings[self.names[row]],
+            strings[self.versions[row]] or None,
+        )
+        return purl.to_string() + strings[self.extras[row]]
+
+    def package(self, row: int) -> tuple[str, str | None, str]:
+        strings = self.strings
+        return (
+            strings[self.types[row]],
+            strings[self.namespaces[row]] or None,
+            strings[self.names[row]],
+        )
+
+    def version(self, row: int) -> str | None:
+        return self.strings[self.versions[row]] or None
+
+    def by_package(self) -> dict[tuple[str, str | None, str], list[int]]:
+        """
+        Rows grouped by `(type, namespace, name)`, grouping compares codes only.
+        """
+        groups: dict[tuple[int, int, int], list[int]] = {}
+        for row, key in enumerate(zip(self.types, self.namespaces, self.names)):
+            groups.setdefault(key, []).append(row)
+        return {self.package(rows[0]): rows for rows in groups.values()}
+
+    def select(self, *, types: Collection[str] | None = None, versioned: bool = False) -> PurlTable:
+        """
+        Rows of the given types and, with `versioned`, with a version, sharing the string pool.
+        """
+        type_codes = None if types is None else {self.codes[x] for x in types if x in self.codes}
+        table = PurlTable()
+        table.strings = self.strings
+        table.codes = self.codes
+        for row in range(len(self)):
+            if type_codes is not None and self.types[row] not in type_codes:
+                continue
+            if versioned and not self.versions[row]:
+                continue
+            codes = [column[row] for column in self.columns]
+            if row in self.verbatim:
+                table.verbatim[len(table.types)] = self.verbatim[row]
+            table.rows[pack(codes)] = len(table.types)
+            for column, code in zip(table.columns, codes):
+                column.append(code)
+        return table
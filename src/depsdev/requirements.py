@@ -0,0 +1,209 @@
+"""
+pip requirements files, following `-r` includes and `-c` constraint files.
+
+Parsed files are memoized by path and modification time, so the shared includes of many services
+are only read once per run. The files of each level of the include graph are read concurrently.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+from depsdev.v3 import System
+from depsdev.versions import normalize_name
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+REQUIREMENT = re.compile(r"^([^\W_][\w.-]*)\s*(?:\[[^\]]*\])?\s*(.*)$")
+PIN = re.compile(r"^===?\s*([^\s,*]+)$")
+INCLUDE = re.compile(r"^(-r|--requirement|-c|--constraint)(?:\s*=\s*|\s+|(?=[^-\s]))(.+)$")
+# Options that apply to the whole file (index, find-links, ...) or to one line (--hash).
+OPTION = re.compile(r"(?:^|\s)--?[A-Za-z][\w-]*(?:[=\s]+(?!-)\S+)?")
+COMMENT = re.compile(r"(^|\s)#.*$")
+
+
+@dataclass(frozen=True)
+class Requirement:
+    # PEP 503 normalized.
+    name: str
+    specifier: str
+    # The version of an exact `==` or `===` pin.
+    version: str | None
+    marker: str | None = None
+
+
+@dataclass
+class RequirementsFile:
+    path: str
+    requirements: list[Requirement] = field(default_factory=list)
+    includes: list[str] = field(default_factory=list)
+    constraints: list[str] = field(default_factory=list)
+
+
+def logical_lines(text: str) -> Iterator[str]:
+    """
+    Lines with comments removed and backslash continuations joined.
+    """
+    pending = ""
+    for line in text.splitlines():
+        line = COMMENT.sub("", line)  # noqa: PLW2901
+        if line.endswith("\\"):
+            pending += line[:-1] + " "
+            continue
+        line = (pending + line).strip()  # noqa: PLW2901
+        pending = ""
+        if line:
+            yield line
+    if pending.strip():
+        yield pending.strip()
+
+
+def parse_requirement(line: str) -> Requirement | None:
+    line, _, marker = line.partition(";")
+    # URL requirements (`name @ https://...`), editables and local paths have no pinned version.
+    match = REQUIREMENT.match(OPTION.sub("", line).strip())
+    if match is None or "@" in match.group(2):
+        return None
+    specifier = match.group(2).strip()
+    pin = PIN.match(specifier)
+    return Requirement(
+        normalize_name(System.PYPI, match.group(1)),
+        specifier,
+        pin.group(1) if pin else None,
+        marker.strip() or None,
+    )
+
+
+def parse(path: str, text: str) -> RequirementsFile:
+    result = RequirementsFile(path)
+    base = os.path.dirname(path)
+    for line in logical_lines(text):
+        include = INCLUDE.match(line)
+        if include is not None:
+            target = include.group(2).strip()
+            if "://" in target:
+                logger.warning("Skipping remote include %s in %s.", target, path)
+                continue
+            target = os.path.normpath(os.path.join(base, target))
+            if include.group(1) in ("-r", "--requirement"):
+                result.includes.append(target)
+            else:
+                result.constraints.append(target)
+            continue
+        if line.startswith("-"):
+            continue  # -e/--editable, -i/--index-url, --hash only lines and the like.
+        requirement = parse_requirement(line)
+        if requirement is not None:
+            result.requirements.append(requirement)
+    return result
+
+
+@dataclass
+class RequirementsCache:
+    """
+    Parsed requirements files by absolute path, reparsed when their modification time changes.
+    """
+
+    files: dict[str, tuple[int, RequirementsFile]] = field(default_factory=dict)
+    workers: int = 8
+
+    def read(self, path: str) -> RequirementsFile | None:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            logger.warning("Requirements file %s not found.", path)
+            return None
+        cached = self.files.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, encoding="utf-8") as f:
+            parsed = parse(path, f.read())
+        self.files[path] = (mtime, parsed)
+        return parsed
+
+    def graph(self, root: str) -> dict[str, RequirementsFile]:
+        """
+        Every file reachable from `root` through includes and constraints, level by level.
+        """
+        graph: dict[str, RequirementsFile] = {}
+        frontier = [os.path.abspath(root)]
+        with ThreadPoolExecutor(self.workers) as pool:
+            while frontier:
+                parsed = zip(frontier, pool.map(self.read, frontier))
+                graph.update((path, x) for path, x in parsed if x is not None)
+                frontier = list(
+                    dict.fromkeys(
+                        x
+                        for path in frontier
+                        if path in graph
+                        for x in graph[path].includes + graph[path].constraints
+                        if x not in graph
+                    )
+                )
+        return graph
+
+
+def walk(
+    graph: dict[str, RequirementsFile], root: str, *, constraints: bool = False
+) -> Iterator[Requirement]:
+    """
+    Requirements of `root` and its includes, depth first. Include cycles are reported and cut.
+
+    With `constraints`, yields the requirements of the constraint files instead.
+    """
+    seen: set[tuple[str, bool]] = set()
+
+    def visit(path: str, ancestors: tuple[str, ...], emit: bool) -> Iterator[Requirement]:  # noqa: FBT001
+        if path in ancestors:
+            cycle = " -> ".join((*ancestors[ancestors.index(path) :], path))
+            logger.warning("Include cycle in requirements: %s", cycle)
+            return
+        if (path, emit) in seen or path not in graph:
+            return
+        seen.add((path, emit))
+        parsed = graph[path]
+        if emit:
+            yield from parsed.requirements
+        for child in parsed.includes:
+            yield from visit(child, (*ancestors, path), emit)
+        if constraints:
+            for child in parsed.constraints:
+                yield from visit(child, (*ancestors, path), True)  # noqa: FBT003
+
+    yield from visit(os.path.abspath(root), (), not constraints)
+
+
+def pinned(root: str, cache: RequirementsCache) -> Iterable[tuple[str, str]]:
+    """
+    `(name, version)` of every requirement of `root` with an exact version.
+
+    A requirement without a pin of its own takes the exact version of a constraint file, if any.
+    Packages that only appear in constraint files are not installed by pip and are skipped.
+    """
+    graph = cache.graph(root)
+    pins: dict[str, str] = {}
+    for requirement in walk(graph, root, constraints=True):
+        if requirement.version is not None:
+            pins.setdefault(requirement.name, requirement.version)
+    result: dict[str, str] = {}
+    for requirement in walk(graph, root):
+        version = requirement.version or pins.get(requirement.name)
+        if version is None:
+            logger.debug("Skipping %s, it has no pinned version.", requirement.name)
+            continue
+        result.setdefault(requirement.name, version)
+    return result.items()
+
+
+# Shared by every requirements file of a run.
+CACHE = RequirementsCache()
@@ -0,0 +1,171 @@
+"""
+Priority classes and per-caller fair queuing in front of every API request.
+
+A request runs as soon as its class and the overall limit have room. Otherwise it waits in its
+caller's queue, and freed slots go to interactive requests first and then round-robin across the
+callers of a class. Bulk traffic is capped below the overall limit, so an interactive lookup never
+waits behind a long sweep while the sweep still keeps most of the connections busy.
+
+The overall limit is 32 requests, or `DEPSDEV_CONCURRENCY`, and bulk requests get three quarters of
+it. A `--concurrency` above the bulk cap raises both limits for the run, see `Scheduler.fit`.
+
+The class and the caller are picked up from the context of the calling task:
+
+    with priority(Priority.BULK, caller="nightly-sweep"):
+        await sweep()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Iterator
+
+
+class Priority(str, Enum):
+    # In dispatch order.
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+current_priority: ContextVar[Priority] = ContextVar(
+    "depsdev_priority", default=Priority.INTERACTIVE
+)
+current_caller: ContextVar[str] = ContextVar("depsdev_caller", default="")
+
+
+@contextlib.contextmanager
+def priority(level: Priority, caller: str | None = None) -> Iterator[None]:
+    """
+    Run the requests of this context, and of the tasks it starts, in `level` for `caller`.
+    """
+    level_token = current_priority.set(level)
+    caller_token = current_caller.set(caller) if caller is not None else None
+    try:
+        yield
+    finally:
+        current_priority.reset(level_token)
+        if caller_token is not None:
+            current_caller.reset(caller_token)
+
+
+def default_total() -> int:
+    return int(os.environ.get("DEPSDEV_CONCURRENCY", "32"))
+
+
+def limits_for(total: int) -> dict[Priority, int]:
+    # A quarter of the slots stays free for interactive requests.
+    return {Priority.INTERACTIVE: total, Priority.BULK: max(1, total - max(1, total // 4))}
+
+
+def default_limits() -> dict[Priority, int]:
+    return limits_for(default_total())
+
+
+@dataclass
+class Scheduler:
+    """
+    Concurrency caps per priority class and overall, with one FIFO queue per caller.
+    """
+
+    limits: dict[Priority, int] = field(default_factory=default_limits)
+    total: int = field(default_factory=default_total)
+    running: dict[Priority, int] = field(default_factory=lambda: dict.fromkeys(Priority, 0))
+    # Callers with waiting requests in round-robin order, every one with its own FIFO.
+    queues: dict[Priority, dict[str, deque[asyncio.Future[None]]]] = field(
+        default_factory=lambda: {x: {} for x in Priority}
+    )
+
+    @classmethod
+    def sized(cls, total: int) -> Scheduler:
+        return cls(limits_for(total), total)
+
+    def fit(self, concurrency: int) -> None:
+        """
+        Raise the limits so that bulk requests alone can keep `concurrency` requests in flight.
+
+        The limits are never lowered, and interactive requests keep their headroom on top.
+        """
+        if concurrency <= self.limits[Priority.BULK]:
+            return
+        self.limits[Priority.BULK] = concurrency
+        self.total = max(self.total, concurrency + max(1, concurrency // 3))
+        self.limits[Priority.INTERACTIVE] = max(self.limits[Priority.INTERACTIVE], self.total)
+        self.dispatch()
+
+    def has_room(self, level: Priority) -> bool:
+        return self.running[level] < self.limits[level] and sum(self.running.values()) < self.total
+
+    def waiting(self, level: Priority) -> int:
+        return sum(len(x) for x in self.queues[level].values())
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self, level: Priority | None = None, caller: str | None = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold one request slot, by default in the class and for the caller of the context.
+        """
+        level = level or current_priority.get()
+        caller = current_caller.get() if caller is None else caller
+        if self.has_room(level) and not self.waiting(level):
+            self.running[level] += 1
+        else:
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self.queues[level].setdefault(caller, deque()).append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Granted right before the cancellation, hand the slot on.
+                    self.release(level)
+                else:
+                    self.discard(level, caller, waiter)
+                raise
+        try:
+            yield
+        finally:
+            self.release(level)
+
+    def discard(self, level: Priority, caller: str, waiter: asyncio.Future[None]) -> None:
+        queue = self.queues[level].get(caller)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self.queues[level][caller]
+
+    def release(self, level: Priority) -> None:
+        self.running[level] -= 1
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        for level in Priority:
+            callers = self.queues[level]
+            while callers and self.has_room(level):
+                # The caller at the front gets one slot and moves to the back.
+                caller = next(iter(callers))
+                queue = callers.pop(caller)
+                waiter = queue.popleft()
+                if queue:
+                    callers[caller] = queue
+                if waiter.done():
+                    continue  # Cancelled while queued.
+                self.running[level] += 1
+                waiter.set_result(None)
+
+
+# Shared by every client of the process.
+scheduler = Scheduler()
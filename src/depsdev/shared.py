@@ -0,0 +1,306 @@
+"""
+Coordination between `depsdev` processes running side by side, e.g. parallel CI jobs on one host.
+
+A single SQLite file holds a token bucket and a response store. Every process that points at the
+same file draws from one request budget and reuses the responses the others already fetched:
+
+    DEPSDEV_SHARED=1 depsdev report requirements.txt      # per-user default location
+    DEPSDEV_SHARED=/ci/depsdev.db depsdev report bom.json
+
+With `DEPSDEV_OFFLINE=1` nothing goes to the network: responses come from the store regardless of
+their age (see `depsdev cache`) and anything missing is an error.
+
+Writers serialize through SQLite's file lock (`BEGIN IMMEDIATE`), so no extra service is needed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import getpass
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+import httpx
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bucket (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    expires REAL NOT NULL,
+    status INTEGER NOT NULL,
+    content_type TEXT NOT NULL,
+    body BLOB NOT NULL
+);
+"""
+
+# Stores opened by `SharedStore.from_env`, by settings, so each process holds one connection.
+STORES: dict[tuple[str, float, float, float, int, bool], SharedStore] = {}
+STORES_LOCK = threading.Lock()
+
+
+def default_store_path() -> str:
+    return os.path.join(tempfile.gettempdir(), f"depsdev-{getpass.getuser()}.db")
+
+
+def store_path() -> str | None:
+    """
+    Location of the shared store from `DEPSDEV_SHARED`, `None` when coordination is disabled.
+    """
+    value = os.environ.get("DEPSDEV_SHARED", "")
+    if value.lower() in ("", "false", "0", "no"):
+        if not is_offline():
+            return None
+        value = "1"
+    if value.lower() in ("true", "1", "yes"):
+        return default_store_path()
+    return value
+
+
+def is_offline() -> bool:
+    return os.environ.get("DEPSDEV_OFFLINE", "").lower() in ("true", "1", "yes")
+
+
+def request_key(method: str, url: str, body: bytes) -> str:
+    return hashlib.sha256(f"{method} {url}\n".encode() + body).hexdigest()
+
+
+@dataclass
+class SharedStore:
+    """
+    Token bucket and response store backed by one SQLite file.
+
+    `rate` is the sustained number of requests per second for all processes together, `burst` the
+    number of requests allowed at once. A `rate` of 0 disables the limiter. Bodies larger than
+    `max_body` bytes are relayed but not stored.
+    """
+
+    path: str
+    rate: float = 10.0
+    burst: float = 10.0
+    ttl: float = 3600.0
+    max_body: int = 16 * 1024 * 1024
+    bucket: str = "default"
+    offline: bool = False
+    conn: sqlite3.Connection = field(init=False, repr=False)
+    lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        # Calls are made from worker threads (`asyncio.to_thread`), the lock serializes them.
+        self.conn = sqlite3.connect(
+            self.path, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> SharedStore | None:
+        """
+        The store configured by the environment, opened once per process and shared by all clients.
+        """
+        path = store_path()
+        if path is None:
+            return None
+        rate = float(os.environ.get("DEPSDEV_RATE_LIMIT", "10"))
+        settings = (
+            path,
+            rate,
+            float(os.environ.get("DEPSDEV_BURST", rate)),
+            float(os.environ.get("DEPSDEV_CACHE_TTL", "3600")),
+            int(os.environ.get("DEPSDEV_CACHE_MAX_BODY", str(16 * 1024 * 1024))),
+            is_offline(),
+        )
+        with STORES_LOCK:
+            if settings not in STORES:
+                path, rate, burst, ttl, max_body, offline = settings
+                STORES[settings] = cls(
+                    path, rate=rate, burst=burst, ttl=ttl, max_body=max_body, offline=offline
+                )
+            return STORES[settings]
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take `tokens` from the bucket, return 0 on success or the seconds to wait before retrying.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT tokens, updated FROM bucket WHERE name = ?", (self.bucket,)
+                ).fetchone()
+                now = time.time()
+                available = (
+                    self.burst
+                    if row is None
+                    else min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+                )
+                wait = 0.0 if available >= tokens else (tokens - available) / self.rate
+                if not wait:
+                    available -= tokens
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO bucket (name, tokens, updated) VALUES (?, ?, ?)",
+                    (self.bucket, available, now),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        while wait := await asyncio.to_thread(self.try_acquire, tokens):  # noqa: ASYNC110
+            await asyncio.sleep(wait)
+
+    def get(self, key: str) -> tuple[int, str, bytes] | None:
+        # Offline, a stale answer beats no answer at all.
+        now = float("-inf") if self.offline else time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, content_type, body FROM responses WHERE key = ? AND expires > ?",
+                (key, now),
+            ).fetchone()
+        return None if row is None else (row[0], row[1], bytes(row[2]))
+
+    def put(self, key: str, status: int, content_type: str, body: bytes) -> None:
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, expires, status, content_type, body) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, time.time() + self.ttl, status, content_type, body),
+            )
+
+    def rows(self) -> Iterator[tuple[str, float, int, str, bytes]]:
+        """
+        Every live `(key, expires, status, content_type, body)` row, for exporting.
+        """
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT key, expires, status, content_type, body FROM responses WHERE expires > ?",
+                (time.time(),),
+            )
+            while batch := cursor.fetchmany(1000):
+                for key, expires, status, content_type, body in batch:
+                    yield key, expires, status, content_type, bytes(body)
+
+    def put_rows(self, rows: Iterable[tuple[str, float, int, str, bytes]]) -> int:
+        """
+        Bulk insert rows as produced by `rows()` in a single transaction, return how many.
+        """
+        count = 0
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row in rows:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO responses (key, expires, status, content_type, "
+                        "body) VALUES (?, ?, ?, ?, ?)",
+                        row,
+                    )
+                    count += 1
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def prune(self) -> int:
+        with self.lock:
+            return self.conn.execute(
+                "DELETE FROM responses WHERE expires <= ?", (time.time(),)
+            ).rowcount
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class StoringStream(httpx.AsyncByteStream):
+    """
+    Relays the decoded body of `response` chunk by chunk, and stores it once it was read in full.
+
+    Only bodies up to the store's `max_body` are kept aside for that, larger ones stream through
+    without being held in memory.
+    """
+
+    def __init__(self, store: SharedStore, key: str, response: httpx.Response) -> None:
+        self.store = store
+        self.key = key
+        self.response = response
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunks: list[bytes] | None = []
+        size = 0
+        async for chunk in self.response.aiter_bytes():
+            if chunks is not None:
+                size += len(chunk)
+                if size > self.store.max_body:
+                    chunks = None
+                else:
+                    chunks.append(chunk)
+            yield chunk
+        if chunks is not None and self.response.is_success:
+            content_type = self.response.headers.get("content-type", "application/json")
+            await asyncio.to_thread(
+                self.store.put, self.key, self.response.status_code, content_type, b"".join(chunks)
+            )
+
+    async def aclose(self) -> None:
+        await self.response.aclose()
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport answering from the shared store, and otherwise waiting for a token before
+    forwarding the request to `inner`. Responses are streamed through to the caller, and successful
+    ones are written back to the store once their body has been read in full.
+    """
+
+    def __init__(self, store: SharedStore, inner: httpx.AsyncBaseTransport | None = None) -> None:
+        self.store = store
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        key = request_key(request.method, str(request.url), body)
+        cached = await asyncio.to_thread(self.store.get, key)
+        if cached is not None:
+            status, content_type, content = cached
+            return httpx.Response(
+                status, headers={"content-type": content_type}, content=content, request=request
+            )
+        if self.store.offline:
+            msg = f"{request.method} {request.url} is not in the offline cache {self.store.path}"
+            raise httpx.TransportError(msg)
+
+        await self.store.acquire()
+        response = await self.inner.handle_async_request(request)
+        # The body is decoded on the way through, so only the content type is kept.
+        content_type = response.headers.get("content-type", "application/json")
+        return httpx.Response(
+            response.status_code,
+            headers={"content-type": content_type},
+            stream=StoringStream(self.store, key, response),
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -0,0 +1,211 @@
+"""
+Bulk typosquat screening.
+
+Names are first checked against a local BK-tree of popular package names: a name that is popular
+itself, or that is not within a couple of edits of any popular name, is screened without an API
+call. Only the remaining suspicious names are sent to deps.dev's similarly named packages endpoint,
+with bounded concurrency and one call per `(system, name)`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+
+import httpx
+
+from depsdev.v3 import System
+from depsdev.v3alpha import DepsDevClientV3Alpha
+from depsdev.versions import normalize_name
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+    Node = tuple[str, dict[int, "Node"]]
+
+logger = logging.getLogger(__name__)
+
+
+def distance(a: str, b: str) -> int:
+    """
+    Damerau-Levenshtein distance: insertions, deletions, substitutions and transpositions.
+
+    Unlike optimal string alignment, a transposed pair can be edited again ("ca" -> "abc" is 2), so
+    this is a metric and the triangle inequality the BK-tree prunes with holds.
+    """
+    if a == b:
+        return 0
+    infinity = len(a) + len(b)
+    # Row and column 0 are sentinels, `rows[i + 1][j + 1]` is the distance of `a[:i]` and `b[:j]`.
+    rows = [[infinity] * (len(b) + 2)]
+    rows += [[infinity, i] + [0] * len(b) for i in range(len(a) + 1)]
+    rows[1][1:] = range(len(b) + 1)
+    # Last row of `a` that holds each character.
+    last: dict[str, int] = {}
+    for i, ca in enumerate(a, 1):
+        match = 0
+        for j, cb in enumerate(b, 1):
+            k = last.get(cb, 0)
+            m = match
+            if ca == cb:
+                match = j
+            rows[i + 1][j + 1] = min(
+                rows[i][j] + (ca != cb),
+                rows[i + 1][j] + 1,
+                rows[i][j + 1] + 1,
+                rows[k][m] + (i - k - 1) + 1 + (j - m - 1),
+            )
+        last[ca] = i
+    return rows[-1][-1]
+
+
+class BKTree:
+    """
+    Metric tree answering "which words are within `n` edits" without comparing against all words.
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self.root: Node | None = None
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        if self.root is None:
+            self.root = (word, {})
+            self.size += 1
+            return
+        node = self.root
+        while True:
+            d = distance(word, node[0])
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = (word, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> Iterator[tuple[int, str]]:
+        if self.root is None:
+            return
+        stack = [self.root]
+        while stack:
+            candidate, children = stack.pop()
+            d = distance(word, candidate)
+            if d <= max_distance:
+                yield d, candidate
+            for edge in range(max(1, d - max_distance), d + max_distance + 1):
+                child = children.get(edge)
+                if child is not None:
+                    stack.append(child)
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def max_edits(name: str) -> int:
+    # One edit already turns most short names into something else entirely.
+    return 1 if len(name) <= 5 else 2  # noqa: PLR2004
+
+
+def load_popular(lines: Iterable[str]) -> dict[System | None, set[str]]:
+    """
+    Parse "name" or "SYSTEM name" lines, names without a system apply to every ecosystem.
+    """
+    popular: dict[System | None, set[str]] = {}
+    for line in lines:
+        parts = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        if len(parts) > 1 and parts[0].upper() in System.__members__:
+            popular.setdefault(System(parts[0].upper()), set()).add(parts[1])
+        else:
+            popular.setdefault(None, set()).add(parts[0])
+    return popular
+
+
+@dataclass
+class Finding:
+    system: System
+    name: str
+    # Popular names within a couple of edits, from the local index.
+    close_to: list[str] = field(default_factory=list)
+    # Names deps.dev reports as similar.
+    similar: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Screener:
+    popular: dict[System | None, set[str]] = field(default_factory=dict)
+    client: DepsDevClientV3Alpha = field(default_factory=DepsDevClientV3Alpha)
+    concurrency: int = 16
+    trees: dict[System, BKTree] = field(init=False, default_factory=dict)
+    known: dict[System, set[str]] = field(init=False, default_factory=dict)
+    cache: dict[tuple[System, str], asyncio.Task[list[str]]] = field(
+        init=False, default_factory=dict
+    )
+    semaphore: asyncio.Semaphore = field(init=False)
+    api_calls: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    def index(self, system: System) -> tuple[BKTree, set[str]]:
+        if system not in self.trees:
+            names = {
+                normalize_name(system, x).lower()
+                for x in self.popular.get(system, set()) | self.popular.get(None, set())
+            }
+            self.known[system] = names
+            self.trees[system] = BKTree(sorted(names))
+        return self.trees[system], self.known[system]
+
+    def screen_locally(self, system: System, name: str) -> list[str] | None:
+        """
+        Popular names `name` is close to, or `None` when there is no local index to decide with.
+        """
+        tree, known = self.index(system)
+        if not known:
+            return None
+        normalized = normalize_name(system, name).lower()
+        if normalized in known:
+            return []
+        return [x for _, x in sorted(tree.search(normalized, max_edits(normalized)))]
+
+    async def fetch_similar(self, system: System, name: str) -> list[str]:
+        async with self.semaphore:
+            self.api_calls += 1
+            try:
+                result = await self.client.get_similarly_named_packages(system, name)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:  # noqa: PLR2004
+                    return []
+                raise
+        return [x["packageKey"]["name"] for x in result.get("results", [])]  # type: ignore[attr-defined]
+
+    def similar(self, system: System, name: str) -> asyncio.Task[list[str]]:
+        key = (system, name)
+        if key not in self.cache:
+            self.cache[key] = asyncio.ensure_future(self.fetch_similar(system, name))
+        return self.cache[key]
+
+    async def screen(self, system: System, name: str) -> Finding | None:
+        close_to = self.screen_locally(system, name)
+        if close_to == []:
+            return None
+        similar = await self.similar(system, name)
+        if not close_to and not similar:
+            return None
+        return Finding(system, name, close_to or [], similar)
+
+    async def screen_all(self, packages: Iterable[tuple[System, str]]) -> list[Finding]:
+        findings = await asyncio.gather(
+            *(self.screen(system, name) for system, name in dict.fromkeys(packages))
+        )
+        return [x for x in findings if x is not None]
@@ -2,17 +2,15 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from dataclasses import field
 from enum import Enum
 from typing import TYPE_CHECKING
 from typing import Optional
 from urllib.parse import quote
 
-import httpx
+from depsdev.base import BaseClient
 
 if TYPE_CHECKING:
-    from httpx._types import QueryParamTypes
-    from typing_extensions import Literal
+    from collections.abc import AsyncIterator
 
 logger = logging.getLogger(__name__)
 Incomplete = object
@@ -46,29 +44,14 @@ def url_escape(string: str) -> str:
 
 
 @dataclass
-class DepsDevClientV3:
-    client: httpx.AsyncClient = field(init=False, repr=False)
+class _TimeoutFirst:
+    # Puts `timeout` ahead of the `BaseClient` fields, so `DepsDevClientV3(10.0)` sets the timeout.
     timeout: float = 5.0
-    base_url: str = "https://api.deps.dev"
 
-    def __post_init__(self) -> None:
-        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
 
-    async def _requests(
-        self,
-        url: str = "",
-        method: Literal["GET", "POST"] = "GET",
-        params: QueryParamTypes | None = None,
-        json: object | None = None,
-    ) -> Incomplete:
-        logger.info(locals())
-        response = await self.client.request(method=method, url=url, params=params, json=json)
-        if not response.is_success:
-            logger.error(
-                "Request failed with status code %s: %s", response.status_code, response.text
-            )
-            response.raise_for_status()
-        return response.json()
+@dataclass
+class DepsDevClientV3(BaseClient, _TimeoutFirst):
+    base_url: str = "https://api.deps.dev"
 
     async def get_package(self, system: System, name: str) -> Incomplete:
         """
@@ -119,6 +102,21 @@ class DepsDevClientV3:
             url=f"/v3/systems/{system}/packages/{url_escape(name)}/versions/{url_escape(version)}:dependencies",
         )
 
+    async def iter_dependencies(
+        self, system: System, name: str, version: str
+    ) -> AsyncIterator[tuple[str, Incomplete]]:
+        """
+        Streaming variant of `get_dependencies`, yields `("nodes", node)` and `("edges", edge)` in the order the response lists them, while it is still downloading.
+
+        GET /v3/systems/{versionKey.system}/packages/{versionKey.name}/versions/{versionKey.version}:dependencies
+        """  # noqa: E501
+        async for prefix, item in self._stream_items(
+            ["nodes.item", "edges.item"],
+            method="GET",
+            url=f"/v3/systems/{system}/packages/{url_escape(name)}/versions/{url_escape(version)}:dependencies",
+        ):
+            yield prefix.split(".")[0], item
+
     async def get_project(self, project_id: str) -> Incomplete:
         """
         GetProject returns information about projects hosted by GitHub, GitLab, or BitBucket, when known to us.
@@ -137,6 +135,19 @@ class DepsDevClientV3:
             method="GET", url=f"/v3/projects/{url_escape(project_id)}:packageversions"
         )
 
+    async def iter_project_package_versions(self, project_id: str) -> AsyncIterator[Incomplete]:
+        """
+        Streaming variant of `get_project_package_versions`, yields each mapping as it is parsed.
+
+        GET /v3/projects/{projectKey.id}:packageversions
+        """
+        async for _, item in self._stream_items(
+            ["versions.item"],
+            method="GET",
+            url=f"/v3/projects/{url_escape(project_id)}:packageversions",
+        ):
+            yield item
+
     async def get_advisory(self, advisory_id: str) -> Incomplete:
         """
         GetAdvisory returns information about security advisories hosted by OSV.
@@ -11,6 +11,8 @@ from depsdev.v3 import System
 from depsdev.v3 import url_escape
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from typing_extensions import Literal
     from typing_extensions import TypedDict
 
@@ -99,6 +101,21 @@ class DepsDevClientV3Alpha(DepsDevClientV3):
             url=f"/v3alpha/systems/{system}/packages/{url_escape(name)}/versions/{url_escape(version)}:dependencies",
         )
 
+    async def iter_dependencies(
+        self, system: System, name: str, version: str
+    ) -> AsyncIterator[tuple[str, Incomplete]]:
+        """
+        Streaming variant of `get_dependencies`, yields `("nodes", node)` and `("edges", edge)` in the order the response lists them, while it is still downloading.
+
+        GET /v3alpha/systems/{versionKey.system}/packages/{versionKey.name}/versions/{versionKey.version}:dependencies
+        """  # noqa: E501
+        async for prefix, item in self._stream_items(
+            ["nodes.item", "edges.item"],
+            method="GET",
+            url=f"/v3alpha/systems/{system}/packages/{url_escape(name)}/versions/{url_escape(version)}:dependencies",
+        ):
+            yield prefix.split(".")[0], item
+
     async def get_dependents(self, system: System, name: str, version: str) -> Incomplete:
         """
         GetDependents returns information about the number of distinct packages known to depend on the given package version. Dependent counts are currently available for Go, npm, Cargo, Maven and PyPI.
@@ -157,6 +174,19 @@ class DepsDevClientV3Alpha(DepsDevClientV3):
             method="GET", url=f"/v3alpha/projects/{url_escape(project_id)}:packageversions"
         )
 
+    async def iter_project_package_versions(self, project_id: str) -> AsyncIterator[Incomplete]:
+        """
+        Streaming variant of `get_project_package_versions`, yields each mapping as it is parsed.
+
+        GET /v3alpha/projects/{projectKey.id}:packageversions
+        """
+        async for _, item in self._stream_items(
+            ["versions.item"],
+            method="GET",
+            url=f"/v3alpha/projects/{url_escape(project_id)}:packageversions",
+        ):
+            yield item
+
     async def get_advisory(self, advisory_id: str) -> Incomplete:
         """
         GetAdvisory returns information about security advisories hosted by OSV.
@@ -0,0 +1,284 @@
+"""
+Ecosystem aware version ordering and OSV range evaluation over sorted version lists.
+
+`sort_key()` maps a version string to a tuple that orders like the ecosystem does (PEP 440 for
+PyPI, SemVer for npm/Cargo/Go/NuGet, Maven's ComparableVersion rules for Maven). The rules are
+close approximations without extra dependencies. `VersionIndex` holds every published version of a
+package in that order, so OSV ranges turn into index spans with a couple of binary searches.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from bisect import bisect_right
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+from typing import cast
+
+from depsdev.v3 import System
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+
+    from depsdev.osv import OSVEvent
+    from depsdev.osv import OSVRange
+    from depsdev.osv import OSVVulnerability
+
+    Key = tuple[object, ...]
+
+# Range events closing a span, in both the snake and camel case spelling of the APIs.
+EVENT_BOUNDS = ("fixed", "last_affected", "lastAffected", "limit")
+OSV_ECOSYSTEMS = {
+    System.PYPI: "PyPI",
+    System.NPM: "npm",
+    System.MAVEN: "Maven",
+    System.CARGO: "crates.io",
+    System.GO: "Go",
+    System.NUGET: "NuGet",
+    System.RUBYGEMS: "RubyGems",
+}
+
+SEMVER = re.compile(
+    r"^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]*)?$"
+)
+PEP440 = re.compile(
+    r"^v?(?:(\d+)!)?(\d+(?:\.\d+)*)"
+    r"(?:[-_.]?(a|alpha|b|beta|c|rc|pre|preview)[-_.]?(\d*))?"
+    r"(?:-(\d+)|[-_.]?(post|rev|r)[-_.]?(\d*))?"
+    r"(?:[-_.]?(dev)[-_.]?(\d*))?"
+    r"(?:\+[a-z0-9._-]+)?$",
+    re.IGNORECASE,
+)
+PEP440_PRE = {"a": 0, "alpha": 0, "b": 1, "beta": 1, "c": 2, "rc": 2, "pre": 2, "preview": 2}
+TOKENS = re.compile(r"\d+|[a-zA-Z]+")
+# Maven qualifier order, unknown qualifiers sort after "sp" alphabetically.
+QUALIFIERS = {
+    "alpha": 0,
+    "a": 0,
+    "beta": 1,
+    "b": 1,
+    "milestone": 2,
+    "m": 2,
+    "rc": 3,
+    "cr": 3,
+    "snapshot": 4,
+    "": 5,
+    "ga": 5,
+    "final": 5,
+    "release": 5,
+    "sp": 6,
+}
+RELEASE = (1, 5, "")
+
+
+def semver_key(version: str) -> Key | None:
+    match = SEMVER.match(version)
+    if match is None:
+        return None
+    release = tuple(int(x or 0) for x in match.group(1, 2, 3, 4))
+    pre = match.group(5)
+    if pre is None:
+        return (release, (1,))
+    identifiers = tuple((0, int(x), "") if x.isdigit() else (1, 0, x) for x in pre.split("."))
+    return (release, (0, identifiers))
+
+
+def pep440_key(version: str) -> Key | None:
+    match = PEP440.match(version.strip())
+    if match is None:
+        return None
+    epoch, release, pre_l, pre_n, post_implicit, post_l, post_n, dev_l, dev_n = match.groups()
+    parts = [int(x) for x in release.split(".")]
+    while len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    if pre_l is not None:
+        pre: Key = (PEP440_PRE[pre_l.lower()], int(pre_n or 0))
+    elif dev_l is not None and post_implicit is None and post_l is None:
+        pre = (-1, 0)  # 1.0.dev0 sorts before 1.0a0
+    else:
+        pre = (3, 0)
+    post = int(post_implicit or post_n or 0) if (post_implicit or post_l) else -1
+    dev = (0, int(dev_n or 0)) if dev_l is not None else (1, 0)
+    return (int(epoch or 0), tuple(parts), pre, post, dev)
+
+
+def maven_key(version: str) -> Key:
+    items: list[tuple[int, int, str]] = []
+    for token in TOKENS.findall(version.lower()):
+        if token.isdigit():
+            items.append((2, int(token), ""))
+            continue
+        # Zeros right before a qualifier do not count: 1.0-alpha == 1-alpha.
+        while items and items[-1] == (2, 0, ""):
+            items.pop()
+        rank = QUALIFIERS.get(token)
+        items.append((1, 7, token) if rank is None else (1, rank, ""))
+    while items and items[-1] in ((2, 0, ""), RELEASE):
+        items.pop()
+    return (*items, RELEASE)
+
+
+def sort_key(system: System, version: str) -> Key:
+    """
+    Total order over the versions of one package, unparseable versions sort first.
+    """
+    if system is System.PYPI:
+        key = pep440_key(version)
+    elif system in (System.NPM, System.CARGO, System.GO, System.NUGET):
+        key = semver_key(version)
+    else:
+        return (1, maven_key(version))
+    return (0, (), version) if key is None else (1, key)
+
+
+def is_prerelease(system: System, version: str) -> bool:
+    if system is System.PYPI:
+        match = PEP440.match(version.strip())
+        return bool(match and (match.group(3) or match.group(8)))
+    if system in (System.NPM, System.CARGO, System.GO, System.NUGET):
+        match = SEMVER.match(version)
+        return bool(match and match.group(5))
+    return any(QUALIFIERS.get(x, RELEASE[1]) < RELEASE[1] for x in TOKENS.findall(version.lower()))
+
+
+def normalize_name(system: System, name: str) -> str:
+    if system is System.PYPI:
+        return re.sub(r"[-_.]+", "-", name).lower()
+    if system is System.NUGET:
+        return name.lower()
+    return name
+
+
+@dataclass
+class VersionIndex:
+    """
+    Published versions of one package in ecosystem order.
+    """
+
+    system: System
+    versions: list[str]
+    excluded: set[str] = field(default_factory=set)  # e.g. deprecated or yanked versions
+    # Release timestamps (RFC 3339) and the version the registry marks as default, when known.
+    published: dict[str, str] = field(default_factory=dict)
+    default: str | None = None
+    keys: list[Key] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.versions = sorted(set(self.versions), key=lambda x: sort_key(self.system, x))
+        self.keys = [sort_key(self.system, x) for x in self.versions]
+
+    def lower(self, version: str) -> int:
+        """Index of the first version >= `version`."""
+        return bisect_left(self.keys, sort_key(self.system, version))
+
+    def upper(self, version: str) -> int:
+        """Index of the first version > `version`."""
+        return bisect_right(self.keys, sort_key(self.system, version))
+
+    def latest(self) -> str | None:
+        """
+        The default version, or else the highest stable version that is not excluded.
+        """
+        if self.default is not None:
+            return self.default
+        for version in reversed(self.versions):
+            if version not in self.excluded and not is_prerelease(self.system, version):
+                return version
+        return None
+
+    def affected_spans(self, vuln: OSVVulnerability, name: str) -> list[tuple[int, int]]:
+        """
+        Half-open index spans of the versions `vuln` affects, for the package called `name`.
+
+        Entries for other packages are ignored, so an advisory without an entry for `name` yields
+        no spans at all.
+        """
+        ecosystem = OSV_ECOSYSTEMS[self.system]
+        wanted = normalize_name(self.system, name)
+        entries = [
+            x
+            for x in vuln.get("affected", [])
+            if x.get("package", {}).get("ecosystem", "").split(":")[0] == ecosystem
+            and normalize_name(self.system, x.get("package", {}).get("name", "")) == wanted
+        ]
+
+        spans: list[tuple[int, int]] = []
+        for affected in entries:
+            for version in affected.get("versions", []):
+                i = self.lower(version)
+                if i < len(self.versions) and self.versions[i] == version:
+                    spans.append((i, i + 1))
+            for _range in affected.get("ranges", []):
+                if _range.get("type") != "GIT":
+                    spans.extend(self.range_spans(_range))
+        return spans
+
+    def event_key(self, event: OSVEvent) -> tuple[Key, int]:
+        """
+        Version order of a range event, "introduced" goes first among events at the same version.
+        """
+        fields = cast("dict[str, str]", event)
+        if "introduced" in fields:
+            version = fields["introduced"]
+            return ((-1,) if version == "0" else sort_key(self.system, version)), 0
+        version = next((fields[x] for x in EVENT_BOUNDS if x in fields), "")
+        return sort_key(self.system, version), 1
+
+    def range_spans(self, _range: OSVRange) -> Iterator[tuple[int, int]]:
+        start: int | None = None
+        # Pairing relies on the events being in version order, which OSV does not guarantee.
+        for event in sorted(_range.get("events", []), key=self.event_key):
+            # The REST API answers in snake case, the protobuf JSON mapping in camel case.
+            fields = cast("dict[str, str]", event)
+            last_affected = fields.get("lastAffected") or fields.get("last_affected")
+            if "introduced" in event:
+                start = 0 if event["introduced"] == "0" else self.lower(event["introduced"])
+            elif start is None:
+                continue
+            elif "fixed" in event:
+                yield start, self.lower(event["fixed"])
+                start = None
+            elif last_affected:
+                yield start, self.upper(last_affected)
+                start = None
+            elif "limit" in event:
+                yield start, self.lower(event["limit"])
+                start = None
+        if start is not None:
+            yield start, len(self.versions)
+
+    def first_unaffected(
+        self,
+        spans: Iterable[tuple[int, int]],
+        after: str,
+        *,
+        allow_prerelease: bool = False,
+    ) -> str | None:
+        """
+        Lowest version above `after` outside of every span, `None` when there is none.
+        """
+        merged: list[tuple[int, int]] = []
+        for lo, hi in sorted(x for x in spans if x[0] < x[1]):
+            if merged and lo <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+        starts = [lo for lo, _ in merged]
+
+        candidate = self.upper(after)
+        while candidate < len(self.versions):
+            i = bisect_right(starts, candidate) - 1
+            if i >= 0 and candidate < merged[i][1]:
+                candidate = merged[i][1]
+                continue
+            version = self.versions[candidate]
+            if version in self.excluded or (
+                not allow_prerelease and is_prerelease(self.system, version)
+            ):
+                candidate += 1
+                continue
+            return version
+        return None
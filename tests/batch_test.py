@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+
+import httpx
+import pytest
+
+from depsdev.cli.batch import resolve_method
+from depsdev.cli.batch import run_batch
+from depsdev.scheduler import Scheduler
+from depsdev.v3 import DepsDevClientV3
+
+REQUESTS = [
+    {"id": "lento", "method": "get-package", "params": {"system": "npm", "name": "lento"}},
+    {"method": "get_version", "params": {"system": "PYPI", "name": "rapido", "version": "1.0"}},
+    {"method": "get-package", "params": {"system": "CARGO", "name": "desconocido"}},
+    {"method": "_requests", "params": {"url": "/"}},
+    {"method": "get-package", "params": {"system": "COBOL", "name": "x"}},
+]
+
+
+async def handler(request: httpx.Request) -> httpx.Response:
+    if "lento" in request.url.path:
+        await asyncio.sleep(0.05)
+    if "desconocido" in request.url.path:
+        return httpx.Response(404, json={"message": "not found"})
+    return httpx.Response(200, json={"path": request.url.path})
+
+
+async def run(*, ordered: bool) -> list[dict[str, object]]:
+    client = DepsDevClientV3(transport=httpx.MockTransport(handler))
+    stream = io.StringIO("".join(json.dumps(x) + "\n\n" for x in REQUESTS))
+    out = io.StringIO()
+    failures = await run_batch(client, stream, out, concurrency=2, ordered=ordered)
+    assert failures == 3  # noqa: PLR2004
+    return [json.loads(x) for x in out.getvalue().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_ordered() -> None:
+    results = await run(ordered=True)
+    assert [x["id"] for x in results] == ["lento", 1, 2, 3, 4]
+    assert results[0]["result"] == {"path": "/v3/systems/NPM/packages/lento"}
+    assert results[1]["result"] == {"path": "/v3/systems/PYPI/packages/rapido/versions/1.0"}
+    assert results[2]["error"] == {"status": 404, "message": '{"message":"not found"}'}
+    assert results[3]["error"] == {"message": "ValueError: Unknown method '_requests'"}
+    assert "COBOL" in results[4]["error"]["message"]  # type: ignore[index]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_completion_order() -> None:
+    results = await run(ordered=False)
+    assert sorted(map(str, (x["id"] for x in results))) == ["1", "2", "3", "4", "lento"]
+    assert results[-1]["id"] == "lento"
+
+
+@pytest.mark.asyncio
+async def test_run_batch_reaches_concurrency() -> None:
+    in_flight = peak = 0
+
+    async def slow(_: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.2)
+        in_flight -= 1
+        return httpx.Response(200, json={})
+
+    client = DepsDevClientV3(transport=httpx.MockTransport(slow))
+    client.scheduler = Scheduler()
+    request = {"method": "get-package", "params": {"system": "npm", "name": "ñandú"}}
+    stream = io.StringIO((json.dumps(request) + "\n") * 128)
+    assert await run_batch(client, stream, io.StringIO(), concurrency=64) == 0
+    assert peak == 64  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    "name", ["_requests", "-requests", "-stream-items", "__init__", "url-escape"]
+)
+def test_resolve_method_rejects_private_names(name: str) -> None:
+    client = DepsDevClientV3(transport=httpx.MockTransport(handler))
+    with pytest.raises(ValueError, match="Unknown method"):
+        resolve_method(client, name)
+    assert resolve_method(client, "get-package") == client.get_package
+
+
+@pytest.mark.asyncio
+async def test_run_batch_ordered_buffer_is_bounded() -> None:
+    release = asyncio.Event()
+    started: list[str] = []
+
+    async def blocking(request: httpx.Request) -> httpx.Response:
+        started.append(request.url.path)
+        if "lento" in request.url.path:
+            await release.wait()
+        return httpx.Response(200, json={})
+
+    client = DepsDevClientV3(transport=httpx.MockTransport(blocking))
+    names = ["lento"] + [f"rápido-{i}" for i in range(20)]
+    requests = [{"method": "get-package", "params": {"system": "npm", "name": x}} for x in names]
+    stream = io.StringIO("".join(json.dumps(x) + "\n" for x in requests))
+    out = io.StringIO()
+    batch = asyncio.ensure_future(run_batch(client, stream, out, concurrency=4, ordered=True))
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+    # The slow head and three buffered results hold all the slots.
+    assert len(started) == 4  # noqa: PLR2004
+    release.set()
+    assert await batch == 0
+    assert [json.loads(x)["id"] for x in out.getvalue().splitlines()] == list(range(21))
+
+
+@pytest.mark.asyncio
+async def test_run_batch_ordered_survives_cancelled_request() -> None:
+    async def cancelling(request: httpx.Request) -> httpx.Response:
+        if "cancelado" in request.url.path:
+            raise asyncio.CancelledError
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={})
+
+    client = DepsDevClientV3(transport=httpx.MockTransport(cancelling))
+    names = ["cancelado"] + [f"después-{i}" for i in range(4)]
+    requests = [{"method": "get-package", "params": {"system": "npm", "name": x}} for x in names]
+    stream = io.StringIO("".join(json.dumps(x) + "\n" for x in requests))
+    out = io.StringIO()
+    # Without a line for the cancelled request, the results buffered behind it hold every slot.
+    await asyncio.wait_for(run_batch(client, stream, out, concurrency=2, ordered=True), 5)
+    results = [json.loads(x) for x in out.getvalue().splitlines()]
+    assert [x["id"] for x in results] == list(range(5))
+    assert results[0]["error"] == {"message": "CancelledError: "}
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import time
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.batching import AdaptiveBatcher
+from depsdev.batching import iter_batches
+from depsdev.paging import iter_purl_lookup_batch
+from depsdev.paging import iter_version_batch
+from depsdev.v3 import System
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+PURLS = [f"pkg:pypi/café-{i}@1.0" for i in range(2000)]
+
+
+def stand_in(sizes: list[int], *, per_item: float, limit: int) -> httpx.MockTransport:
+    """
+    Latency-injecting stand-in for the purl batch endpoint: the larger the batch, the slower the
+    answer, and batches above `limit` items time out.
+    """
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        purls = [x["purl"] for x in json.loads(request.content)["requests"]]
+        sizes.append(len(purls))
+        if len(purls) > limit:
+            msg = "Read timed out"
+            raise httpx.ReadTimeout(msg, request=request)
+        await asyncio.sleep(0.001 + per_item * len(purls))
+        responses = [{"request": {"purl": x}, "result": {"version": {}}} for x in purls]
+        return httpx.Response(200, json={"responses": responses})
+
+    return httpx.MockTransport(handle)
+
+
+def test_batcher_aimd() -> None:
+    batcher = AdaptiveBatcher(size=100, window=2.0, target=1.0, increase=10)
+    batcher.success(100, 0.5)
+    assert (batcher.size, batcher.window) == (110, 2.5)
+    # Four times the target per item, the next batches are cut to a quarter.
+    batcher.success(110, 4.0)
+    assert (batcher.size, batcher.window) == (27, 2.5)
+    batcher.failure(27)
+    assert (batcher.size, batcher.in_flight) == (13, 1)
+    batcher.failure(13)
+    assert (batcher.size, batcher.in_flight) == (10, 1)
+    assert batcher.metrics()["failures"] == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_adaptive_batches_recover_from_timeouts() -> None:
+    sizes: list[int] = []
+    client = DepsDevClientV3Alpha(transport=stand_in(sizes, per_item=0.00001, limit=300))
+    batcher = AdaptiveBatcher("purlbatch", size=1000, max_size=1000, window=4)
+    started = time.perf_counter()
+    results = [x async for x, _ in iter_purl_lookup_batch(client, PURLS, batcher=batcher)]
+    elapsed = time.perf_counter() - started
+
+    # Every purl exactly once although the first batches timed out.
+    assert sorted(results) == sorted(PURLS)
+    # Only the batches above the limit failed, and each item went through once.
+    assert 0 < batcher.failures == len([x for x in sizes if x > 300]) < 10  # noqa: PLR2004
+    assert sum(x for x in sizes if x <= 300) == len(PURLS)  # noqa: PLR2004
+    assert batcher.metrics()["items"] == len(PURLS)
+    assert elapsed < 5  # noqa: PLR2004
+
+    # A fixed batch size above the limit never gets through.
+    fixed = AdaptiveBatcher("purlbatch", size=1000, min_size=1000, max_size=1000, retries=1)
+    with pytest.raises(httpx.ReadTimeout):
+        _ = [x async for x in iter_purl_lookup_batch(client, PURLS, batcher=fixed)]
+
+
+@pytest.mark.asyncio
+async def test_slow_batches_shrink_to_target() -> None:
+    sizes: list[int] = []
+    client = DepsDevClientV3Alpha(transport=stand_in(sizes, per_item=0.0001, limit=10_000))
+    batcher = AdaptiveBatcher("purlbatch", size=1000, max_size=1000, window=1, target=0.02)
+    _ = [x async for x in iter_purl_lookup_batch(client, PURLS, batcher=batcher)]
+    # 0.1 ms per item against a 20 ms target settles around 200 items per batch.
+    assert sizes[0] == 1000  # noqa: PLR2004
+    assert max(sizes[1:]) <= 250  # noqa: PLR2004
+    assert batcher.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_fixed_batches_keep_their_boundaries() -> None:
+    sizes: list[int] = []
+    client = DepsDevClientV3Alpha(transport=stand_in(sizes, per_item=0.0001, limit=10_000))
+    batcher = AdaptiveBatcher("purlbatch", size=300, window=2, target=0.01, fixed=True)
+    _ = [x async for x in iter_purl_lookup_batch(client, PURLS, batcher=batcher)]
+    # Slow batches do not shrink the size, the cached request bodies stay the same on every run.
+    assert sizes == [300] * 6 + [200]
+    assert batcher.size == 300  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_all_retrieved() -> None:
+    unretrieved: list[dict[str, object]] = []
+    asyncio.get_running_loop().set_exception_handler(lambda _, context: unretrieved.append(context))
+
+    async def fetch(chunk: list[int]) -> AsyncIterator[int]:
+        await asyncio.sleep(0)
+        raise ValueError(chunk[0])
+        yield chunk[0]
+
+    with pytest.raises(ValueError, match=r"^\d+$"):
+        _ = [x async for x in iter_batches(list(range(40)), fetch, AdaptiveBatcher(size=10))]
+    gc.collect()
+    await asyncio.sleep(0)
+    assert unretrieved == []
+
+
+@pytest.mark.asyncio
+async def test_iter_version_batch() -> None:
+    def handle(request: httpx.Request) -> httpx.Response:
+        keys = [x["versionKey"] for x in json.loads(request.content)["requests"]]
+        responses = [{"request": {"versionKey": x}, "version": {"licenses": ["MIT"]}} for x in keys]
+        return httpx.Response(200, json={"responses": responses})
+
+    client = DepsDevClientV3Alpha(transport=httpx.MockTransport(handle))
+    keys = [
+        (System.NPM, "ñandú", "1.0.0"),
+        (System.PYPI, "日本語", "2.0"),
+        (System.NPM, "ñandú", "1.0.0"),
+    ]
+    results = {key: version async for key, version in iter_version_batch(client, keys)}
+    assert results == {key: {"licenses": ["MIT"]} for key in keys}
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.cli.blast import DependentsCache
+from depsdev.cli.blast import affected_packages
+from depsdev.cli.blast import blast_radius
+from depsdev.cli.fix import VersionCache
+from depsdev.v3 import DepsDevClientV3
+from depsdev.v3 import System
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+if TYPE_CHECKING:
+    from depsdev.osv import OSVVulnerability
+
+VULN: OSVVulnerability = {
+    "id": "GHSA-prueba-0001",
+    "modified": "2026-10-01T00:00:00Z",
+    "summary": "Ejecución remota de código",
+    "affected": [
+        {
+            "package": {"ecosystem": "npm", "name": "ñandú"},
+            "ranges": [{"type": "SEMVER", "events": [{"introduced": "1.1.0"}, {"fixed": "1.3.0"}]}],
+        },
+        {
+            "package": {"ecosystem": "PyPI", "name": "café"},
+            "versions": ["0.9"],
+        },
+        {"package": {"ecosystem": "Desconocido", "name": "otro"}},
+    ],
+}
+
+VERSIONS = {
+    "ñandú": ["1.0.0", "1.1.0", "1.2.0", "1.2.1", "1.3.0"],
+    "café": ["0.8", "0.9", "1.0"],
+}
+DEPENDENTS = {"1.1.0": 5, "1.2.0": 50, "1.2.1": 20, "0.9": 7}
+
+
+def handler(calls: list[str]) -> httpx.MockTransport:
+    def handle(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        parts = request.url.path.split("/")
+        name = httpx.URL(f"/{parts[5]}").path.lstrip("/")
+        if request.url.path.endswith(":dependents"):
+            version = parts[7].split(":")[0]
+            count = DEPENDENTS[version]
+            return httpx.Response(
+                200,
+                json={
+                    "dependentCount": count,
+                    "directDependentCount": count // 2,
+                    "indirectDependentCount": count - count // 2,
+                },
+            )
+        return httpx.Response(
+            200, json={"versions": [{"versionKey": {"version": x}} for x in VERSIONS[name]]}
+        )
+
+    return httpx.MockTransport(handle)
+
+
+def test_affected_packages() -> None:
+    assert affected_packages(VULN) == [(System.NPM, "ñandú"), (System.PYPI, "café")]
+
+
+@pytest.mark.asyncio
+async def test_blast_radius_ranks_affected_versions() -> None:
+    calls: list[str] = []
+    transport = handler(calls)
+    versions = VersionCache(DepsDevClientV3(transport=transport))
+    dependents = DependentsCache(DepsDevClientV3Alpha(transport=transport), concurrency=2)
+
+    impacts = await blast_radius(VULN, versions, dependents)
+    assert [(x.name, x.version, x.dependents) for x in impacts] == [
+        ("ñandú", "1.2.0", 50),
+        ("ñandú", "1.2.1", 20),
+        ("café", "0.9", 7),
+        ("ñandú", "1.1.0", 5),
+    ]
+    assert impacts[0].direct == 25  # noqa: PLR2004
+    # One version list per package, one dependents call per affected version.
+    assert len(calls) == 2 + len(DEPENDENTS)
+
+    calls.clear()
+    await blast_radius(VULN, versions, dependents)
+    assert calls == []
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.cli.cache import export_bundle
+from depsdev.cli.cache import import_bundle
+from depsdev.cli.cache import warm
+from depsdev.cli.vuln import get_vulns
+from depsdev.osv import OSVClientV1
+from depsdev.shared import SharedStore
+from depsdev.shared import SharedTransport
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+VULN = {"id": "GHSA-xxxx", "summary": "Vulnerabilidad en el análisis"}
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/v1/querybatch":
+        queries = json.loads(request.content)["queries"]
+        results = [
+            {"vulns": [{"id": "GHSA-xxxx"}]} if "requests" in x["package"]["purl"] else {}
+            for x in queries
+        ]
+        return httpx.Response(200, json={"results": results})
+    if request.url.path == "/v1/vulns/GHSA-xxxx":
+        return httpx.Response(200, json=VULN)
+    if request.url.host == "api.deps.dev" and "shuju" not in request.url.path:
+        return httpx.Response(200, json={"path": request.url.path})
+    return httpx.Response(404, json={"message": "not found"})
+
+
+@pytest.mark.asyncio
+async def test_warm_export_import_offline(tmp_path: Path) -> None:
+    (tmp_path / "requirements.txt").write_text("requests==2.31.0\nshuju==1.0\n")
+    online = SharedStore(str(tmp_path / "online.db"), rate=0)
+    count = await warm(
+        [str(tmp_path / "requirements.txt")], online, transport=httpx.MockTransport(handler)
+    )
+    assert count == 2  # noqa: PLR2004
+
+    bundle = str(tmp_path / "depsdev-cache.jsonl.gz")
+    exported = export_bundle(online, bundle)
+    # querybatch, one advisory, get_package/get_version/get_dependencies for requests.
+    assert exported == 5  # noqa: PLR2004
+
+    offline = SharedStore(str(tmp_path / "offline.db"), offline=True)
+    assert import_bundle(offline, bundle) == exported
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise AssertionError(request.url)
+
+    client = OSVClientV1(transport=SharedTransport(offline, httpx.MockTransport(unreachable)))
+    purls = ["pkg:pypi/requests@2.31.0", "pkg:pypi/shuju@1.0"]
+    assert await get_vulns(purls, client) == {"pkg:pypi/requests@2.31.0": [VULN]}
+
+    with pytest.raises(httpx.TransportError, match="not in the offline cache"):
+        await client.get_vuln("GHSA-yyyy")
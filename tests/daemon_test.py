@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.daemon import Daemon
+from depsdev.daemon import DaemonTransport
+from depsdev.daemon import discover
+from depsdev.osv import OSVClientV1
+from depsdev.scheduler import Scheduler
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.asyncio
+async def test_daemon_caches_and_relays(tmp_path: Path) -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/v1/vulns/missing":
+            return httpx.Response(404, json={"message": "Bug not found."})
+        if request.url.path == "/v1/vulns/roto":
+            msg = "sin conexión"
+            raise ValueError(msg)
+        return httpx.Response(
+            200, json={"id": "GHSA-xxxx", "summary": "Überprüfung fehlgeschlagen"}
+        )
+
+    path = str(tmp_path / "depsdev.sock")
+    daemon = Daemon(upstream=httpx.MockTransport(handler))
+    server = asyncio.ensure_future(daemon.serve(path))
+    while not (tmp_path / "depsdev.sock").exists():  # noqa: ASYNC110
+        await asyncio.sleep(0.01)
+
+    client = OSVClientV1(transport=DaemonTransport(path))
+    first, second = await asyncio.gather(client.get_vuln("GHSA-xxxx"), client.get_vuln("GHSA-xxxx"))
+    third = await client.get_vuln("GHSA-xxxx")
+    assert first == second == third == {"id": "GHSA-xxxx", "summary": "Überprüfung fehlgeschlagen"}
+    assert calls == ["/v1/vulns/GHSA-xxxx"]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get_vuln("missing")
+    with pytest.raises(httpx.TransportError, match="ValueError: sin conexión"):
+        await client.get_vuln("roto")
+
+    server.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await server
+    assert not (tmp_path / "depsdev.sock").exists()
+
+
+@pytest.mark.asyncio
+async def test_hung_daemon_times_out(tmp_path: Path) -> None:
+    async def hang(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.readline()
+        await asyncio.sleep(10)
+        writer.close()
+
+    path = str(tmp_path / "colgado.sock")
+    server = await asyncio.start_unix_server(hang, path=path)
+    async with server:
+        client = OSVClientV1(timeout=0.1, transport=DaemonTransport(path))
+        with pytest.raises(httpx.ReadTimeout):
+            await client.get_vuln("GHSA-xxxx")
+
+
+@pytest.mark.asyncio
+async def test_queued_request_does_not_time_out(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("depsdev.daemon.KEEPALIVE", 0.05)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.15)
+        return httpx.Response(200, json={"id": request.url.path.rsplit("/", 1)[-1]})
+
+    path = str(tmp_path / "cola.sock")
+    daemon = Daemon(upstream=httpx.MockTransport(handler), scheduler=Scheduler(total=1))
+    server = asyncio.ensure_future(daemon.serve(path))
+    while not (tmp_path / "cola.sock").exists():  # noqa: ASYNC110
+        await asyncio.sleep(0.01)
+
+    # One upstream call at a time, the last request waits longer than the read timeout.
+    client = OSVClientV1(timeout=0.2, transport=DaemonTransport(path))
+    ids = ["GHSA-uno", "GHSA-dos", "GHSA-tres"]
+    assert await asyncio.gather(*(client.get_vuln(x) for x in ids)) == [{"id": x} for x in ids]
+
+    server.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await server
+
+
+def test_discover(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DEPSDEV_SOCKET", str(tmp_path / "depsdev.sock"))
+    assert discover() is None
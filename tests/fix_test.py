@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from depsdev.cli.fix import Upgrade
+from depsdev.cli.fix import VersionCache
+from depsdev.cli.fix import plan_upgrades
+from depsdev.osv import OSVClientV1
+from depsdev.v3 import DepsDevClientV3
+
+VULNS = {
+    "GHSA-uno": {"introduced": "0", "fixed": "2.1.0"},
+    "GHSA-dos": {"introduced": "2.0.0", "fixed": "2.2.1"},
+}
+
+
+def osv(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/v1/querybatch":
+        queries = json.loads(request.content)["queries"]
+        results = [
+            {"vulns": [{"id": x} for x in VULNS]} if "biblioteca" in q["package"]["purl"] else {}
+            for q in queries
+        ]
+        return httpx.Response(200, json={"results": results})
+    vuln_id = request.url.path.rsplit("/", 1)[-1]
+    events = [{"introduced": VULNS[vuln_id]["introduced"]}, {"fixed": VULNS[vuln_id]["fixed"]}]
+    affected = [
+        {
+            "package": {"ecosystem": "npm", "name": "biblioteca"},
+            "ranges": [{"type": "SEMVER", "events": events}],
+        }
+    ]
+    return httpx.Response(200, json={"id": vuln_id, "affected": affected})
+
+
+@pytest.mark.asyncio
+async def test_plan_upgrades_fetches_each_package_once() -> None:
+    calls: list[str] = []
+
+    def deps(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        versions = ["2.0.0", "2.1.0", "2.2.0", "2.2.1", "2.3.0-beta.1", "3.0.0"]
+        return httpx.Response(
+            200, json={"versions": [{"versionKey": {"version": x}} for x in versions]}
+        )
+
+    versions = VersionCache(DepsDevClientV3(transport=httpx.MockTransport(deps)))
+    osv_client = OSVClientV1(transport=httpx.MockTransport(osv))
+    purls = ["pkg:npm/biblioteca@2.0.0", "pkg:npm/ajena@1.0.0"]
+    assert await plan_upgrades(purls, osv_client, versions) == [
+        Upgrade("pkg:npm/biblioteca@2.0.0", "2.0.0", "2.2.1", ["GHSA-uno", "GHSA-dos"])
+    ]
+    assert await plan_upgrades(["pkg:npm/biblioteca@2.1.0"], osv_client, versions) == [
+        Upgrade("pkg:npm/biblioteca@2.1.0", "2.1.0", "2.2.1", ["GHSA-uno", "GHSA-dos"])
+    ]
+    assert calls == ["/v3/systems/NPM/packages/biblioteca"]
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import io
+import json
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.cli.fix import VersionCache
+from depsdev.cli.freshness import freshness_helper
+from depsdev.cli.output import OutputFormat
+from depsdev.freshness import measure
+from depsdev.freshness import parse_timestamp
+from depsdev.v3 import DepsDevClientV3
+from depsdev.v3 import System
+from depsdev.versions import VersionIndex
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+PUBLISHED = {
+    "1.0.0": "2020-01-01T00:00:00Z",
+    "1.1.0": "2021-01-01T00:00:00Z",
+    "2.0.0-rc.1": "2021-06-01T00:00:00Z",
+    "1.2.0": "2021-07-01T00:00:00Z",
+    "2.0.0": "2022-01-01T00:00:00Z",
+}
+
+
+@pytest.mark.parametrize(
+    ("value", "microsecond"),
+    [
+        ("2023-10-01T12:34:42Z", 0),
+        ("2023-10-01T12:34:42.1Z", 100_000),
+        ("2023-10-01T12:34:42.12Z", 120_000),
+        ("2023-10-01T12:34:42.1234Z", 123_400),
+        ("2023-10-01T12:34:42.12345Z", 123_450),
+        ("2023-10-01T12:34:42.1234567Z", 123_456),
+        ("2023-10-01T12:34:42.123456789Z", 123_456),
+        ("2023-10-01t12:34:42.123456789z", 123_456),
+    ],
+)
+def test_parse_timestamp_any_fraction(value: str, microsecond: int) -> None:
+    expected = datetime(2023, 10, 1, 12, 34, 42, microsecond, tzinfo=timezone.utc)
+    assert parse_timestamp(value) == expected
+
+
+def test_parse_timestamp_offsets_and_garbage() -> None:
+    parsed = parse_timestamp("2023-10-01T14:34:42.5+02:00")
+    assert parsed == datetime(2023, 10, 1, 14, 34, 42, 500_000, timezone(timedelta(hours=2)))
+    assert parse_timestamp("") is None
+    assert parse_timestamp("ayer por la tarde") is None
+
+
+def test_measure() -> None:
+    index = VersionIndex(System.NPM, list(PUBLISHED), excluded={"1.2.0"}, published=PUBLISHED)
+    result = measure("pkg:npm/ñandú@1.0.0", index, "1.0.0")
+    assert result.latest == "2.0.0"
+    # 1.1.0 and 2.0.0, the prerelease and the deprecated 1.2.0 do not count.
+    assert result.behind == 2  # noqa: PLR2004
+    assert result.libyears == pytest.approx(731 / 365.25)
+
+    assert measure("pkg:npm/ñandú@2.0.0", index, "2.0.0").behind == 0
+    index.default = "1.1.0"
+    assert measure("pkg:npm/ñandú@1.0.0", index, "1.0.0").behind == 1
+    assert measure("pkg:npm/ñandú@2.0.0", index, "2.0.0").libyears == 0.0
+
+
+@pytest.mark.asyncio
+async def test_freshness_helper_shares_version_lists(tmp_path: Path) -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        versions = [
+            {"versionKey": {"version": x}, "publishedAt": date, "isDefault": x == "2.0.0"}
+            for x, date in PUBLISHED.items()
+        ]
+        return httpx.Response(200, json={"versions": versions})
+
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = tmp_path / "a" / "requirements.txt"
+    second = tmp_path / "b" / "requirements.txt"
+    first.write_text("café==1.0.0\nniño==2.0.0\n", encoding="utf-8")
+    second.write_text("café==1.1.0\n", encoding="utf-8")
+
+    out = io.StringIO()
+    await freshness_helper(
+        [str(first), str(second)],
+        format=OutputFormat.JSONL,
+        versions=VersionCache(DepsDevClientV3(transport=httpx.MockTransport(handler))),
+        out=out,
+    )
+    rows = [json.loads(x) for x in out.getvalue().splitlines()]
+    summaries = {x["source"]: x for x in rows if "purl" not in x}
+    assert summaries[str(first)]["outdated"] == 1
+    assert summaries[str(first)]["behind"] == 3  # noqa: PLR2004
+    assert summaries[str(second)]["behind"] == 2  # noqa: PLR2004
+    assert [x["latest"] for x in rows if x["source"] == str(second) and "purl" in x] == ["2.0.0"]
+    # One version list per package, however many manifests use it.
+    assert len(calls) == 2  # noqa: PLR2004
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from depsdev.graphdiff import Graph
+from depsdev.graphdiff import diff_graphs
+from depsdev.graphdiff import diff_versions
+from depsdev.v3 import DepsDevClientV3
+from depsdev.v3 import System
+
+
+def response(nodes: list[str], edges: list[tuple[int, int]]) -> dict[str, object]:
+    return {
+        "nodes": [
+            {
+                "versionKey": {
+                    "system": "NPM",
+                    "name": x.rpartition("@")[0],
+                    "version": x.rpartition("@")[2],
+                }
+            }
+            for x in nodes
+        ],
+        "edges": [{"fromNode": a, "toNode": b, "requirement": "^1.0.0"} for a, b in edges],
+    }
+
+
+# raiz -> (hoja -> profundo), comun -> hoja, plus a cycle between ciclo-a and ciclo-b.
+OLD = response(
+    ["raiz@1.0.0", "hoja@1.0.0", "profundo@1.0.0", "comun@1.0.0", "ciclo-a@1.0.0", "ciclo-b@1.0.0"],
+    [(0, 1), (1, 2), (0, 3), (3, 1), (0, 4), (4, 5), (5, 4)],
+)
+NEW = response(
+    ["raiz@2.0.0", "hoja@1.1.0", "comun@1.0.0", "nuevo@1.0.0", "ciclo-a@1.0.0", "ciclo-b@1.0.0"],
+    [(0, 2), (2, 1), (0, 1), (1, 3), (0, 4), (4, 5), (5, 4)],
+)
+
+
+def test_fingerprints_are_stable_and_handle_cycles() -> None:
+    first = Graph.from_response(OLD).fingerprints()
+    assert first == Graph.from_response(OLD).fingerprints()
+    assert len(set(first)) == len(first)
+
+
+def test_diff_graphs() -> None:
+    result = diff_graphs(Graph.from_response(OLD), Graph.from_response(NEW))
+    assert result.added == ["hoja@1.1.0", "nuevo@1.0.0", "raiz@2.0.0"]
+    assert result.removed == ["hoja@1.0.0", "profundo@1.0.0", "raiz@1.0.0"]
+    assert result.changed == {"hoja": (["1.0.0"], ["1.1.0"]), "raiz": (["1.0.0"], ["2.0.0"])}
+    assert ("hoja@1.1.0", "nuevo@1.0.0", "^1.0.0") in result.added_edges
+    assert ("hoja@1.0.0", "profundo@1.0.0", "^1.0.0") in result.removed_edges
+    # The ciclo-a/ciclo-b region is identical and skipped.
+    assert result.unchanged == 2  # noqa: PLR2004
+    assert not any("ciclo" in edge[0] for edge in result.added_edges + result.removed_edges)
+
+
+@pytest.mark.asyncio
+async def test_diff_versions_reports_new_advisories() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith(":dependencies"):
+            return httpx.Response(200, json=OLD if "/1.0.0:" in path else NEW)
+        advisories = {"nuevo": ["GHSA-nuevo"], "hoja": ["GHSA-viejo"]}
+        name = path.split("/packages/")[1].split("/")[0]
+        return httpx.Response(
+            200, json={"advisoryKeys": [{"id": x} for x in advisories.get(name, [])]}
+        )
+
+    client = DepsDevClientV3(transport=httpx.MockTransport(handler))
+    result = await diff_versions(System.NPM, "raiz", "1.0.0", "2.0.0", client=client)
+    assert result.advisories == {"nuevo@1.0.0": ["GHSA-nuevo"]}
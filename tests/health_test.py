@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import io
+import json
+from typing import TYPE_CHECKING
+from typing import Any
+
+import httpx
+import pytest
+
+from depsdev.cli.output import OutputFormat
+from depsdev.cli.output import get_writer
+from depsdev.health import PROJECT_TTL
+from depsdev.health import enrich
+from depsdev.health import project_store
+from depsdev.health import source_project
+from depsdev.shared import SharedStore
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+REPOSITORIES = {
+    "pkg:npm/café@1.0.0": "github.com/ejemplo/monorepo",
+    "pkg:npm/niño@2.0.0": "github.com/ejemplo/monorepo",
+    "pkg:pypi/日本語@3.0.0": "github.com/例/日本語",
+    "pkg:pypi/sin-proyecto@1.0.0": None,
+}
+
+
+def project(project_id: str) -> dict[str, Any]:
+    return {
+        "projectKey": {"id": project_id},
+        "starsCount": 42,
+        "license": "MIT",
+        "scorecard": {"overallScore": 7.5, "date": "2026-10-01T00:00:00Z"},
+    }
+
+
+def transport(calls: list[dict[str, Any]]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        calls.append({"path": request.url.path, **body})
+        if request.url.path == "/v3alpha/purlbatch":
+            responses = [
+                {
+                    "request": x,
+                    "result": {
+                        "version": {
+                            "relatedProjects": [
+                                {
+                                    "projectKey": {"id": "github.com/otro/fork"},
+                                    "relationType": "ISSUE_TRACKER",
+                                },
+                                {
+                                    "projectKey": {"id": REPOSITORIES[x["purl"]]},
+                                    "relationType": "SOURCE_REPO",
+                                },
+                            ]
+                            if REPOSITORIES[x["purl"]]
+                            else []
+                        }
+                    },
+                }
+                for x in body["requests"]
+            ]
+            return httpx.Response(200, json={"responses": responses})
+        # One project per page to exercise the page token chain.
+        index = int(body.get("pageToken") or 0)
+        request_ = body["requests"][index]
+        page: dict[str, Any] = {
+            "responses": [{"request": request_, "project": project(request_["projectKey"]["id"])}]
+        }
+        if index + 1 < len(body["requests"]):
+            page["nextPageToken"] = str(index + 1)
+        return httpx.Response(200, json=page)
+
+    return httpx.MockTransport(handler)
+
+
+def test_source_project_prefers_source_repo() -> None:
+    version = {
+        "relatedProjects": [
+            {"projectKey": {"id": "a"}, "relationType": "ISSUE_TRACKER"},
+            {"projectKey": {"id": "b"}, "relationType": "SOURCE_REPO"},
+        ]
+    }
+    assert source_project(version) == "b"
+    assert source_project({"relatedProjects": version["relatedProjects"][:1]}) == "a"
+    assert source_project({}) is None
+
+
+@pytest.mark.asyncio
+async def test_enrich_deduplicates_and_caches(tmp_path: Path) -> None:
+    calls: list[dict[str, Any]] = []
+    client = DepsDevClientV3Alpha(transport=transport(calls))
+    store = SharedStore(str(tmp_path / "store.db"), rate=0)
+
+    result = await enrich(list(REPOSITORIES), client, store)
+    assert {purl: x["id"] for purl, x in result.items()} == {
+        purl: x for purl, x in REPOSITORIES.items() if x is not None
+    }
+    assert result["pkg:pypi/日本語@3.0.0"]["scorecard"] == 7.5  # noqa: PLR2004
+    project_calls = [x for x in calls if x["path"] == "/v3alpha/projectbatch"]
+    # Two distinct repositories, one page each.
+    assert len(project_calls) == 2  # noqa: PLR2004
+    assert [x["projectKey"]["id"] for x in project_calls[0]["requests"]] == [
+        "github.com/ejemplo/monorepo",
+        "github.com/例/日本語",
+    ]
+
+    calls.clear()
+    assert await enrich(list(REPOSITORIES), client, store) == result
+    assert [x["path"] for x in calls] == ["/v3alpha/purlbatch"]
+
+
+def test_project_store_only_when_shared(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("DEPSDEV_SHARED", raising=False)
+    monkeypatch.delenv("DEPSDEV_OFFLINE", raising=False)
+    assert project_store() is None
+    monkeypatch.setenv("DEPSDEV_SHARED", str(tmp_path / "compartido.db"))
+    store = project_store()
+    assert store is not None
+    assert (store.path, store.ttl) == (str(tmp_path / "compartido.db"), PROJECT_TTL)
+    store.close()
+
+
+@pytest.mark.parametrize("output_format", [OutputFormat.JSONL, OutputFormat.SARIF])
+def test_writers_include_health(output_format: OutputFormat) -> None:
+    out = io.StringIO()
+    writer = get_writer(output_format, out)
+    writer.health("pkg:npm/café@1.0.0", {"id": "github.com/ejemplo/monorepo", "scorecard": 7.5})
+    writer.close()
+    if output_format is OutputFormat.JSONL:
+        assert json.loads(out.getvalue()) == {
+            "purl": "pkg:npm/café@1.0.0",
+            "project": {"id": "github.com/ejemplo/monorepo", "scorecard": 7.5},
+        }
+    else:
+        run = json.loads(out.getvalue())["runs"][0]
+        assert run["results"] == []
+        assert run["properties"]["projects"]["pkg:npm/café@1.0.0"]["scorecard"] == 7.5  # noqa: PLR2004
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import zipfile
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.cli.identify import hash_file
+from depsdev.cli.identify import identify_artifacts
+from depsdev.cli.identify import iter_archive_digests
+from depsdev.cli.identify import iter_digests
+from depsdev.v3 import DepsDevClientV3
+from depsdev.v3 import HashType
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def sha1(data: bytes) -> str:
+    return base64.b64encode(hashlib.sha1(data).digest()).decode()  # noqa: S324
+
+
+def test_hash_file(tmp_path: Path) -> None:
+    data = b"\x00\xff" * 1_000_000
+    (tmp_path / "biblioteca.jar").write_bytes(data)
+    path, digest = hash_file(str(tmp_path / "biblioteca.jar"), "sha1")
+    assert path == str(tmp_path / "biblioteca.jar")
+    assert digest == sha1(data)
+
+
+def test_iter_archive_digests(tmp_path: Path) -> None:
+    archive = tmp_path / "vendor.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("lib/库.jar", "kù".encode())
+        zf.writestr("lib/README.md", b"not an artifact")
+    assert list(iter_archive_digests(str(archive), "sha1")) == [
+        (f"{archive}!lib/库.jar", sha1("kù".encode())),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_single_artifact_is_hashed_whole(tmp_path: Path) -> None:
+    jar = tmp_path / "biblioteca-1.0.jar"
+    with zipfile.ZipFile(jar, "w") as zf:
+        zf.writestr("META-INF/MANIFEST.MF", b"Manifest-Version: 1.0\n")
+        zf.writestr("lib/interno.jar", "ñ".encode())
+    whole = sha1(jar.read_bytes())
+
+    assert [x async for x in iter_digests(str(jar), "sha1")] == [(str(jar), whole)]
+    assert [x async for x in iter_digests(str(jar), "sha1", expand=True)] == [
+        (str(jar), whole),
+        (f"{jar}!lib/interno.jar", sha1("ñ".encode())),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_identify_artifacts_deduplicates(tmp_path: Path) -> None:
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "pustak-1.0.jar").write_bytes(b"pustak")
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "pustak-copy.jar").write_bytes(b"pustak")
+    (tmp_path / "b" / "desconocido.whl").write_bytes(b"desconocido")
+    queried: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        value = request.url.params["hash.value"]
+        queried.append(value)
+        if value != sha1(b"pustak"):
+            return httpx.Response(200, json={})
+        key = {"system": "MAVEN", "name": "org.pustak:pustak", "version": "1.0"}
+        return httpx.Response(200, json={"results": [{"version": {"versionKey": key}}]})
+
+    client = DepsDevClientV3(transport=httpx.MockTransport(handler))
+    artifacts = await identify_artifacts(str(tmp_path), HashType.SHA1, client=client, jobs=2)
+
+    assert sorted(queried) == sorted([sha1(b"pustak"), sha1(b"desconocido")])
+    assert [(x.paths, x.matches) for x in artifacts] == [
+        (
+            [str(tmp_path / "a" / "pustak-1.0.jar"), str(tmp_path / "b" / "pustak-copy.jar")],
+            ["MAVEN:org.pustak:pustak@1.0"],
+        ),
+        ([str(tmp_path / "b" / "desconocido.whl")], []),
+    ]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import sys
+import tarfile
+
+import httpx
+import pytest
+
+from depsdev.cli.image import chain_ids
+from depsdev.cli.image import open_image
+from depsdev.cli.image import query_layers
+from depsdev.cli.image import scan_image
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+
+def make_layer(files: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tf:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def sha256(data: bytes) -> str:
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def make_image(layers: list[bytes], *, oci: bool) -> io.BytesIO:
+    members: dict[str, bytes] = {}
+    compressed = [gzip.compress(x) for x in layers]
+    config = json.dumps({"rootfs": {"type": "layers", "diff_ids": [sha256(x) for x in layers]}})
+    if oci:
+        manifest = {
+            "config": {"digest": sha256(config.encode())},
+            "layers": [{"digest": sha256(x)} for x in compressed],
+        }
+        members["index.json"] = json.dumps(
+            {"manifests": [{"digest": sha256(json.dumps(manifest).encode())}]}
+        ).encode()
+        for data in (*compressed, json.dumps(manifest).encode(), config.encode()):
+            members[f"blobs/sha256/{sha256(data)[7:]}"] = data
+    else:
+        # Layers come before the manifest, the scanner must not rely on member order.
+        for i, data in enumerate(compressed):
+            members[f"layer{i}/layer.tar"] = data
+        members["config.json"] = config.encode()
+        members["manifest.json"] = json.dumps(
+            [{"Config": "config.json", "Layers": [f"layer{i}/layer.tar" for i in range(2)]}]
+        ).encode()
+    return io.BytesIO(make_layer(members))
+
+
+@pytest.mark.parametrize("oci", [False, True])
+def test_scan_image(*, oci: bool) -> None:
+    layers = [make_layer({"etc/os-release": b"debian"}), make_layer({"app/main.py": b"print()"})]
+    scan = scan_image(make_image(layers, oci=oci))
+    assert scan.layers() == [sha256(x) for x in layers]
+
+
+def test_chain_ids() -> None:
+    assert list(chain_ids(["sha256:aaa", "sha256:bbb"])) == [
+        "sha256:aaa",
+        sha256(b"sha256:aaa sha256:bbb"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_query_layers() -> None:
+    diff_ids = ["sha256:base", "sha256:runtime", "sha256:app"]
+    known = dict(zip(list(chain_ids(diff_ids))[:2], [["debian"], ["python", "pypy"]]))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        chain_id = request.url.path.rsplit("/", 1)[-1]
+        if chain_id not in known:
+            return httpx.Response(404, json={"message": "not found"})
+        return httpx.Response(200, json={"results": [{"repository": x} for x in known[chain_id]]})
+
+    client = DepsDevClientV3Alpha(transport=httpx.MockTransport(handler))
+    layers = await query_layers(diff_ids, client)
+    assert [x.repositories for x in layers] == [["debian"], ["python", "pypy"], []]
+
+
+def test_open_image_keeps_stdin_open(monkeypatch: pytest.MonkeyPatch) -> None:
+    stdin = io.TextIOWrapper(io.BytesIO(b"capa"))
+    monkeypatch.setattr(sys, "stdin", stdin)
+    with open_image("-") as stream:
+        assert stream.read() == b"capa"
+    assert not stdin.closed
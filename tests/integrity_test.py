@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.cli.integrity import HashLookup
+from depsdev.cli.integrity import iter_declared
+from depsdev.cli.integrity import verify_helper
+from depsdev.cli.output import OutputFormat
+from depsdev.cli.purl import purl_key
+from depsdev.v3 import DepsDevClientV3
+from depsdev.v3 import HashType
+from depsdev.v3 import System
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+GOOD = hashlib.sha256(b"jalape\xc3\xb1o").hexdigest()
+SWAPPED = hashlib.sha256(b"cr\xc3\xa8me").hexdigest()
+UNKNOWN = hashlib.sha256(b"\xe6\x97\xa5\xe6\x9c\xac").hexdigest()
+
+
+def b64(digest: str) -> str:
+    return base64.b64encode(bytes.fromhex(digest)).decode()
+
+
+def test_iter_declared(tmp_path: Path) -> None:
+    poetry = tmp_path / "poetry.lock"
+    poetry.write_text(
+        "[[package]]\n"
+        'name = "Jalapeño_Utils"\n'
+        'version = "1.0.0"\n'
+        "files = [\n"
+        f'    {{file = "a.whl", hash = "sha256:{GOOD}"}},\n'
+        f'    {{file = "a.tar.gz", hash = "blake2b:{GOOD}"}},\n'
+        "]\n\n"
+        "[metadata]\n"
+        f'content-hash = "{SWAPPED}"\n',
+        encoding="utf-8",
+    )
+    # blake2b is not a hash deps.dev can be queried by.
+    [declared] = iter_declared(str(poetry))
+    assert purl_key(declared.purl) == (System.PYPI, "jalapeño-utils", "1.0.0")
+    assert (declared.hash_type, declared.value) == (HashType.SHA256, b64(GOOD))
+
+    cargo = tmp_path / "Cargo.lock"
+    cargo.write_text(
+        f'[[package]]\nname = "crème"\nversion = "0.1.0"\nchecksum = "{SWAPPED}"\n',
+        encoding="utf-8",
+    )
+    assert [x.value for x in iter_declared(str(cargo))] == [b64(SWAPPED)]
+
+    sri = base64.b64encode(hashlib.sha512(b"x").digest()).decode()
+    lock = tmp_path / "package-lock.json"
+    lock.write_text(
+        json.dumps(
+            {
+                "packages": {
+                    "": {"name": "app"},
+                    "node_modules/@ñ/café": {"version": "2.0.0", "integrity": f"sha512-{sri}"},
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    [declared] = iter_declared(str(lock))
+    assert declared.hash_type == HashType.SHA512
+    assert declared.value == sri
+
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text(
+        f"niño==3.0 \\\n    --hash=sha256:{GOOD} \\\n    --hash=sha256:{UNKNOWN}\nplain==1.0\n",
+        encoding="utf-8",
+    )
+    assert [x.value for x in iter_declared(str(requirements))] == [b64(GOOD), b64(UNKNOWN)]
+
+    # pip-compile --generate-hashes keeps extras and markers on the requirement line.
+    requirements.write_text(
+        f'Jalapeño_Picante[estándar]==0.23.2 ; python_version >= "3.8" \\\n'
+        f"    --hash=sha256:{GOOD}  # via -r base.in\n",
+        encoding="utf-8",
+    )
+    [declared] = iter_declared(str(requirements))
+    assert declared.purl == "pkg:pypi/jalape%c3%b1o-picante@0.23.2"
+    assert declared.value == b64(GOOD)
+
+
+@pytest.mark.asyncio
+async def test_verify_helper(tmp_path: Path) -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        value = request.url.params["hash.value"]
+        calls.append(value)
+        if value == b64(UNKNOWN):
+            return httpx.Response(404, json={})
+        name = "jalapeño" if value == b64(GOOD) else "crème"
+        key = {"system": "PYPI", "name": name, "version": "1.0.0"}
+        return httpx.Response(200, json={"results": [{"version": {"versionKey": key}}]})
+
+    lock = tmp_path / "Pipfile.lock"
+    lock.write_text(
+        json.dumps(
+            {
+                "_meta": {},
+                "default": {
+                    "Jalapeño": {"version": "==1.0.0", "hashes": [f"sha256:{GOOD}"]},
+                    "naïve": {
+                        "version": "==2.0.0",
+                        "hashes": [f"sha256:{SWAPPED}", f"sha256:{UNKNOWN}"],
+                    },
+                },
+                "develop": {"crème": {"version": "==1.0.0", "hashes": [f"sha256:{SWAPPED}"]}},
+            }
+        ),
+        encoding="utf-8",
+    )
+    out = io.StringIO()
+    lookup = HashLookup(DepsDevClientV3(transport=httpx.MockTransport(handler)))
+    mismatched = await verify_helper([str(lock)], format=OutputFormat.JSONL, lookup=lookup, out=out)
+    rows = {(x["purl"], x["hash"]): x for x in map(json.loads, out.getvalue().splitlines())}
+    statuses = sorted((purl.split("@")[1], x["status"]) for (purl, _), x in rows.items())
+    assert statuses == [
+        ("1.0.0", "ok"),
+        ("1.0.0", "ok"),
+        ("2.0.0", "mismatch"),
+        ("2.0.0", "unknown"),
+    ]
+    assert mismatched == 1
+    # The hash shared by naïve and crème is looked up once.
+    assert sorted(calls) == sorted({b64(GOOD), b64(SWAPPED), b64(UNKNOWN)})
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.jsonstream import JSONReader
+from depsdev.jsonstream import aiter_items
+from depsdev.jsonstream import items
+from depsdev.jsonstream import iter_items
+from depsdev.jsonstream import kvitems
+from depsdev.v3 import DepsDevClientV3
+from depsdev.v3 import System
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from typing import Any
+
+DOCUMENT = {
+    "metadata": {"tool": "depsdev", "escaped": 'comillas "dobles" y {llaves} [corchetes]\\'},
+    "packages": {
+        "": {"name": "raíz"},
+        "node_modules/@babel/core": {"version": "7.24.0", "dev": True},
+        "node_modules/中文": {"version": "1.0.0-beta.2", "size": -1.5e-10},
+    },
+    "components": [{"purl": "pkg:npm/left-pad@1.3.0"}, {"purl": "pkg:pypi/हिंदी@0.1"}],
+    "count": 12345678901234567890,
+}
+
+
+def chunked(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_items_and_kvitems(size: int, indent: int | None) -> None:
+    text = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False)
+    assert list(kvitems(chunked(text, size), "packages")) == list(DOCUMENT["packages"].items())  # type: ignore[attr-defined]
+    assert list(items(chunked(text, size), "components.item")) == DOCUMENT["components"]
+    assert list(items(chunked(text, size), "count")) == [DOCUMENT["count"]]
+    assert list(items(chunked(text, size), "")) == [DOCUMENT]
+
+
+@pytest.mark.parametrize("size", [1, 7])
+def test_bytes_chunks_split_multibyte_characters(size: int) -> None:
+    data = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+    chunks = [data[i : i + size] for i in range(0, len(data), size)]
+    assert [x["purl"] for x in items(chunks, "components.item")] == [
+        "pkg:npm/left-pad@1.3.0",
+        "pkg:pypi/हिंदी@0.1",
+    ]
+
+
+def test_reader_members() -> None:
+    reader = JSONReader(chunked('{"a": [1, 2], "b": {"c": null}, "d": "e"}', 3))
+    seen = []
+    for key in reader.members():
+        seen.append(key)
+        if key == "d":
+            assert reader.value() == "e"
+        else:
+            reader.skip()
+    assert seen == ["a", "b", "d"]
+
+
+def test_invalid_document() -> None:
+    with pytest.raises(json.JSONDecodeError):
+        list(kvitems(['{"packages": {"a": 1 "b": 2}}'], "packages"))
+
+
+GRAPH: dict[str, Any] = {
+    "nodes": [
+        {"versionKey": {"system": "NPM", "name": "raíz", "version": "1.0.0"}},
+        {"versionKey": {"system": "NPM", "name": "niño", "version": "2.0.0"}},
+    ],
+    "edges": [{"fromNode": 0, "toNode": 1, "requirement": "^2.0.0"}],
+    "error": "",
+}
+
+
+def test_iter_items_many_prefixes() -> None:
+    text = json.dumps(GRAPH, ensure_ascii=False)
+    assert list(iter_items(chunked(text, 3), ["edges.item", "nodes.item"])) == [
+        *(("nodes.item", x) for x in GRAPH["nodes"]),
+        *(("edges.item", x) for x in GRAPH["edges"]),
+    ]
+
+
+async def achunked(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[i : i + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 4, 1024])
+async def test_aiter_items(size: int) -> None:
+    data = json.dumps(DOCUMENT, ensure_ascii=False).encode()
+    result = [x async for x in aiter_items(achunked(data, size), ["components.item"], buffered=2)]
+    assert result == [("components.item", x) for x in DOCUMENT["components"]]  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_aiter_items_stops_early() -> None:
+    data = json.dumps({"items": list(range(10_000))}).encode()
+    stream = aiter_items(achunked(data, 16), ["items.item"], buffered=1)
+    seen = []
+    async for _, x in stream:
+        seen.append(x)
+        if x == 5:  # noqa: PLR2004
+            break
+    # Closing stops the parser thread without reading the rest of the body.
+    await stream.aclose()  # type: ignore[attr-defined]
+    assert seen == list(range(6))
+
+
+@pytest.mark.asyncio
+async def test_aiter_items_leaves_default_executor_free() -> None:
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1)
+    loop.set_default_executor(executor)
+    data = json.dumps({"items": list(range(10_000))}).encode()
+    stream = aiter_items(achunked(data, 16), ["items.item"], buffered=1)
+    assert await stream.__anext__() == ("items.item", 0)
+    # The parser is now blocked on the slow consumer, the default pool must still serve others.
+    assert await asyncio.wait_for(asyncio.to_thread(str, "señal"), timeout=5) == "señal"
+    await stream.aclose()  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_aiter_items_reports_download_errors() -> None:
+    async def broken() -> AsyncIterator[bytes]:
+        yield b'{"items": [1, 2'
+        msg = "conexión perdida"
+        raise ConnectionError(msg)
+
+    with pytest.raises(ConnectionError, match="conexión perdida"):
+        _ = [x async for x in aiter_items(broken(), ["items.item"])]
+
+
+@pytest.mark.asyncio
+async def test_client_iter_dependencies() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith(":dependencies")
+        return httpx.Response(200, content=json.dumps(GRAPH).encode())
+
+    client = DepsDevClientV3(transport=httpx.MockTransport(handler))
+    result = [x async for x in client.iter_dependencies(System.NPM, "raíz", "1.0.0")]
+    assert result == [
+        *(("nodes", x) for x in GRAPH["nodes"]),
+        *(("edges", x) for x in GRAPH["edges"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_v3alpha_streaming_calls_stay_on_v3alpha() -> None:
+    paths: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        return httpx.Response(200, content=json.dumps({**GRAPH, "versions": [{"a": 1}]}).encode())
+
+    client = DepsDevClientV3Alpha(transport=httpx.MockTransport(handler))
+    _ = [x async for x in client.iter_dependencies(System.NPM, "raíz", "1.0.0")]
+    _ = [x async for x in client.iter_project_package_versions("github.com/ñu/ñu")]
+    assert [x.split("/")[1] for x in paths] == ["v3alpha", "v3alpha"]
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import io
+import json
+from typing import Any
+
+import httpx
+import pytest
+
+from depsdev.cli.licenses import licenses_helper
+from depsdev.cli.output import OutputFormat
+from depsdev.licenses import LicenseTable
+from depsdev.licenses import Policy
+from depsdev.licenses import Verdict
+from depsdev.paging import iter_purl_lookup_batch
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+LICENSES = {
+    "pkg:pypi/café@1.0.0": ["MIT"],
+    "pkg:pypi/日本語@2.0.0": ["GPL-3.0-only"],
+    "pkg:npm/ñandú@3.0.0": ["MIT OR GPL-3.0-only"],
+    "pkg:npm/straße@4.0.0": ["non-standard"],
+    "pkg:pypi/привет@5.0.0": [],
+}
+
+
+def handler(requests: list[dict[str, Any]]) -> httpx.MockTransport:
+    def handle(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append(body)
+        purls = [x["purl"] for x in body["requests"]]
+        # Answer one purl per page to exercise the page token chain.
+        index = int(body.get("pageToken") or 0)
+        purl = purls[index]
+        page: dict[str, Any] = {
+            "responses": [
+                {
+                    "request": {"purl": purl},
+                    "result": {"version": {"licenses": LICENSES[purl]}},
+                }
+            ]
+        }
+        if index + 1 < len(purls):
+            page["nextPageToken"] = str(index + 1)
+        return httpx.Response(200, json=page)
+
+    return httpx.MockTransport(handle)
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("MIT", Verdict.ALLOWED),
+        ("GPL-3.0-only", Verdict.DENIED),
+        ("MIT OR GPL-3.0-only", Verdict.ALLOWED),
+        ("MIT AND GPL-3.0-only", Verdict.DENIED),
+        ("(MIT OR GPL-3.0-only) AND Apache-2.0", Verdict.ALLOWED),
+        ("GPL-2.0-only WITH Classpath-exception-2.0", Verdict.ALLOWED),
+        ("gpl-3.0-only", Verdict.DENIED),
+        ("non-standard", Verdict.UNKNOWN),
+        ("(MIT", Verdict.UNKNOWN),
+        ("", Verdict.UNKNOWN),
+    ],
+)
+def test_policy_deny(expression: str, expected: Verdict) -> None:
+    assert Policy.from_lists([], ["GPL-3.0-only"]).evaluate(expression) == expected
+
+
+def test_policy_allow() -> None:
+    policy = Policy.from_lists(["MIT", "Apache-2.0"], [])
+    assert policy.evaluate("Apache-2.0") == Verdict.ALLOWED
+    assert policy.evaluate("BSD-3-Clause") == Verdict.DENIED
+    assert policy.evaluate("BSD-3-Clause OR MIT") == Verdict.ALLOWED
+
+
+def test_license_table_interns() -> None:
+    table = LicenseTable(Policy.from_lists([], ["GPL-3.0-only"]))
+    first = table.intern("MIT")
+    assert table.intern("GPL-3.0-only") != first
+    assert table.intern("MIT") == first
+    assert table.expressions == ["MIT", "GPL-3.0-only"]
+    assert table.counts == [2, 1]
+    assert table.verdict((first,)) == Verdict.ALLOWED
+    assert table.verdict((first, 1)) == Verdict.DENIED
+    assert table.verdict(()) == Verdict.UNKNOWN
+
+
+@pytest.mark.asyncio
+async def test_iter_purl_lookup_batch_pages_and_chunks() -> None:
+    requests: list[dict[str, Any]] = []
+    batch_size = 2
+    client = DepsDevClientV3Alpha(transport=handler(requests))
+    purls = [*LICENSES, "pkg:pypi/sin-versión", "pkg:generic/otro@1"]
+    results = {
+        purl: version
+        async for purl, version in iter_purl_lookup_batch(client, purls, batch_size=batch_size)
+    }
+    assert results == {purl: {"licenses": x} for purl, x in LICENSES.items()}
+    # 3 chunks of up to 2 purls, each purl answered on its own page.
+    assert len(requests) == len(LICENSES)
+    assert max(len(x["requests"]) for x in requests) == batch_size
+
+
+@pytest.mark.asyncio
+async def test_licenses_helper_jsonl() -> None:
+    out = io.StringIO()
+    denied = await licenses_helper(
+        list(LICENSES),
+        [],
+        ["GPL-3.0-only"],
+        format=OutputFormat.JSONL,
+        client=DepsDevClientV3Alpha(transport=handler([])),
+        out=out,
+    )
+    assert denied == 1
+    rows = {x["purl"]: x for x in map(json.loads, out.getvalue().splitlines())}
+    assert {purl: x["verdict"] for purl, x in rows.items()} == {
+        "pkg:pypi/café@1.0.0": "allowed",
+        "pkg:pypi/日本語@2.0.0": "denied",
+        "pkg:npm/ñandú@3.0.0": "allowed",
+        "pkg:npm/straße@4.0.0": "unknown",
+        "pkg:pypi/привет@5.0.0": "unknown",
+    }
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import io
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from depsdev.cli.output import OutputFormat
+from depsdev.cli.output import get_writer
+
+if TYPE_CHECKING:
+    from depsdev.osv import OSVVulnerability
+
+VULNS: list[OSVVulnerability] = [
+    {
+        "id": "GHSA-jjg7-2v4v-x38h",
+        "summary": "Denegación de servicio en idna.encode",
+        "affected": [{"ranges": [{"events": [{"introduced": "0"}, {"fixed": "3.7"}]}]}],
+    },
+    {"id": "PYSEC-2024-60"},  # type: ignore[typeddict-item]
+]
+
+
+def render(output_format: OutputFormat, findings: list[tuple[str, list[OSVVulnerability]]]) -> str:
+    out = io.StringIO()
+    writer = get_writer(output_format, out, artifact="requirements.txt")
+    for purl, advisories in findings:
+        writer.write(purl, advisories)
+    writer.close()
+    return out.getvalue()
+
+
+def test_jsonl() -> None:
+    lines = render(OutputFormat.JSONL, [("pkg:pypi/idna@3.6", VULNS)]).splitlines()
+    assert [json.loads(x) for x in lines] == [
+        {
+            "purl": "pkg:pypi/idna@3.6",
+            "id": "GHSA-jjg7-2v4v-x38h",
+            "aliases": [],
+            "summary": "Denegación de servicio en idna.encode",
+            "fixed": "3.7",
+        },
+        {
+            "purl": "pkg:pypi/idna@3.6",
+            "id": "PYSEC-2024-60",
+            "aliases": [],
+            "summary": None,
+            "fixed": None,
+        },
+    ]
+
+
+@pytest.mark.parametrize("findings", [[], [("pkg:pypi/idna@3.6", VULNS)]])
+def test_json_matches_jsonl(findings: list[tuple[str, list[OSVVulnerability]]]) -> None:
+    expected = [json.loads(x) for x in render(OutputFormat.JSONL, findings).splitlines()]
+    assert json.loads(render(OutputFormat.JSON, findings)) == expected
+
+
+def test_sarif() -> None:
+    log = json.loads(
+        render(
+            OutputFormat.SARIF,
+            [("pkg:pypi/idna@3.6", VULNS), ("pkg:pypi/idna@3.5", VULNS[:1])],
+        )
+    )
+    run = log["runs"][0]
+    assert log["version"] == "2.1.0"
+    assert [x["id"] for x in run["tool"]["driver"]["rules"]] == [
+        "GHSA-jjg7-2v4v-x38h",
+        "PYSEC-2024-60",
+    ]
+    assert [x["message"]["text"] for x in run["results"]] == [
+        "pkg:pypi/idna@3.6 is affected by GHSA-jjg7-2v4v-x38h, fixed in 3.7.",
+        "pkg:pypi/idna@3.6 is affected by PYSEC-2024-60.",
+        "pkg:pypi/idna@3.5 is affected by GHSA-jjg7-2v4v-x38h, fixed in 3.7.",
+    ]
+    location = run["results"][0]["locations"][0]["physicalLocation"]["artifactLocation"]
+    assert location == {"uri": "requirements.txt"}
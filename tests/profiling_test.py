@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import pstats
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from depsdev import profiling
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def workload() -> str:
+    await asyncio.sleep(0)  # Let the lag sampler start waiting.
+    with profiling.stage("extracción"):
+        busy(0.05)
+    for _ in range(3):
+        with profiling.stage("網絡"):
+            await asyncio.sleep(0.02)
+    return "listo"
+
+
+def test_stage_is_noop_when_disabled() -> None:
+    assert profiling.profiler is None
+    with profiling.stage("nada"):
+        pass
+    assert asyncio.run(profiling.run(workload())) == "listo"
+
+
+@pytest.mark.parametrize("suffix", [".prof", ".folded"])
+def test_profile_run(tmp_path: Path, suffix: str, capsys: pytest.CaptureFixture[str]) -> None:
+    output = str(tmp_path / f"perfil{suffix}")
+    profiler = profiling.enable(output)
+    try:
+        assert asyncio.run(profiling.run(workload())) == "listo"
+    finally:
+        profiling.finish()
+    assert profiling.profiler is None
+
+    extraction = profiler.stages["extracción"]
+    assert extraction.calls == 1
+    assert extraction.wall >= 0.05  # noqa: PLR2004
+    assert extraction.cpu > 0
+    assert profiler.stages["網絡"].calls == 3  # noqa: PLR2004
+    # The busy stage blocks the loop while the lag sampler is waiting.
+    assert profiler.lags
+    assert max(profiler.lags) >= 0.02  # noqa: PLR2004
+
+    if suffix == ".prof":
+        assert "busy" in {name for _, _, name in pstats.Stats(output).stats}  # type: ignore[attr-defined]
+    else:
+        with open(output, encoding="utf-8") as f:
+            stacks = f.read().splitlines()
+        assert any("workload" in x and x.split()[-1].isdigit() for x in stacks)
+
+    err = capsys.readouterr().err
+    assert "extracción" in err
+    assert "Event loop lag" in err
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from depsdev.cli.purl import CargoLockExtractor
+from depsdev.cli.purl import GoSumExtractor
+from depsdev.cli.purl import PackageLockExtractor
+from depsdev.cli.purl import PipfileLockExtractor
+from depsdev.cli.purl import PnpmLockExtractor
+from depsdev.cli.purl import PoetryLockExtractor
+from depsdev.cli.purl import YarnLockExtractor
+from depsdev.cli.purl import get_extractor
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def extract(extractor: object, path: Path, content: str) -> list[str]:
+    path.write_text(content, encoding="utf-8")
+    return [x.to_string() for x in extractor.extract(str(path))]  # type: ignore[attr-defined]
+
+
+def test_get_extractor() -> None:
+    assert isinstance(get_extractor("/srv/app/package-lock.json"), PackageLockExtractor)
+    assert isinstance(get_extractor("Cargo.lock"), CargoLockExtractor)
+    with pytest.raises(SystemExit):
+        get_extractor("Gemfile.lock")
+
+
+def test_pipfile_lock(tmp_path: Path) -> None:
+    content = json.dumps(
+        {
+            "_meta": {"hash": {"sha256": "abc"}},
+            "default": {"requests": {"version": "==2.31.0"}, "editable": {"path": "."}},
+            "develop": {"pytest": {"version": "==8.0.0"}},
+        }
+    )
+    assert extract(PipfileLockExtractor, tmp_path / "Pipfile.lock", content) == [
+        "pkg:pypi/requests@2.31.0"
+    ]
+
+
+def test_package_lock_v3(tmp_path: Path) -> None:
+    content = json.dumps(
+        {
+            "name": "aplicación",
+            "lockfileVersion": 3,
+            "packages": {
+                "": {"name": "aplicación", "version": "1.0.0"},
+                "node_modules/@babel/core": {"version": "7.24.0"},
+                "node_modules/a/node_modules/left-pad": {"version": "1.3.0"},
+                "node_modules/alias": {"name": "real-name", "version": "2.0.0"},
+                "node_modules/workspace": {"resolved": "packages/workspace", "link": True},
+            },
+            "dependencies": {"ignored": {"version": "9.9.9"}},
+        }
+    )
+    assert extract(PackageLockExtractor, tmp_path / "package-lock.json", content) == [
+        "pkg:npm/%40babel/core@7.24.0",
+        "pkg:npm/left-pad@1.3.0",
+        "pkg:npm/real-name@2.0.0",
+    ]
+
+
+def test_package_lock_v1(tmp_path: Path) -> None:
+    content = json.dumps(
+        {
+            "lockfileVersion": 1,
+            "dependencies": {
+                "express": {
+                    "version": "4.18.2",
+                    "dependencies": {"debug": {"version": "2.6.9"}},
+                },
+                "local": {"version": "file:../local"},
+            },
+        }
+    )
+    assert sorted(extract(PackageLockExtractor, tmp_path / "package-lock.json", content)) == [
+        "pkg:npm/debug@2.6.9",
+        "pkg:npm/express@4.18.2",
+    ]
+
+
+def test_yarn_lock_classic(tmp_path: Path) -> None:
+    content = """\
+# yarn lockfile v1
+
+
+"@babel/code-frame@^7.0.0", "@babel/code-frame@^7.10.4":
+  version "7.12.13"
+  resolved "https://registry.yarnpkg.com/@babel/code-frame/-/code-frame-7.12.13.tgz"
+  dependencies:
+    "@babel/highlight" "^7.12.13"
+
+lodash@^4.17.21:
+  version "4.17.21"
+"""
+    assert extract(YarnLockExtractor, tmp_path / "yarn.lock", content) == [
+        "pkg:npm/%40babel/code-frame@7.12.13",
+        "pkg:npm/lodash@4.17.21",
+    ]
+
+
+def test_yarn_lock_berry(tmp_path: Path) -> None:
+    content = """\
+__metadata:
+  version: 6
+  cacheKey: 8
+
+"lodash@npm:^4.17.21":
+  version: 4.17.21
+  resolution: "lodash@npm:4.17.21"
+
+"mi-app@workspace:.":
+  version: 0.0.0-use.local
+"""
+    assert extract(YarnLockExtractor, tmp_path / "yarn.lock", content) == ["pkg:npm/lodash@4.17.21"]
+
+
+@pytest.mark.parametrize(
+    ("key", "expected"),
+    [
+        ("/lodash/4.17.21", "pkg:npm/lodash@4.17.21"),
+        ("/@types/node/20.1.0_typescript@5.0.0", "pkg:npm/%40types/node@20.1.0"),
+        ("/@types/node@20.1.0(typescript@5.0.0)", "pkg:npm/%40types/node@20.1.0"),
+        ("'@types/node@20.1.0'", "pkg:npm/%40types/node@20.1.0"),
+        ("lodash@4.17.21", "pkg:npm/lodash@4.17.21"),
+    ],
+)
+def test_pnpm_lock(tmp_path: Path, key: str, expected: str) -> None:
+    content = f"""\
+lockfileVersion: '9.0'
+
+importers:
+  .:
+    dependencies:
+      ignored:
+        specifier: ^1.0.0
+        version: 1.0.0
+
+packages:
+
+  {key}:
+    resolution: {{integrity: sha512-abc}}
+    engines: {{node: '>=8'}}
+
+  local@file:vendor/local.tgz:
+    resolution: {{tarball: file:vendor/local.tgz}}
+
+snapshots:
+
+  lodash@4.17.21: {{}}
+"""
+    assert extract(PnpmLockExtractor, tmp_path / "pnpm-lock.yaml", content) == [expected]
+
+
+def test_poetry_lock(tmp_path: Path) -> None:
+    content = """\
+[[package]]
+name = "certifi"
+version = "2024.2.2"
+description = "Python package for providing Mozilla's CA Bundle."
+optional = false
+files = [
+    {file = "certifi-2024.2.2-py3-none-any.whl", hash = "sha256:dc383c07b76109f368f6106eee2b593b"},
+]
+
+[[package]]
+name = "mi-libreria"
+version = "0.1.0"
+
+[package.source]
+type = "git"
+url = "https://github.com/example/mi-libreria.git"
+
+[[package]]
+name = "Flask"
+version = "3.0.2"
+
+[package.dependencies]
+name = "1.0"
+
+[metadata]
+lock-version = "2.0"
+"""
+    assert extract(PoetryLockExtractor, tmp_path / "poetry.lock", content) == [
+        "pkg:pypi/certifi@2024.2.2",
+        "pkg:pypi/flask@3.0.2",
+    ]
+
+
+def test_cargo_lock(tmp_path: Path) -> None:
+    content = """\
+version = 3
+
+[[package]]
+name = "mi-crate"
+version = "0.1.0"
+dependencies = [
+ "serde",
+]
+
+[[package]]
+name = "serde"
+version = "1.0.197"
+source = "registry+https://github.com/rust-lang/crates.io-index"
+checksum = "3fb1c873e1b9b056a4dc4c0c198b24c3ffa059243875552b2bd0933b1aee4ce2"
+"""
+    assert extract(CargoLockExtractor, tmp_path / "Cargo.lock", content) == [
+        "pkg:cargo/serde@1.0.197"
+    ]
+
+
+def test_go_sum(tmp_path: Path) -> None:
+    content = """\
+github.com/google/uuid v1.6.0 h1:NIvaJDMOsjHA8n1jAhLSgzrAzy1Hgr+hNrb57e+94F0=
+github.com/google/uuid v1.6.0/go.mod h1:TIyPZe4MgqvfeYDBFedMoGGpEw/LqOeaOT+nhxU+yHo=
+golang.org/x/mod v0.14.0/go.mod h1:hTbmBsO62+eylJbnUtE2MGJUyE7QWk4xUqPFrRgJ+7c=
+"""
+    assert extract(GoSumExtractor, tmp_path / "go.sum", content) == [
+        "pkg:golang/github.com/google/uuid@v1.6.0"
+    ]
+
+
+def test_cyclonedx_sbom(tmp_path: Path) -> None:
+    content = json.dumps(
+        {
+            "bomFormat": "CycloneDX",
+            "specVersion": "1.5",
+            "metadata": {"component": {"purl": "pkg:oci/imagen@sha256%3Aabc"}},
+            "components": [
+                {
+                    "name": "spring-boot",
+                    "purl": "pkg:maven/org.springframework.boot/spring-boot@3.2.0",
+                    "components": [{"purl": "pkg:maven/org.yaml/snakeyaml@2.2"}],
+                },
+                {"name": "sin-purl"},
+                {"purl": "pkg:maven/org.yaml/snakeyaml@2.2"},
+                {"purl": "no es un purl"},
+            ],
+        }
+    )
+    assert extract(get_extractor("bom.json"), tmp_path / "imagen.cdx.json", content) == [
+        "pkg:maven/org.springframework.boot/spring-boot@3.2.0",
+        "pkg:maven/org.yaml/snakeyaml@2.2",
+    ]
+
+
+def test_spdx_sbom(tmp_path: Path) -> None:
+    ref = {"referenceCategory": "PACKAGE-MANAGER", "referenceType": "purl"}
+    content = json.dumps(
+        {
+            "spdxVersion": "SPDX-2.3",
+            "packages": [
+                {
+                    "name": "requests",
+                    "externalRefs": [{**ref, "referenceLocator": "pkg:pypi/requests@2.31.0"}],
+                },
+                {
+                    "name": "sistema",
+                    "externalRefs": [
+                        {"referenceType": "cpe23Type", "referenceLocator": "cpe:2.3:a"}
+                    ],
+                },
+            ],
+        }
+    )
+    assert extract(get_extractor("x.spdx.json"), tmp_path / "x.spdx.json", content) == [
+        "pkg:pypi/requests@2.31.0"
+    ]
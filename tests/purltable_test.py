@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+from packageurl import PackageURL
+
+from depsdev.cli.purl import purl_table
+from depsdev.paging import iter_purl_lookup_batch
+from depsdev.purltable import PurlTable
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_purl_table_deduplicates_and_interns() -> None:
+    table = PurlTable.from_purls(
+        [
+            PackageURL(type="npm", namespace="@ñ", name="café", version="1.0.0"),
+            "pkg:npm/%40%C3%B1/caf%C3%A9@1.0.0",
+            PackageURL(type="npm", namespace="@ñ", name="café", version="2.0.0"),
+            PackageURL(type="pypi", name="日本語", version="1.0.0"),
+            "pkg:maven/org.ñ/straße@3.0?type=pom",
+            "not a purl",
+            "not a purl",
+        ]
+    )
+    assert len(table) == 5  # noqa: PLR2004
+    # "café", "@ñ" and "1.0.0" are stored once however many rows use them.
+    assert table.strings.count("1.0.0") == 1
+    assert (
+        table[0] == PackageURL(type="npm", namespace="@ñ", name="café", version="1.0.0").to_string()
+    )
+    assert table[3] == "pkg:maven/org.ñ/straße@3.0?type=pom"
+    assert table.package(3) == ("maven", "org.ñ", "straße")
+    assert table[-1] == "not a purl"
+    assert table[1:3] == [table[1], table[2]]
+    assert table.version(2) == "1.0.0"
+    assert "pkg:npm/%40%C3%B1/caf%C3%A9@2.0.0" in table
+    assert "pkg:npm/%40%C3%B1/caf%C3%A9@3.0.0" not in table
+    assert table.by_package()[("npm", "@ñ", "café")] == [0, 1]
+
+    selected = table.select(types={"npm", "pypi"}, versioned=True)
+    assert list(selected) == [table[0], table[1], table[2]]
+
+
+def test_purl_table_keeps_spelling_of_strings() -> None:
+    table = PurlTable()
+    row = table.add_string("pkg:pypi/Ni%C3%B1o@1.0")
+    assert table[row] == "pkg:pypi/Ni%C3%B1o@1.0"
+    assert table.add_string("pkg:pypi/niño@1.0") == row
+    assert table.add_purl(PackageURL(type="pypi", name="niño", version="1.0")) == row
+
+
+def test_purl_table_from_sources(tmp_path: Path) -> None:
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("café==1.0\nniño==2.0\ncafé==1.0\n", encoding="utf-8")
+    table = purl_table([str(requirements), "pkg:npm/ñandú@3.0.0", str(requirements)])
+    assert [table.package(x)[2] for x in range(len(table))] == ["café", "niño", "ñandú"]
+
+
+def test_purl_table_rejects_missing_file(tmp_path: Path) -> None:
+    with pytest.raises(SystemExit):
+        purl_table(["pkg:npm/ñandú@3.0.0", str(tmp_path / "requirements-café.txt")])
+
+
+@pytest.mark.asyncio
+async def test_purl_lookup_batch_accepts_table() -> None:
+    sent: list[list[str]] = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        purls = [x["purl"] for x in json.loads(request.content)["requests"]]
+        sent.append(purls)
+        responses = [{"request": {"purl": x}, "result": {"version": {}}} for x in purls]
+        return httpx.Response(200, json={"responses": responses})
+
+    table = PurlTable.from_purls(
+        [f"pkg:pypi/café{i}@1.0" for i in range(5)] + ["pkg:pypi/niño", "pkg:generic/ñ@1"]
+    )
+    client = DepsDevClientV3Alpha(transport=httpx.MockTransport(handle))
+    results = [x async for x, _ in iter_purl_lookup_batch(client, table, batch_size=2)]
+    # Unversioned and unsupported purls are never sent.
+    assert sorted(results) == sorted(table[:5])
+    assert sorted(map(len, sent)) == [1, 2, 2]
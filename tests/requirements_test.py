@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import TYPE_CHECKING
+
+from depsdev.cli.purl import RequirementsExtractor
+from depsdev.requirements import RequirementsCache
+from depsdev.requirements import parse
+from depsdev.requirements import pinned
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def test_parse() -> None:
+    parsed = parse(
+        os.path.join("app", "requirements.txt"),
+        "--index-url https://example.org/simple\n"
+        "-r ../shared/base.txt\n"
+        "--constraint=constraints.txt\n"
+        "Café_Crème[extra]==1.0 ; python_version >= '3.9'  # pinned\n"
+        "niño>=2.0\n"
+        "jalapeño==3.0 \\\n"
+        "    --hash=sha256:0123456789abcdef\n"
+        "straße @ https://example.org/straße-1.0.tar.gz\n"
+        "-e ./local\n",
+    )
+    assert parsed.includes == [os.path.join("shared", "base.txt")]
+    assert parsed.constraints == [os.path.join("app", "constraints.txt")]
+    assert [(x.name, x.version) for x in parsed.requirements] == [
+        ("café-crème", "1.0"),
+        ("niño", None),
+        ("jalapeño", "3.0"),
+    ]
+    assert parsed.requirements[0].marker == "python_version >= '3.9'"
+
+
+def test_pinned_follows_includes_and_constraints(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "base.txt").write_text(
+        "niño==2.0\n-r ../requirements.txt\n", encoding="utf-8"
+    )
+    (tmp_path / "shared" / "constraints.txt").write_text(
+        "jalapeño==3.1\nunused==9.9\n", encoding="utf-8"
+    )
+    root = tmp_path / "requirements.txt"
+    root.write_text(
+        "-r shared/base.txt\n-c shared/constraints.txt\ncafé==1.0\nJalapeño>=3\nsin-pin\n",
+        encoding="utf-8",
+    )
+    with caplog.at_level(logging.WARNING):
+        result = dict(pinned(str(root), RequirementsCache()))
+    assert result == {"niño": "2.0", "café": "1.0", "jalapeño": "3.1"}
+    assert "Include cycle" in caplog.text
+    assert sorted(x.name for x in RequirementsExtractor.extract(str(root))) == sorted(result)
+
+
+def test_cache_rereads_changed_files(tmp_path: Path) -> None:
+    shared = tmp_path / "base.txt"
+    shared.write_text("niño==2.0\n", encoding="utf-8")
+    first = tmp_path / "a-requirements.txt"
+    second = tmp_path / "b-requirements.txt"
+    first.write_text("-r base.txt\n", encoding="utf-8")
+    second.write_text("-r base.txt\ncafé==1.0\n", encoding="utf-8")
+
+    cache = RequirementsCache()
+    assert dict(pinned(str(first), cache)) == {"niño": "2.0"}
+    parsed = cache.files[str(shared)][1]
+    assert dict(pinned(str(second), cache)) == {"niño": "2.0", "café": "1.0"}
+    # The shared include is parsed once for both manifests.
+    assert cache.files[str(shared)][1] is parsed
+
+    shared.write_text("niño==2.1\n", encoding="utf-8")
+    os.utime(shared, ns=(0, os.stat(shared).st_mtime_ns + 1))
+    assert dict(pinned(str(first), cache)) == {"niño": "2.1"}
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from depsdev.scheduler import Priority
+from depsdev.scheduler import Scheduler
+from depsdev.scheduler import priority
+from depsdev.v3 import DepsDevClientV3
+from depsdev.v3 import System
+
+
+async def hold(
+    scheduler: Scheduler,
+    level: Priority,
+    caller: str,
+    order: list[str],
+    release: asyncio.Event,
+) -> None:
+    async with scheduler.slot(level, caller):
+        order.append(caller)
+        await release.wait()
+
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_interactive_uses_headroom_left_by_bulk() -> None:
+    scheduler = Scheduler({Priority.INTERACTIVE: 2, Priority.BULK: 1}, total=2)
+    order: list[str] = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.ensure_future(hold(scheduler, Priority.BULK, "barrido", order, release)),
+        asyncio.ensure_future(hold(scheduler, Priority.BULK, "nächtlich", order, release)),
+        asyncio.ensure_future(hold(scheduler, Priority.INTERACTIVE, "開発者", order, release)),
+    ]
+    await settle()
+    assert order == ["barrido", "開発者"]
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order[-1] == "nächtlich"
+    assert scheduler.running == dict.fromkeys(Priority, 0)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_prefers_interactive_then_round_robin() -> None:
+    scheduler = Scheduler(total=1)
+    order: list[str] = []
+    gates = {x: asyncio.Event() for x in ("first", "a", "b", "開発者")}
+
+    async def run(level: Priority, caller: str) -> None:
+        async with scheduler.slot(level, caller):
+            order.append(caller)
+            await gates[caller].wait()
+
+    tasks = [asyncio.ensure_future(run(Priority.BULK, "first"))]
+    await settle()
+    tasks += [asyncio.ensure_future(run(Priority.BULK, "a")) for _ in range(3)]
+    tasks.append(asyncio.ensure_future(run(Priority.BULK, "b")))
+    tasks.append(asyncio.ensure_future(run(Priority.INTERACTIVE, "開発者")))
+    await settle()
+    for gate in gates.values():
+        gate.set()
+    await asyncio.gather(*tasks)
+    assert order == ["first", "開発者", "a", "b", "a", "a"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot() -> None:
+    scheduler = Scheduler(total=1)
+    order: list[str] = []
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(scheduler, Priority.BULK, "ñ", order, release))
+    await settle()
+    waiter = asyncio.ensure_future(hold(scheduler, Priority.BULK, "ø", order, release))
+    await settle()
+    waiter.cancel()
+    await settle()
+    release.set()
+    await holder
+    assert waiter.cancelled()
+    assert order == ["ñ"]
+    assert scheduler.running == dict.fromkeys(Priority, 0)
+    assert not scheduler.queues[Priority.BULK]
+
+
+def test_limits_follow_env_and_concurrency(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DEPSDEV_CONCURRENCY", "8")
+    scheduler = Scheduler()
+    assert (scheduler.total, scheduler.limits) == (8, {Priority.INTERACTIVE: 8, Priority.BULK: 6})
+    scheduler.fit(4)
+    assert scheduler.limits[Priority.BULK] == 6  # noqa: PLR2004
+    scheduler.fit(64)
+    assert (scheduler.total, scheduler.limits) == (
+        85,
+        {Priority.INTERACTIVE: 85, Priority.BULK: 64},
+    )
+
+
+@pytest.mark.asyncio
+async def test_client_requests_run_in_context_priority() -> None:
+    scheduler = Scheduler()
+    seen: list[dict[Priority, int]] = []
+
+    def handler(_: httpx.Request) -> httpx.Response:
+        seen.append(dict(scheduler.running))
+        return httpx.Response(200, json={})
+
+    client = DepsDevClientV3(transport=httpx.MockTransport(handler))
+    client.scheduler = scheduler
+    await client.get_package(System.PYPI, "café")
+    with priority(Priority.BULK, caller="barrido"):
+        await client.get_package(System.PYPI, "niño")
+    assert seen == [
+        {Priority.INTERACTIVE: 1, Priority.BULK: 0},
+        {Priority.INTERACTIVE: 0, Priority.BULK: 1},
+    ]
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+from depsdev.cli.shard import parse_shard
+from depsdev.cli.shard import partition
+from depsdev.cli.shard import select_shard
+from depsdev.cli.shard import shard_of
+
+PURLS = [f"pkg:pypi/paquete-{i}@1.0.{i}" for i in range(200)]
+
+
+def test_partition_is_complete_and_stable() -> None:
+    parts = partition(PURLS, 4)
+    assert sorted(itertools.chain.from_iterable(parts)) == sorted(PURLS)
+    assert all(parts)
+    assert parts == partition(PURLS, 4)
+    # Known value, guards against the assignment changing between releases.
+    assert shard_of("pkg:npm/%40colors/colors@1.5.0", 4) == 3  # noqa: PLR2004
+
+
+def test_select_shard_matches_partition() -> None:
+    parts = partition(PURLS, 3)
+    assert [select_shard(PURLS, f"{i}/3") for i in (1, 2, 3)] == parts
+
+
+@pytest.mark.parametrize("shard", ["0/4", "5/4", "1", "a/b"])
+def test_parse_shard_invalid(shard: str) -> None:
+    with pytest.raises(SystemExit):
+        parse_shard(shard)
+
+
+def test_parse_shard() -> None:
+    assert parse_shard("2/8") == (1, 8)
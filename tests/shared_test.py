@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import time
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.osv import OSVClientV1
+from depsdev.shared import SharedStore
+from depsdev.shared import SharedTransport
+from depsdev.shared import request_key
+from depsdev.v3 import DepsDevClientV3
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
+RATE = 40.0
+BURST = 4.0
+PROCESSES = 4
+PER_PROCESS = 10
+
+
+def take_tokens(path: str) -> None:
+    store = SharedStore(path, rate=RATE, burst=BURST)
+    for _ in range(PER_PROCESS):
+        asyncio.run(store.acquire())
+    store.close()
+
+
+def put_response(path: str) -> None:
+    SharedStore(path).put(request_key("GET", "https://api.osv.dev/v1/vulns/X", b""), 200, "a", b"b")
+
+
+def test_token_bucket_is_shared_across_processes(tmp_path: Path) -> None:
+    path = str(tmp_path / "compartido.db")
+    SharedStore(path).close()
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=take_tokens, args=(path,)) for _ in range(PROCESSES)]
+    for worker in workers:
+        worker.start()
+    start = time.monotonic()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - start
+    assert all(worker.exitcode == 0 for worker in workers)
+    # Each process alone would be done after its burst, together they share one budget.
+    assert elapsed >= (PROCESSES * PER_PROCESS - BURST) / RATE * 0.9
+
+
+def test_response_store_is_shared_across_processes(tmp_path: Path) -> None:
+    path = str(tmp_path / "compartido.db")
+    worker = multiprocessing.get_context("spawn").Process(target=put_response, args=(path,))
+    worker.start()
+    worker.join()
+    key = request_key("GET", "https://api.osv.dev/v1/vulns/X", b"")
+    assert SharedStore(path).get(key) == (200, "a", b"b")
+
+
+@pytest.mark.asyncio
+async def test_shared_transport_caches_success_only(tmp_path: Path) -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/v1/vulns/missing":
+            return httpx.Response(404, json={"message": "Bug not found."})
+        return httpx.Response(200, json={"id": "GHSA-xxxx", "summary": "漏洞"})
+
+    store = SharedStore(str(tmp_path / "compartido.db"), rate=0)
+    first = OSVClientV1(transport=SharedTransport(store, httpx.MockTransport(handler)))
+    second = OSVClientV1(transport=SharedTransport(store, httpx.MockTransport(handler)))
+    assert await first.get_vuln("GHSA-xxxx") == await second.get_vuln("GHSA-xxxx")
+    for client in (first, second):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_vuln("missing")
+    assert calls == ["/v1/vulns/GHSA-xxxx", "/v1/vulns/missing", "/v1/vulns/missing"]
+
+
+class GatedStream(httpx.AsyncByteStream):
+    def __init__(self, head: bytes, tail: bytes, gate: asyncio.Event) -> None:
+        self.head, self.tail, self.gate = head, tail, gate
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self.head
+        await self.gate.wait()
+        yield self.tail
+
+
+@pytest.mark.asyncio
+async def test_shared_transport_streams_then_stores(tmp_path: Path) -> None:
+    gate = asyncio.Event()
+    body = json.dumps({"versions": [{"n": "primero"}, {"n": "segundo"}]}).encode()
+
+    def handler(_: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=GatedStream(body[:32], body[32:], gate))
+
+    store = SharedStore(str(tmp_path / "compartido.db"), rate=0)
+    client = DepsDevClientV3(transport=SharedTransport(store, httpx.MockTransport(handler)))
+    versions = client.iter_project_package_versions("github.com/ñu/ñu")
+    # The first item is parsed before the rest of the body was sent, and nothing is stored yet.
+    assert await asyncio.wait_for(versions.__anext__(), 1) == {"n": "primero"}
+    assert not list(store.rows())
+    gate.set()
+    assert [x async for x in versions] == [{"n": "segundo"}]
+    [(_, _, status, _, stored)] = store.rows()
+    assert (status, stored) == (200, body)
+
+
+@pytest.mark.asyncio
+async def test_shared_transport_skips_large_bodies(tmp_path: Path) -> None:
+    gate = asyncio.Event()
+    gate.set()
+    body = json.dumps({"versions": [{"n": "grande" * 10}]}).encode()
+
+    def handler(_: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=GatedStream(body[:32], body[32:], gate))
+
+    store = SharedStore(str(tmp_path / "compartido.db"), rate=0, max_body=len(body) - 1)
+    client = DepsDevClientV3(transport=SharedTransport(store, httpx.MockTransport(handler)))
+    versions = client.iter_project_package_versions("github.com/ñu/ñu")
+    assert [x async for x in versions] == [{"n": "grande" * 10}]
+    assert not list(store.rows())
+
+
+def test_clients_share_one_store_per_process(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("DEPSDEV_SHARED", str(tmp_path / "compartido.db"))
+    first, second = OSVClientV1(), DepsDevClientV3()
+    assert isinstance(first.transport, SharedTransport)
+    assert isinstance(second.transport, SharedTransport)
+    assert first.transport.store is second.transport.store
+    monkeypatch.setenv("DEPSDEV_CACHE_TTL", "60")
+    assert SharedStore.from_env() is not first.transport.store
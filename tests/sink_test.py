@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import multiprocessing
+import sqlite3
+from typing import TYPE_CHECKING
+
+from depsdev.cli.sink import SqliteSink
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from depsdev.osv import OSVVulnerability
+
+FIXED: OSVVulnerability = {
+    "id": "GHSA-jjg7-2v4v-x38h",
+    "summary": "Denegación de servicio",
+    "affected": [{"ranges": [{"events": [{"introduced": "0"}, {"fixed": "3.7"}]}]}],
+}
+
+
+def scan(path: str, index: int) -> None:
+    sources = [f"/repo-{index}/requirements.txt", "pkg:pypi/paquete-0@1.0"]
+    sink = SqliteSink(path, sources=sources, packages=2, batch_size=3)
+    for i in range(10):
+        sink.write(f"pkg:pypi/paquete-{i}@1.0", [FIXED, {"id": f"PYSEC-{i}"}])  # type: ignore[typeddict-item]
+    sink.close()
+
+
+def test_sink_normalizes_findings(tmp_path: Path) -> None:
+    path = str(tmp_path / "hallazgos.db")
+    scan(path, 0)
+    scan(path, 1)
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT count(*) FROM packages").fetchone() == (10,)
+    assert conn.execute("SELECT count(*) FROM advisories").fetchone() == (11,)
+    assert conn.execute("SELECT count(*) FROM findings").fetchone() == (40,)
+    assert conn.execute(
+        "SELECT DISTINCT s.source, f.fixed FROM findings f "
+        "JOIN scan_sources s ON s.scan_id = f.scan_id JOIN advisories a ON a.id = f.advisory_id "
+        "WHERE a.osv_id = 'GHSA-jjg7-2v4v-x38h' AND s.source LIKE '/%' ORDER BY s.source"
+    ).fetchall() == [("/repo-0/requirements.txt", "3.7"), ("/repo-1/requirements.txt", "3.7")]
+    assert conn.execute("SELECT count(*) FROM scan_sources").fetchone() == (4,)
+    assert conn.execute("SELECT count(*) FROM scans WHERE finished IS NULL").fetchone() == (0,)
+
+
+def test_sink_parallel_scans(tmp_path: Path) -> None:
+    path = str(tmp_path / "hallazgos.db")
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=scan, args=(path, i)) for i in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT count(*) FROM scans").fetchone() == (6,)
+    assert conn.execute("SELECT count(*) FROM findings").fetchone() == (120,)
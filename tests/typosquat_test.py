@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+import httpx
+import pytest
+
+from depsdev.typosquat import BKTree
+from depsdev.typosquat import Screener
+from depsdev.typosquat import distance
+from depsdev.typosquat import load_popular
+from depsdev.v3 import System
+from depsdev.v3alpha import DepsDevClientV3Alpha
+
+WORDS = [
+    "requests",
+    "request",
+    "reqeusts",
+    "urllib3",
+    "numpy",
+    "numba",
+    "pandas",
+    "panda",
+    "django",
+]
+
+
+def test_distance() -> None:
+    assert distance("requests", "reqeusts") == 1
+    assert distance("numpy", "nupmy") == 1
+    assert distance("kitten", "sitting") == 3  # noqa: PLR2004
+    assert distance("", "abc") == 3  # noqa: PLR2004
+    assert distance("tomil", "tomli") == 1
+    # A transposed pair can still be edited, "ca" -> "ac" -> "abc".
+    assert distance("ca", "abc") == 2  # noqa: PLR2004
+
+
+def test_bktree_matches_brute_force() -> None:
+    tree = BKTree(WORDS)
+    assert len(tree) == len(WORDS)
+    for word, n in itertools.product(["requets", "numpi", "djagno", "zzz"], [1, 2, 3]):
+        expected = sorted((distance(word, x), x) for x in WORDS if distance(word, x) <= n)
+        assert sorted(tree.search(word, n)) == expected
+
+
+def test_bktree_search_is_exact_on_random_names() -> None:
+    # Short names over a small alphabet are dense in transpositions, which is where an optimal
+    # string alignment distance breaks the triangle inequality and loses matches.
+    rng = random.Random(7)  # noqa: S311
+    names = {"".join(rng.choices("abcñ", k=rng.randint(1, 6))) for _ in range(200)}
+    tree = BKTree(names)
+    assert sorted(tree.search("ac", 1)) == sorted(
+        (distance("ac", x), x) for x in names if distance("ac", x) <= 1
+    )
+    for _ in range(100):
+        word = "".join(rng.choices("abcñ", k=rng.randint(0, 6)))
+        distances = [(distance(word, x), x) for x in names]
+        for n in (1, 2):
+            assert sorted(tree.search(word, n)) == sorted(x for x in distances if x[0] <= n)
+    assert list(BKTree(["abc", "ca"]).search("ac", 1)) == [(1, "abc"), (1, "ca")]
+
+
+def test_load_popular() -> None:
+    assert load_popular(["# comentario", "requests", "NPM react", "", "pypi numpy"]) == {
+        None: {"requests"},
+        System.NPM: {"react"},
+        System.PYPI: {"numpy"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_screener_only_queries_suspicious_names() -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(
+            200, json={"results": [{"packageKey": {"system": "PYPI", "name": "requests"}}]}
+        )
+
+    screener = Screener(
+        {System.PYPI: {"requests", "numpy"}},
+        DepsDevClientV3Alpha(transport=httpx.MockTransport(handler)),
+    )
+    packages = [
+        (System.PYPI, "requests"),
+        (System.PYPI, "reqeusts"),
+        (System.PYPI, "reqeusts"),
+        (System.PYPI, "mi-biblioteca-interna"),
+        (System.PYPI, "NumPy"),
+    ]
+    findings = await screener.screen_all(packages)
+    assert [(x.name, x.close_to, x.similar) for x in findings] == [
+        ("reqeusts", ["requests"], ["requests"])
+    ]
+    assert calls == ["/v3alpha/systems/PYPI/packages/reqeusts:similarlyNamedPackages"]
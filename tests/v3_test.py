@@ -4,6 +4,12 @@ from depsdev.v3 import DepsDevClientV3
 from depsdev.v3 import System
 
 
+def test_positional_timeout() -> None:
+    client = DepsDevClientV3(10.0)
+    assert (client.timeout, client.base_url) == (10.0, "https://api.deps.dev")
+    assert client.client.timeout.read == 10.0  # noqa: PLR2004
+
+
 @pytest.mark.asyncio
 async def test_all() -> None:
     client = DepsDevClientV3()
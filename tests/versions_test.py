@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+
+from depsdev.v3 import System
+from depsdev.versions import VersionIndex
+from depsdev.versions import is_prerelease
+from depsdev.versions import sort_key
+
+
+@pytest.mark.parametrize(
+    ("system", "ordered"),
+    [
+        (
+            System.PYPI,
+            ["0.9", "1.0.dev0", "1.0a1", "1.0b2", "1.0rc1", "1.0", "1.0.post1", "2.0", "1!0.1"],
+        ),
+        (
+            System.NPM,
+            ["0.9.9", "1.0.0-alpha", "1.0.0-alpha.1", "1.0.0-beta.2", "1.0.0-beta.11", "1.0.0"],
+        ),
+        (System.GO, ["v0.9.0", "v1.0.0-rc.1", "v1.0.0", "v1.2.0", "v1.10.0"]),
+        (System.MAVEN, ["1.0-alpha", "1.0-rc1", "1.0-SNAPSHOT", "1.0", "1.0-sp1", "1.0.1", "1.10"]),
+    ],
+)
+def test_sort_key(system: System, ordered: list[str]) -> None:
+    assert sorted(ordered[1::2] + ordered[::2], key=lambda x: sort_key(system, x)) == ordered
+
+
+def test_is_prerelease() -> None:
+    assert is_prerelease(System.PYPI, "2.0rc1")
+    assert not is_prerelease(System.PYPI, "2.0.post1")
+    assert is_prerelease(System.MAVEN, "2.0-SNAPSHOT")
+    assert not is_prerelease(System.MAVEN, "2.17.1")
+
+
+def test_first_unaffected() -> None:
+    index = VersionIndex(
+        System.PYPI,
+        ["1.0", "1.1", "1.2", "1.3rc1", "1.3", "1.4", "1.5", "2.0"],
+        excluded={"1.4"},
+    )
+    vulns = [
+        {
+            "id": "GHSA-uno",
+            "affected": [
+                {
+                    "package": {"ecosystem": "PyPI", "name": "Mi_Paquete"},
+                    "ranges": [
+                        {"type": "ECOSYSTEM", "events": [{"introduced": "0"}, {"fixed": "1.2"}]}
+                    ],
+                },
+                {
+                    "package": {"ecosystem": "PyPI", "name": "otro"},
+                    "ranges": [{"type": "ECOSYSTEM", "events": [{"introduced": "0"}]}],
+                },
+            ],
+        },
+        {
+            "id": "GHSA-dos",
+            "affected": [
+                {
+                    "package": {"ecosystem": "PyPI", "name": "mi-paquete"},
+                    "ranges": [
+                        {
+                            "type": "ECOSYSTEM",
+                            "events": [{"introduced": "1.1"}, {"last_affected": "1.2"}],
+                        }
+                    ],
+                    "versions": ["1.3"],
+                }
+            ],
+        },
+    ]
+    spans = [span for vuln in vulns for span in index.affected_spans(vuln, "mi-paquete")]  # type: ignore[arg-type]
+    # 1.3rc1 is a pre-release, 1.3 is listed explicitly and 1.4 is excluded.
+    assert index.first_unaffected(spans, "1.0") == "1.5"
+    assert index.first_unaffected(spans, "1.0", allow_prerelease=True) == "1.3rc1"
+    assert index.first_unaffected(spans, "2.0") is None
+
+
+def test_affected_spans_sorts_events_and_skips_other_packages() -> None:
+    index = VersionIndex(System.NPM, ["1.0.0", "1.1.0", "1.2.0", "2.0.0", "2.1.0", "3.0.0"])
+    vuln = {
+        "id": "GHSA-tres",
+        "affected": [
+            {
+                "package": {"ecosystem": "npm", "name": "paquete"},
+                "ranges": [
+                    {
+                        "type": "SEMVER",
+                        "events": [
+                            {"fixed": "2.1.0"},
+                            {"introduced": "2.0.0"},
+                            {"fixed": "1.2.0"},
+                            {"introduced": "0"},
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+    assert sorted(index.affected_spans(vuln, "paquete")) == [(0, 2), (3, 4)]  # type: ignore[arg-type]
+    assert index.first_unaffected(index.affected_spans(vuln, "paquete"), "1.0.0") == "1.2.0"  # type: ignore[arg-type]
+    assert index.affected_spans(vuln, "otro-paquete") == []  # type: ignore[arg-type]
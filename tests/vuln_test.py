@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from depsdev.cli.vuln import get_vulns
+from depsdev.cli.vuln import iter_vulns
+from depsdev.osv import OSVClientV1
+from depsdev.shared import SharedStore
+from depsdev.shared import SharedTransport
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+AFFECTED = {
+    "pkg:pypi/idna@3.6": ["GHSA-lento", "GHSA-comun"],
+    "pkg:pypi/urllib3@1.0": ["GHSA-comun"],
+    "pkg:pypi/seguro@1.0": [],
+}
+
+
+async def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/v1/querybatch":
+        queries = json.loads(request.content)["queries"]
+        results = [
+            {"vulns": [{"id": x} for x in AFFECTED[q["package"]["purl"]]]}
+            if AFFECTED[q["package"]["purl"]]
+            else {}
+            for q in queries
+        ]
+        return httpx.Response(200, json={"results": results})
+    vuln_id = request.url.path.rsplit("/", 1)[-1]
+    if vuln_id == "GHSA-lento":
+        await asyncio.sleep(0.05)
+    return httpx.Response(200, json={"id": vuln_id})
+
+
+@pytest.mark.asyncio
+async def test_iter_vulns_yields_as_resolved() -> None:
+    calls: list[str] = []
+
+    async def counting(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return await handler(request)
+
+    client = OSVClientV1(transport=httpx.MockTransport(counting))
+    results = [x async for x in iter_vulns(list(AFFECTED), client)]
+    assert results == [
+        ("pkg:pypi/urllib3@1.0", [{"id": "GHSA-comun"}]),
+        ("pkg:pypi/idna@3.6", [{"id": "GHSA-lento"}, {"id": "GHSA-comun"}]),
+    ]
+    # The shared advisory is only fetched once.
+    assert sorted(calls) == ["/v1/querybatch", "/v1/vulns/GHSA-comun", "/v1/vulns/GHSA-lento"]
+
+
+@pytest.mark.asyncio
+async def test_get_vulns_keeps_input_order() -> None:
+    client = OSVClientV1(transport=httpx.MockTransport(handler))
+    assert list(await get_vulns(list(AFFECTED), client)) == [
+        "pkg:pypi/idna@3.6",
+        "pkg:pypi/urllib3@1.0",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_offline_run_hits_the_batches_of_a_warm_run(tmp_path: Path) -> None:
+    purls = [f"pkg:pypi/café-{i}@1.0" for i in range(5000)]
+
+    async def slow(request: httpx.Request) -> httpx.Response:
+        queries = json.loads(request.content)["queries"]
+        # Uneven latency, so adaptive chunk boundaries would depend on the completion order.
+        await asyncio.sleep(0.01 * (len(queries) % 3))
+        return httpx.Response(200, json={"results": [{} for _ in queries]})
+
+    store = SharedStore(str(tmp_path / "compartido.db"), rate=0)
+    warm = OSVClientV1(transport=SharedTransport(store, httpx.MockTransport(slow)))
+    assert await get_vulns(purls, warm) == {}
+
+    store.offline = True
+    offline = OSVClientV1(transport=SharedTransport(store))
+    assert await get_vulns(purls, offline) == {}